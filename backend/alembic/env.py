@@ -0,0 +1,63 @@
+"""
+Alembic environment. Runs against settings.DATABASE_URL with the sync driver;
+the models are imported so ``alembic revision --autogenerate`` sees them.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import analytics, app, user, version  # noqa: F401  (register every mapper)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Postgres-only search objects of migrations 0005/0006, not mapped on the models
+SEARCH_COLUMNS = {"search_document"}
+SEARCH_INDEXES = {
+    "ix_apps_search_document", "ix_users_search_document",
+    "ix_apps_name_trgm", "ix_apps_package_name_trgm", "ix_users_full_name_trgm", "ix_users_email_trgm",
+}
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if not reflected or compare_to is not None:
+        return True
+    # Monthly partitions of app_analytics are managed by services.partitions
+    if type_ == "table" and name.startswith("app_analytics_p"):
+        return False
+    if type_ == "column" and name in SEARCH_COLUMNS:
+        return False
+    return not (type_ == "index" and name in SEARCH_INDEXES)
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
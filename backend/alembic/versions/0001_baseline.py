@@ -0,0 +1,227 @@
+"""Baseline schema
+
+The tables as ``Base.metadata.create_all`` used to create them at startup.
+Databases created that way are adopted with ``alembic stamp 0001`` before
+``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+USER_ROLE = sa.Enum(
+    "ADMIN", "EXECUTIVE", "BUSINESS_MANAGER", "MARKETING_MANAGER", "PRODUCT_MANAGER", "DEVELOPER", "ANALYST",
+    name="userrole"
+)
+APP_TYPE = sa.Enum("MOBILE_APP", "GAME", "WEB_APP", name="apptype")
+PLATFORM = sa.Enum("ANDROID", "IOS", "WEB", "CROSS_PLATFORM", name="platform")
+APP_STATUS = sa.Enum("DRAFT", "IN_REVIEW", "APPROVED", "PUBLISHED", "SUSPENDED", "ARCHIVED", name="appstatus")
+METADATA_STATUS = sa.Enum("PENDING", "EXTRACTING", "APPLYING", "DONE", "FAILED", "SKIPPED", name="metadatastatus")
+ROLLUP_PERIOD = sa.Enum("DAY", "WEEK", "MONTH", name="rollupperiod")
+
+def _timestamp(name: str, **kwargs) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), **kwargs)
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("avatar_url", sa.String(), nullable=True),
+        sa.Column("google_id", sa.String(), nullable=True),
+        sa.Column("role", USER_ROLE, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+        _timestamp("last_login", nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_google_id", "users", ["google_id"], unique=True)
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+
+    op.create_table(
+        "apps",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("package_name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("app_type", APP_TYPE, nullable=False),
+        sa.Column("platform", PLATFORM, nullable=False),
+        sa.Column("version", sa.String(), nullable=False),
+        sa.Column("build_number", sa.Integer()),
+        sa.Column("status", APP_STATUS, nullable=False),
+        sa.Column("is_published", sa.Boolean()),
+        sa.Column("icon_url", sa.String(), nullable=True),
+        sa.Column("screenshots", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("tags", sa.Text(), nullable=True),
+        sa.Column("target_audience", sa.String(), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("assigned_pm", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("assigned_marketing", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+        _timestamp("published_at", nullable=True),
+    )
+    op.create_index("ix_apps_id", "apps", ["id"])
+    op.create_index("ix_apps_name", "apps", ["name"])
+    op.create_index("ix_apps_package_name", "apps", ["package_name"], unique=True)
+    op.create_index("ix_apps_created_at_id", "apps", ["created_at", "id"])
+
+    op.create_table(
+        "app_artifacts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("extension", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("storage_path", sa.String(), nullable=False),
+        sa.Column("uploaded_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        sa.Column("metadata_status", METADATA_STATUS, nullable=False),
+        sa.Column("metadata_error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_app_artifacts_id", "app_artifacts", ["id"])
+    op.create_index("ix_app_artifacts_app_id", "app_artifacts", ["app_id"])
+    op.create_index("ix_app_artifacts_sha256", "app_artifacts", ["sha256"])
+
+    op.create_table(
+        "artifact_uploads",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("offset", sa.BigInteger(), nullable=False),
+        sa.Column("expected_sha256", sa.String(64), nullable=True),
+        sa.Column("uploaded_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_artifact_uploads_app_id", "artifact_uploads", ["app_id"])
+
+    op.create_table(
+        "artifact_metadata",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("platform", sa.String(), nullable=True),
+        sa.Column("package_name", sa.String(), nullable=True),
+        sa.Column("version", sa.String(), nullable=True),
+        sa.Column("build_number", sa.Integer(), nullable=True),
+        sa.Column("icon_path", sa.String(), nullable=True),
+        _timestamp("created_at", server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "app_analytics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), nullable=False),
+        sa.Column("daily_active_users", sa.Integer()),
+        sa.Column("monthly_active_users", sa.Integer()),
+        sa.Column("new_users", sa.Integer()),
+        sa.Column("returning_users", sa.Integer()),
+        sa.Column("session_duration_avg", sa.Float()),
+        sa.Column("sessions_per_user", sa.Float()),
+        sa.Column("retention_day_1", sa.Float()),
+        sa.Column("retention_day_7", sa.Float()),
+        sa.Column("retention_day_30", sa.Float()),
+        sa.Column("revenue", sa.Float()),
+        sa.Column("in_app_purchases", sa.Float()),
+        sa.Column("ad_revenue", sa.Float()),
+        sa.Column("arpu", sa.Float()),
+        sa.Column("crash_rate", sa.Float()),
+        sa.Column("app_store_rating", sa.Float()),
+        sa.Column("app_store_reviews_count", sa.Integer()),
+        _timestamp("date", nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        sa.UniqueConstraint("app_id", "date", name="uq_app_analytics_app_date"),
+    )
+    op.create_index("ix_app_analytics_id", "app_analytics", ["id"])
+    op.create_index("ix_app_analytics_date", "app_analytics", ["date"])
+
+    op.create_table(
+        "app_analytics_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), nullable=False),
+        sa.Column("period", ROLLUP_PERIOD, nullable=False),
+        sa.Column("bucket_start", sa.Date(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("daily_active_users", sa.Integer(), nullable=False),
+        sa.Column("new_users", sa.Integer(), nullable=False),
+        sa.Column("returning_users", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("in_app_purchases", sa.Float(), nullable=False),
+        sa.Column("ad_revenue", sa.Float(), nullable=False),
+        sa.Column("retention_day_1_sum", sa.Float(), nullable=False),
+        sa.Column("retention_day_7_sum", sa.Float(), nullable=False),
+        sa.Column("retention_day_30_sum", sa.Float(), nullable=False),
+        sa.Column("crash_rate_sum", sa.Float(), nullable=False),
+        sa.Column("app_store_rating_sum", sa.Float(), nullable=False),
+        sa.Column("monthly_active_users_peak", sa.Integer(), nullable=False),
+        _timestamp("updated_at", server_default=sa.func.now()),
+        sa.UniqueConstraint("app_id", "period", "bucket_start", name="uq_app_analytics_rollups_bucket"),
+    )
+    op.create_index("ix_app_analytics_rollups_id", "app_analytics_rollups", ["id"])
+
+    op.create_table(
+        "marketing_campaigns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), nullable=False),
+        sa.Column("campaign_type", sa.String(), nullable=False),
+        sa.Column("budget", sa.Float()),
+        sa.Column("spent", sa.Float()),
+        sa.Column("is_active", sa.Boolean()),
+        _timestamp("start_date", nullable=False),
+        _timestamp("end_date", nullable=True),
+        sa.Column("impressions", sa.Integer()),
+        sa.Column("clicks", sa.Integer()),
+        sa.Column("installs", sa.Integer()),
+        sa.Column("cost_per_install", sa.Float()),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+        sa.UniqueConstraint("app_id", "name", name="uq_marketing_campaigns_app_name"),
+    )
+    op.create_index("ix_marketing_campaigns_id", "marketing_campaigns", ["id"])
+
+    op.create_table(
+        "business_metrics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), nullable=False),
+        sa.Column("revenue_total", sa.Float()),
+        sa.Column("revenue_subscriptions", sa.Float()),
+        sa.Column("revenue_one_time", sa.Float()),
+        sa.Column("revenue_ads", sa.Float()),
+        sa.Column("development_cost", sa.Float()),
+        sa.Column("marketing_cost", sa.Float()),
+        sa.Column("operational_cost", sa.Float()),
+        sa.Column("customer_acquisition_cost", sa.Float()),
+        sa.Column("lifetime_value", sa.Float()),
+        sa.Column("churn_rate", sa.Float()),
+        _timestamp("month", nullable=False),
+        _timestamp("created_at", server_default=sa.func.now()),
+        sa.UniqueConstraint("app_id", "month", name="uq_business_metrics_app_month"),
+    )
+    op.create_index("ix_business_metrics_id", "business_metrics", ["id"])
+    op.create_index("ix_business_metrics_month", "business_metrics", ["month"])
+
+def downgrade() -> None:
+    for table in (
+        "business_metrics", "marketing_campaigns", "app_analytics_rollups", "app_analytics",
+        "artifact_metadata", "artifact_uploads", "app_artifacts", "apps", "users"
+    ):
+        op.drop_table(table)
+    bind = op.get_bind()
+    for enum in (ROLLUP_PERIOD, METADATA_STATUS, APP_STATUS, PLATFORM, APP_TYPE, USER_ROLE):
+        enum.drop(bind, checkfirst=True)
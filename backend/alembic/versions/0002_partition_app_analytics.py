@@ -0,0 +1,121 @@
+"""Partition app_analytics by month
+
+Postgres only: rebuilds ``app_analytics`` as ``PARTITION BY RANGE (date)``
+with one partition per month (see ``app.services.partitions``). A partitioned
+table's primary key must include the partition key, so it becomes
+(id, date); ``uq_app_analytics_app_date`` already does. Existing rows are
+copied over, so run this in a maintenance window on large tables. Other
+databases keep the plain table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Partitions created beyond the current month
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id", "app_id", "daily_active_users", "monthly_active_users", "new_users", "returning_users",
+    "session_duration_avg", "sessions_per_user", "retention_day_1", "retention_day_7", "retention_day_30",
+    "revenue", "in_app_purchases", "ad_revenue", "arpu", "crash_rate", "app_store_rating",
+    "app_store_reviews_count", "date", "created_at"
+)
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _rename_old(suffix: str) -> None:
+    """Move the current table and its index names out of the way"""
+    op.execute(f"ALTER TABLE app_analytics RENAME TO app_analytics_{suffix}")
+    op.execute(f"ALTER TABLE app_analytics_{suffix} RENAME CONSTRAINT app_analytics_pkey TO app_analytics_{suffix}_pkey")
+    op.execute(
+        f"ALTER TABLE app_analytics_{suffix} "
+        f"RENAME CONSTRAINT uq_app_analytics_app_date TO uq_app_analytics_{suffix}_app_date"
+    )
+    op.execute(f"ALTER INDEX ix_app_analytics_id RENAME TO ix_app_analytics_{suffix}_id")
+    op.execute(f"ALTER INDEX ix_app_analytics_date RENAME TO ix_app_analytics_{suffix}_date")
+
+def _create_table(partitioned: bool) -> None:
+    op.create_table(
+        "app_analytics",
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('app_analytics_id_seq'::regclass)"), nullable=False),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), nullable=False),
+        sa.Column("daily_active_users", sa.Integer()),
+        sa.Column("monthly_active_users", sa.Integer()),
+        sa.Column("new_users", sa.Integer()),
+        sa.Column("returning_users", sa.Integer()),
+        sa.Column("session_duration_avg", sa.Float()),
+        sa.Column("sessions_per_user", sa.Float()),
+        sa.Column("retention_day_1", sa.Float()),
+        sa.Column("retention_day_7", sa.Float()),
+        sa.Column("retention_day_30", sa.Float()),
+        sa.Column("revenue", sa.Float()),
+        sa.Column("in_app_purchases", sa.Float()),
+        sa.Column("ad_revenue", sa.Float()),
+        sa.Column("arpu", sa.Float()),
+        sa.Column("crash_rate", sa.Float()),
+        sa.Column("app_store_rating", sa.Float()),
+        sa.Column("app_store_reviews_count", sa.Integer()),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint(*(("id", "date") if partitioned else ("id",)), name="app_analytics_pkey"),
+        sa.UniqueConstraint("app_id", "date", name="uq_app_analytics_app_date"),
+        **({"postgresql_partition_by": "RANGE (date)"} if partitioned else {})
+    )
+    op.create_index("ix_app_analytics_id", "app_analytics", ["id"])
+    op.create_index("ix_app_analytics_date", "app_analytics", ["date"])
+    op.execute("ALTER SEQUENCE app_analytics_id_seq OWNED BY app_analytics.id")
+
+def _copy_from(suffix: str) -> None:
+    columns = ", ".join(COLUMNS)
+    op.execute(f"INSERT INTO app_analytics ({columns}) SELECT {columns} FROM app_analytics_{suffix}")
+    op.execute(f"DROP TABLE app_analytics_{suffix}")
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    _rename_old("unpartitioned")
+    _create_table(partitioned=True)
+
+    # One partition per month from the oldest row through MONTHS_AHEAD from now
+    oldest = bind.execute(sa.text(
+        "SELECT min(date AT TIME ZONE 'UTC')::date FROM app_analytics_unpartitioned"
+    )).scalar()
+    current = date.today().replace(day=1)
+    month = min(oldest.replace(day=1), current) if oldest else current
+    newest = bind.execute(sa.text(
+        "SELECT max(date AT TIME ZONE 'UTC')::date FROM app_analytics_unpartitioned"
+    )).scalar()
+    last = max(newest.replace(day=1) if newest else current, _add_months(current, MONTHS_AHEAD))
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE app_analytics_p{month.year:04d}_{month.month:02d} PARTITION OF app_analytics "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+
+    _copy_from("unpartitioned")
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    _rename_old("partitioned")
+    _create_table(partitioned=False)
+    # Only rows in still-attached partitions come back
+    _copy_from("partitioned")
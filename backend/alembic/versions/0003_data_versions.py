@@ -0,0 +1,27 @@
+"""Add data_versions
+
+Per-dataset change counters behind the ETags of read endpoints.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    table = op.create_table(
+        "data_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.bulk_insert(table, [{"name": "apps", "version": 0}, {"name": "analytics", "version": 0}])
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
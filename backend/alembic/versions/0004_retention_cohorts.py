@@ -0,0 +1,34 @@
+"""Add retention_cohorts
+
+Users retained per app, install day and day since install (day 0 holds the
+installs), behind the cohort matrix endpoint.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "retention_cohorts",
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id"), primary_key=True),
+        sa.Column("install_date", sa.Date(), primary_key=True),
+        sa.Column("day_n", sa.SmallInteger(), primary_key=True),
+        sa.Column("users", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_retention_cohorts_install_date", "retention_cohorts", ["install_date", "day_n"])
+    op.bulk_insert(sa.table("data_versions", sa.column("name", sa.String), sa.column("version", sa.BigInteger)), [
+        {"name": "cohorts", "version": 0}
+    ])
+
+def downgrade() -> None:
+    op.execute("DELETE FROM data_versions WHERE name = 'cohorts'")
+    op.drop_index("ix_retention_cohorts_install_date", table_name="retention_cohorts")
+    op.drop_table("retention_cohorts")
@@ -0,0 +1,64 @@
+"""Add search documents and trigram indexes
+
+Weighted ``search_document`` tsvectors (generated columns) with GIN indexes,
+and pg_trgm GIN indexes on the identifying columns of apps and users, behind
+``/apps/search`` and ``/users/search``. Postgres only: elsewhere search runs
+on an in-memory index. Also starts the users data version.
+
+The generated columns are not mapped on the models; ``app.services.search``
+refers to them by name.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Package names and emails are split into words: the parser would keep them whole
+APP_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', translate(package_name, '._-', '   ')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(tags, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+"""
+USER_DOCUMENT = """
+    setweight(to_tsvector('simple', full_name), 'A') ||
+    setweight(to_tsvector('simple', translate(email, '@._-+', '     ')), 'A')
+"""
+
+TRIGRAM_INDEXES = [
+    ("ix_apps_name_trgm", "apps", "name"),
+    ("ix_apps_package_name_trgm", "apps", "package_name"),
+    ("ix_users_full_name_trgm", "users", "full_name"),
+    ("ix_users_email_trgm", "users", "email"),
+]
+
+def upgrade() -> None:
+    op.bulk_insert(sa.table("data_versions", sa.column("name", sa.String), sa.column("version", sa.BigInteger)), [
+        {"name": "users", "version": 0}
+    ])
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, document in (("apps", APP_DOCUMENT), ("users", USER_DOCUMENT)):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN search_document tsvector GENERATED ALWAYS AS ({document}) STORED")
+        op.execute(f"CREATE INDEX ix_{table}_search_document ON {table} USING gin (search_document)")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX {name}")
+        for table in ("apps", "users"):
+            op.execute(f"DROP INDEX ix_{table}_search_document")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_document")
+    op.execute("DELETE FROM data_versions WHERE name = 'users'")
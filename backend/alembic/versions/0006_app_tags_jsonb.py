@@ -0,0 +1,56 @@
+"""Store app tags and screenshots as jsonb
+
+``apps.tags`` and ``apps.screenshots`` held JSON arrays as text. On Postgres
+they become jsonb, and tags get a GIN index for the ``tags_any``/``tags_all``
+filters. The search document generated from tags (0005) is rebuilt on the
+jsonb column. On other databases the columns keep their JSON text, which the
+models' JSON type reads as is.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def _document(tags: str) -> str:
+    return f"""
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', translate(package_name, '._-', '   ')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('simple', {tags}), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    """
+
+def _replace_document(document: str) -> None:
+    op.execute(f"ALTER TABLE apps ADD COLUMN search_document tsvector GENERATED ALWAYS AS ({document}) STORED")
+    op.execute("CREATE INDEX ix_apps_search_document ON apps USING gin (search_document)")
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # The generated column reads tags, so it goes first and is rebuilt after
+    op.execute("ALTER TABLE apps DROP COLUMN search_document")
+    for column in ("tags", "screenshots"):
+        op.execute(
+            f"ALTER TABLE apps ALTER COLUMN {column} TYPE jsonb "
+            f"USING CASE WHEN btrim({column}) = '' THEN NULL ELSE {column}::jsonb END"
+        )
+    op.execute("CREATE INDEX ix_apps_tags ON apps USING gin (tags)")
+    # to_tsvector of jsonb indexes its string values
+    _replace_document(_document("coalesce(tags, '[]'::jsonb)"))
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE apps DROP COLUMN search_document")
+    op.execute("DROP INDEX ix_apps_tags")
+    for column in ("tags", "screenshots"):
+        op.execute(f"ALTER TABLE apps ALTER COLUMN {column} TYPE text USING {column}::text")
+    _replace_document(_document("coalesce(tags, '')"))
@@ -0,0 +1,41 @@
+"""Add app_members
+
+One row per user an app involves (creator, product manager, marketing
+manager), kept in step with apps by app.services.membership. The primary key
+(user_id, app_id, role) covers the role-scoped app listings and permission
+checks, which used to OR three unindexed apps columns.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+MEMBER_ROLE = sa.Enum("OWNER", "PRODUCT_MANAGER", "MARKETING", name="memberrole")
+
+MEMBER_COLUMNS = {"created_by": "OWNER", "assigned_pm": "PRODUCT_MANAGER", "assigned_marketing": "MARKETING"}
+
+def upgrade() -> None:
+    op.create_table(
+        "app_members",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("app_id", sa.Integer(), sa.ForeignKey("apps.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("role", MEMBER_ROLE, primary_key=True),
+    )
+    op.create_index("ix_app_members_app_id", "app_members", ["app_id"])
+    for column, role in MEMBER_COLUMNS.items():
+        op.execute(
+            f"INSERT INTO app_members (user_id, app_id, role) "
+            f"SELECT {column}, id, '{role}' FROM apps WHERE {column} IS NOT NULL"
+        )
+
+def downgrade() -> None:
+    op.drop_index("ix_app_members_app_id", table_name="app_members")
+    op.drop_table("app_members")
+    MEMBER_ROLE.drop(op.get_bind(), checkfirst=True)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, users, apps, analytics, dashboard
+from .endpoints import auth, users, apps, analytics, dashboard, jobs, media, marketing, business
 
 api_router = APIRouter()
 
@@ -9,5 +9,7 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(apps.router, prefix="/apps", tags=["applications"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
-
-
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(media.router, prefix="/media", tags=["media"])
+api_router.include_router(marketing.router, prefix="/marketing", tags=["marketing"])
+api_router.include_router(business.router, prefix="/business", tags=["business"])
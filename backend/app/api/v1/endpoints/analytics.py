@@ -1,78 +1,293 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta
 
 from ....core.database import get_db
-from ....core.auth import get_current_user
-from ....models.user import User, UserRole
-from ....models.analytics import AppAnalytics
+from ....core.auth import get_current_user, require_role
+from ....core.conditional import Conditional
+from ....core.serialization import respond
+from ....models.user import UserRole
+from ....models.analytics import AppAnalytics, BusinessMetrics
+from ....models.app import AppMember
+from ....schemas.user import CurrentUser
+from ....schemas.cohort import CohortMatrix
+from ....schemas.ingest import IngestDataset, DataFormat, IngestReport
+from ....schemas.job import Job
+from ....core.jobs import enqueue
+from ....services.tasks import REBUILD_ROLLUPS
+from ....services.cohorts import cohort_report, retention_rate
+from ....services.rollups import query_rollups, average
+from ....services.ingest import ingest, DEFAULT_BATCH_SIZE
+from ....services.versions import ANALYTICS, COHORTS, get_versions
+from ....services.export import stream_export, MEDIA_TYPES
+from ....services.membership import member_app_ids
+from .business import BUSINESS_ROLES
 
 router = APIRouter()
 
+# Roles allowed to read per-app analytics (detail views and exports)
+APP_ANALYTICS_ROLES = [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.ANALYST, UserRole.PRODUCT_MANAGER]
+# Roles allowed to read portfolio-wide analytics
+PORTFOLIO_ROLES = [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.ANALYST]
+
+async def _check_app_scope(db: AsyncSession, current_user: CurrentUser, app_ids: Optional[List[int]],
+                           portfolio_roles: List[UserRole] = PORTFOLIO_ROLES) -> None:
+    """Roles outside ``portfolio_roles`` must name apps, and only apps they are members of"""
+    if current_user.role in portfolio_roles:
+        return
+    if not app_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions for portfolio-wide data; pass app_id"
+        )
+    members = set((await db.scalars(
+        member_app_ids(current_user.id).where(AppMember.app_id.in_(app_ids))
+    )).all())
+    if not members.issuperset(app_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+def _date_range(start_date: Optional[date], end_date: Optional[date]) -> Tuple[datetime, datetime]:
+    """Midnights of the requested range; by default the 30 days up to today, stable all day"""
+    end = end_date or date.today()
+    start = start_date or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
 @router.get("/overview")
 async def get_analytics_overview(
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    start_date: Optional[date] = Query(None, description="First day (default: 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day (default: today)"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get analytics overview"""
     # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.ANALYST]:
+    if current_user.role not in PORTFOLIO_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    # Parse dates
-    end_dt = datetime.now()
-    start_dt = end_dt - timedelta(days=30)
-    
-    if start_date:
-        start_dt = datetime.fromisoformat(start_date)
-    if end_date:
-        end_dt = datetime.fromisoformat(end_date)
-    
-    # TODO: Implement actual analytics queries
-    # For now, return mock data
-    return {
-        "total_users": 125000,
-        "total_revenue": 85000,
-        "total_downloads": 2500000,
-        "avg_rating": 4.3,
+    start_dt, end_dt = _date_range(start_date, end_date)
+    
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, start_dt, end_dt, last_modified=modified):
+        return not_modified
+    
+    # Combine the coarsest rollup buckets covering the range
+    per_app = await query_rollups(db, start_dt.date(), end_dt.date())
+    
+    totals = {"row_count": 0, "app_store_rating_sum": 0.0}
+    for app_totals in per_app.values():
+        totals["row_count"] += app_totals["row_count"] or 0
+        totals["app_store_rating_sum"] += app_totals["app_store_rating_sum"] or 0
+    
+    return ORJSONResponse({
+        "total_users": sum(t["monthly_active_users_peak"] or 0 for t in per_app.values()),
+        "total_revenue": sum(t["revenue"] or 0 for t in per_app.values()),
+        "total_downloads": sum(t["new_users"] or 0 for t in per_app.values()),
+        "avg_rating": round(average(totals, "app_store_rating_sum"), 2),
         "period": {
             "start_date": start_dt.isoformat(),
             "end_date": end_dt.isoformat()
         }
-    }
+    }, headers=cache.headers)
 
 @router.get("/apps/{app_id}")
 async def get_app_analytics(
     app_id: int,
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    start_date: Optional[date] = Query(None, description="First day (default: 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day (default: today)"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get analytics for specific app"""
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.ANALYST, UserRole.PRODUCT_MANAGER]:
+    # Check permissions; other roles only see the apps they are members of
+    if current_user.role not in APP_ANALYTICS_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    await _check_app_scope(db, current_user, [app_id])
+    
+    start_dt, end_dt = _date_range(start_date, end_date)
+    
+    version, modified = await get_versions(db, ANALYTICS, COHORTS)
+    if not_modified := cache.check(version, start_dt, end_dt, date.today(), last_modified=modified):
+        return not_modified
     
-    # TODO: Implement actual app analytics queries
-    # For now, return mock data
-    return {
+    # Combine the coarsest rollup buckets covering the range
+    per_app = await query_rollups(db, start_dt.date(), end_dt.date(), app_ids=[app_id])
+    totals = per_app.get(app_id, {"row_count": 0})
+    
+    # Day-7 retention of the range's install cohorts, weighted by cohort size;
+    # the plain average of the daily figures for apps without cohort data
+    rate = await retention_rate(db, start_dt.date(), end_dt.date(), 7, app_ids=[app_id])
+    if rate is None:
+        rate = average(totals, "retention_day_7_sum") / 100
+    
+    return ORJSONResponse({
         "app_id": app_id,
-        "daily_active_users": 15000,
-        "monthly_active_users": 45000,
-        "revenue": 12000,
-        "downloads": 350000,
-        "rating": 4.5,
-        "retention_rate": 0.65
-    }
+        "daily_active_users": round(average(totals, "daily_active_users")),
+        "monthly_active_users": totals.get("monthly_active_users_peak") or 0,
+        "revenue": totals.get("revenue") or 0,
+        "downloads": totals.get("new_users") or 0,
+        "rating": round(average(totals, "app_store_rating_sum"), 2),
+        "retention_rate": round(rate, 4),
+        "period": {
+            "start_date": start_dt.isoformat(),
+            "end_date": end_dt.isoformat()
+        }
+    }, headers=cache.headers)
 
+# Largest cohort matrix one request may cover
+COHORT_MAX_INSTALL_DAYS = 730
+COHORT_MAX_DAY = 365
 
+@router.get("/cohorts", response_model=CohortMatrix)
+async def get_retention_cohorts(
+    app_id: Optional[List[int]] = Query(None, description="Limit to these apps (repeatable); all apps if omitted"),
+    start_date: Optional[date] = Query(None, description="First install day (default: 180 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last install day (default: yesterday)"),
+    max_day: int = Query(90, ge=1, le=COHORT_MAX_DAY),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Retention triangle by install day and the size-weighted retention curve"""
+    # Check permissions; other roles only see the apps they are members of
+    if current_user.role not in APP_ANALYTICS_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    await _check_app_scope(db, current_user, app_id)
+    
+    end = end_date or date.today() - timedelta(days=1)
+    start = start_date or end - timedelta(days=179)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    if (end - start).days + 1 > COHORT_MAX_INSTALL_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {COHORT_MAX_INSTALL_DAYS} install days per request"
+        )
+    
+    # Activity is complete up to yesterday; the triangle grows a diagonal a day
+    as_of = date.today() - timedelta(days=1)
+    version, modified = await get_versions(db, COHORTS)
+    if not_modified := cache.check(version, start, end, as_of, last_modified=modified):
+        return not_modified
+    
+    report = await cohort_report(db, start, end, max_day, as_of, app_ids=app_id)
+    return respond(CohortMatrix, report, headers=cache.headers)
+
+@router.post("/ingest/{dataset}", response_model=IngestReport)
+async def ingest_dataset(
+    dataset: IngestDataset,
+    request: Request,
+    format: DataFormat = Query(DataFormat.CSV),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk load CSV/NDJSON rows from the request body (Admin only)"""
+    report = await ingest(
+        db,
+        dataset,
+        request.stream(),
+        fmt=format,
+        batch_size=batch_size,
+        created_by=current_user.id
+    )
+    return respond(IngestReport, report)
+
+@router.post("/rollups/rebuild", response_model=Job)
+async def rebuild_analytics_rollups(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    app_id: Optional[int] = Query(None),
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN]))
+):
+    """Queue a rebuild of analytics rollups from raw rows (Admin only)"""
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    job = await enqueue(
+        REBUILD_ROLLUPS,
+        {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "app_ids": [app_id] if app_id is not None else None
+        },
+        created_by=current_user.id
+    )
+    return respond(Job, job)
+
+# Tables that can be exported: the column holding the row date, the roles
+# allowed to export it and those of them allowed every app (business metrics
+# follow the /business endpoints)
+EXPORT_TABLES = {
+    "app_analytics": (AppAnalytics.__table__, "date", APP_ANALYTICS_ROLES, PORTFOLIO_ROLES),
+    "business_metrics": (BusinessMetrics.__table__, "month", BUSINESS_ROLES, BUSINESS_ROLES),
+}
+
+@router.get("/export/{table_name}")
+async def export_analytics(
+    table_name: str,
+    app_id: Optional[int] = Query(None),
+    start_date: Optional[date] = Query(None, description="First day (default: 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    format: DataFormat = Query(DataFormat.CSV),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream per-app metrics as CSV or NDJSON"""
+    if table_name not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    table, date_column, roles, portfolio_roles = EXPORT_TABLES[table_name]
+    
+    # Check permissions; other roles only export the apps they are members of
+    if current_user.role not in roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    await _check_app_scope(db, current_user, [app_id] if app_id is not None else None, portfolio_roles)
+    
+    end = end_date or date.today()
+    start = start_date or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    
+    filename = f"{table_name}_{start}_{end}.{format.value}"
+    return StreamingResponse(
+        stream_export(
+            table.name, date_column, datetime.combine(start, datetime.min.time()),
+            datetime.combine(end + timedelta(days=1), datetime.min.time()), app_id, format
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,185 +1,474 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Header, Query, Request
+from sqlalchemy import Text, distinct, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import json
 
 from ....core.database import get_db
 from ....core.auth import get_current_user
+from ....core.config import settings
+from ....core.conditional import Conditional
+from ....core.pagination import PageParams, paginate
+from ....core.serialization import respond
 from ....models.user import User, UserRole
-from ....models.app import App, AppStatus
-from ....schemas.app import AppResponse, AppCreate, AppUpdate, AppListResponse
+from ....models.app import App, AppArtifact, AppMember, AppStatus, ArtifactUpload, MemberRole
+from ....schemas.app import (
+    AppResponse, AppCreate, AppUpdate, AppListResponse, AppBatchResponse, AppBulkUpdate, AppBulkUpdateResponse
+)
+from ....schemas.artifact import ArtifactResponse, UploadInit, UploadStatus
+from ....schemas.user import CurrentUser
+from ....schemas.pagination import PaginatedResponse
+from ....schemas.search import SearchMode, SearchResults
+from ....core.jobs import enqueue
+from ....services.membership import APP_MANAGER_ROLES, EDITOR_ROLES, app_scope, can_access, member_app_ids
+from ....services.search import APP_SEARCH, search, search_hits
+from ....services.tasks import EXTRACT_ARTIFACT
+from ....services.versions import APPS, get_versions
+from ....services.uploads import (
+    REHASH_BLOCK_SIZE, UPLOAD_CHUNK_SIZE, abort_upload, append_chunk, complete_upload, open_upload, store_stream
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AppListResponse])
+# Columns AppUpdate may not set to null
+REQUIRED_FIELDS = ("name", "version", "status")
+
+async def _get_app(db: AsyncSession, app_id: int, current_user: CurrentUser,
+                   roles: Optional[List[MemberRole]] = None,
+                   managers: List[UserRole] = APP_MANAGER_ROLES) -> App:
+    """The app, if the user may act on it as one of ``roles`` (any member if None) or one of ``managers``"""
+    app = await db.get(App, app_id)
+    if not app:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="App not found"
+        )
+    
+    # Check permissions
+    if not await can_access(db, app_id, current_user, roles, managers):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return app
+
+# User columns AppUpdate may set
+ASSIGNEE_FIELDS = ("assigned_pm", "assigned_marketing")
+
+def _assignees(app_update: AppUpdate) -> set:
+    return {getattr(app_update, field) for field in ASSIGNEE_FIELDS} - {None}
+
+def _update_error(app_update: AppUpdate, known_users: set) -> Optional[str]:
+    """Why ``app_update`` cannot be applied, given the existing ids among its assignees, or None"""
+    fields = app_update.model_fields_set
+    if any(field in fields and getattr(app_update, field) is None for field in REQUIRED_FIELDS):
+        return "name, version and status cannot be null"
+    if not _assignees(app_update) <= known_users:
+        return "Assigned user not found"
+    return None
+
+def _apply_update(app: App, app_update: AppUpdate) -> None:
+    update_data = app_update.model_dump(exclude_unset=True, exclude={'id'})
+    for field, value in update_data.items():
+        setattr(app, field, value)
+
+def _parse_tags(values: Optional[List[str]]) -> List[str]:
+    """Tags from repeated and/or comma-separated query values, deduplicated in order"""
+    return list(dict.fromkeys(part.strip() for value in values or () for part in value.split(",") if part.strip()))
+
+def _tags_filter(dialect: str, tags_any: List[str], tags_all: List[str]):
+    """Where-clause for apps tagged with any of ``tags_any`` and all of ``tags_all``, or None"""
+    clauses = []
+    if dialect == "postgresql":
+        # Both operators are served by the GIN index on tags
+        if tags_any:
+            clauses.append(App.tags.bool_op("?|")(literal(tags_any, ARRAY(Text))))
+        if tags_all:
+            clauses.append(App.tags.bool_op("@>")(literal(tags_all, JSONB)))
+    else:
+        tag = func.json_each(App.tags).table_valued("value")
+        if tags_any:
+            clauses.append(exists().select_from(tag).where(tag.c.value.in_(tags_any)))
+        if tags_all:
+            clauses.append(
+                select(func.count(distinct(tag.c.value))).where(tag.c.value.in_(tags_all)).scalar_subquery()
+                == len(tags_all)
+            )
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else clauses[0] & clauses[1]
+
+def _parse_ids(values: List[str]) -> List[int]:
+    """IDs from repeated and/or comma-separated query values, deduplicated in order"""
+    try:
+        ids = [int(part) for value in values for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be integers"
+        )
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_MAX_ITEMS} ids per request"
+        )
+    return ids
+
+@router.get("/", response_model=PaginatedResponse[AppListResponse])
 async def get_apps(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    page_params: PageParams = Depends(),
     status_filter: Optional[AppStatus] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    tags_any: Optional[List[str]] = Query(None, description="Apps with any of these tags (comma-separated and/or repeated)"),
+    tags_all: Optional[List[str]] = Query(None, description="Apps with all of these tags (comma-separated and/or repeated)"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get list of apps"""
-    query = db.query(App)
+    version, modified = await get_versions(db, APPS)
+    if not_modified := cache.check(version, current_user.id, current_user.role, last_modified=modified):
+        return not_modified
+    
+    query = select(App)
     
     # Filter by status if provided
     if status_filter:
-        query = query.filter(App.status == status_filter)
-    
-    # Role-based filtering
-    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE]:
-        # Non-admin users can only see apps they're involved with
-        query = query.filter(
-            (App.created_by == current_user.id) |
-            (App.assigned_pm == current_user.id) |
-            (App.assigned_marketing == current_user.id)
+        query = query.where(App.status == status_filter)
+    
+    tagged = _tags_filter(db.bind.dialect.name, _parse_tags(tags_any), _parse_tags(tags_all))
+    if tagged is not None:
+        query = query.where(tagged)
+    
+    # Role-based filtering: non-admin users only see apps they're members of
+    visible = app_scope(current_user)
+    if visible is not None:
+        query = query.where(visible)
+    
+    page = await paginate(db, query, App, page_params)
+    return respond(PaginatedResponse[AppListResponse], page, headers=cache.headers)
+
+@router.get("/search", response_model=SearchResults[AppListResponse])
+async def search_apps(
+    q: str = Query(..., min_length=1, max_length=100,
+                   description="Words of the name, package name, category, tags or description"),
+    mode: SearchMode = SearchMode.AUTO,
+    limit: int = Query(20, ge=1, le=100),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search the apps the user can see, best match first"""
+    version, modified = await get_versions(db, APPS)
+    if not_modified := cache.check(version, current_user.id, current_user.role, last_modified=modified):
+        return not_modified
+    
+    results = await search(db, APP_SEARCH, q, mode, limit, where=app_scope(current_user))
+    return respond(SearchResults[AppListResponse], {
+        "query": q, "mode": mode, "items": search_hits(results)
+    }, headers=cache.headers)
+
+@router.get("/batch", response_model=AppBatchResponse)
+async def get_apps_batch(
+    ids: List[str] = Query(..., description="App IDs, comma-separated and/or repeated"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get several apps in one query; ids the user cannot see are listed as missing"""
+    app_ids = _parse_ids(ids)
+    version, modified = await get_versions(db, APPS)
+    if not_modified := cache.check(version, current_user.id, current_user.role, last_modified=modified):
+        return not_modified
+    
+    query = select(App).where(App.id.in_(app_ids))
+    visible = app_scope(current_user)
+    if visible is not None:
+        query = query.where(visible)
+    found = {app.id: app for app in await db.scalars(query)}
+    
+    return respond(AppBatchResponse, {
+        "items": [found[app_id] for app_id in app_ids if app_id in found],
+        "missing": [app_id for app_id in app_ids if app_id not in found]
+    }, headers=cache.headers)
+
+@router.patch("/batch", response_model=AppBulkUpdateResponse)
+async def bulk_update_apps(
+    bulk_update: AppBulkUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update many apps in one transaction, with a result per app"""
+    changes = bulk_update.expand()
+    if len(changes) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_MAX_ITEMS} apps per request"
         )
     
-    apps = query.offset(skip).limit(limit).all()
-    return [AppListResponse.model_validate(app) for app in apps]
+    apps = {app.id: app for app in await db.scalars(select(App).where(App.id.in_([app_id for app_id, _ in changes])))}
+    
+    # Check referenced users up front, so one bad item cannot fail the commit
+    user_ids = set().union(*(_assignees(app_update) for _, app_update in changes))
+    known_users = set(await db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    editable = None
+    if current_user.role not in APP_MANAGER_ROLES:
+        editable = set(await db.scalars(
+            member_app_ids(current_user.id, EDITOR_ROLES).where(AppMember.app_id.in_(list(apps)))
+        ))
+    
+    results = []
+    for app_id, app_update in changes:
+        app = apps.get(app_id)
+        if app is None:
+            results.append({"id": app_id, "status_code": status.HTTP_404_NOT_FOUND, "detail": "App not found"})
+        elif editable is not None and app_id not in editable:
+            results.append({"id": app_id, "status_code": status.HTTP_403_FORBIDDEN, "detail": "Not enough permissions"})
+        elif error := _update_error(app_update, known_users):
+            results.append({"id": app_id, "status_code": status.HTTP_400_BAD_REQUEST, "detail": error})
+        else:
+            _apply_update(app, app_update)
+            results.append({"id": app_id, "status_code": status.HTTP_200_OK})
+    
+    updated_ids = [result["id"] for result in results if result["status_code"] == status.HTTP_200_OK]
+    if bulk_update.atomic and len(updated_ids) < len(results):
+        await db.rollback()
+        for result in results:
+            if result["status_code"] == status.HTTP_200_OK:
+                result.update(status_code=status.HTTP_409_CONFLICT, detail="Not applied: another item failed")
+        return respond(AppBulkUpdateResponse, {"results": results, "updated": 0})
+    
+    await db.commit()
+    
+    # Reload server-set columns (updated_at) for every updated app in one query
+    if updated_ids:
+        refreshed = await db.scalars(
+            select(App).where(App.id.in_(updated_ids)).execution_options(populate_existing=True)
+        )
+        apps = {app.id: app for app in refreshed}
+        for result in results:
+            if result["status_code"] == status.HTTP_200_OK:
+                result["app"] = apps[result["id"]]
+    return respond(AppBulkUpdateResponse, {"results": results, "updated": len(updated_ids)})
 
 @router.get("/{app_id}", response_model=AppResponse)
 async def get_app(
     app_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get app by ID"""
-    app = db.query(App).filter(App.id == app_id).first()
-    if not app:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="App not found"
-        )
+    app = await _get_app(db, app_id, current_user)
     
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE]:
-        if app.created_by != current_user.id and app.assigned_pm != current_user.id and app.assigned_marketing != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
+    version, _ = await get_versions(db, APPS)
+    if not_modified := cache.check(version, last_modified=app.updated_at or app.created_at):
+        return not_modified
     
-    return AppResponse.model_validate(app)
+    return respond(AppResponse, app, headers=cache.headers)
 
 @router.post("/", response_model=AppResponse)
 async def create_app(
     app_data: AppCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new app"""
     # Check if package name already exists
-    existing_app = db.query(App).filter(App.package_name == app_data.package_name).first()
+    existing_app = await db.scalar(
+        select(App).where(App.package_name == app_data.package_name)
+    )
     if existing_app:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Package name already exists"
         )
     
-    # Convert tags list to JSON string
-    tags_json = json.dumps(app_data.tags) if app_data.tags else None
-    
     # Create app
     app = App(
-        **app_data.model_dump(exclude={'tags'}),
-        tags=tags_json,
+        **app_data.model_dump(),
         created_by=current_user.id
     )
     
     db.add(app)
-    db.commit()
-    db.refresh(app)
+    await db.commit()
+    await db.refresh(app)
     
-    return AppResponse.model_validate(app)
+    return respond(AppResponse, app)
 
 @router.put("/{app_id}", response_model=AppResponse)
 async def update_app(
     app_id: int,
     app_update: AppUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update app"""
-    app = db.query(App).filter(App.id == app_id).first()
-    if not app:
+    app = await _get_app(db, app_id, current_user, EDITOR_ROLES)
+    
+    user_ids = _assignees(app_update)
+    known_users = set(await db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    if error := _update_error(app_update, known_users):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="App not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
         )
     
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE]:
-        if app.created_by != current_user.id and app.assigned_pm != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
-    
-    # Update app fields
-    update_data = app_update.model_dump(exclude_unset=True, exclude={'tags'})
-    for field, value in update_data.items():
-        setattr(app, field, value)
-    
-    # Handle tags separately
-    if app_update.tags is not None:
-        app.tags = json.dumps(app_update.tags)
-    
-    db.commit()
-    db.refresh(app)
+    _apply_update(app, app_update)
+    await db.commit()
+    await db.refresh(app)
     
-    return AppResponse.model_validate(app)
+    return respond(AppResponse, app)
 
 @router.delete("/{app_id}")
 async def delete_app(
     app_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete app"""
-    app = db.query(App).filter(App.id == app_id).first()
-    if not app:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="App not found"
-        )
+    app = await _get_app(db, app_id, current_user, [MemberRole.OWNER], managers=[UserRole.ADMIN])
     
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN] and app.created_by != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    db.delete(app)
-    db.commit()
+    await db.delete(app)
+    await db.commit()
     
     return {"message": "App deleted successfully"}
 
-@router.post("/{app_id}/upload")
+async def _get_upload_app(db: AsyncSession, app_id: int, current_user: CurrentUser) -> App:
+    return await _get_app(db, app_id, current_user, [MemberRole.OWNER], managers=[UserRole.ADMIN, UserRole.DEVELOPER])
+
+async def _get_upload(db: AsyncSession, app_id: int, upload_id: str) -> ArtifactUpload:
+    upload = await db.get(ArtifactUpload, upload_id)
+    if not upload or upload.app_id != app_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+def _upload_status(upload: ArtifactUpload) -> UploadStatus:
+    return UploadStatus(
+        upload_id=upload.id,
+        filename=upload.filename,
+        size=upload.size,
+        offset=upload.offset,
+        chunk_size=UPLOAD_CHUNK_SIZE
+    )
+
+@router.post("/{app_id}/upload", response_model=ArtifactResponse)
 async def upload_app_file(
     app_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload app file (APK/IPA)"""
-    app = db.query(App).filter(App.id == app_id).first()
-    if not app:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="App not found"
-        )
+    """Upload app file (APK/IPA) in a single request"""
+    await _get_upload_app(db, app_id, current_user)
     
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.DEVELOPER] and app.created_by != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    async def chunks():
+        while chunk := await file.read(REHASH_BLOCK_SIZE):
+            yield chunk
     
-    # TODO: Implement file upload logic
-    # For now, just return a mock response
-    return {"message": "File upload functionality coming soon", "filename": file.filename}
+    artifact, deduplicated = await store_stream(
+        db, app_id, file.filename or "", file.size, chunks(), current_user.id
+    )
+    job = await enqueue(EXTRACT_ARTIFACT, {"artifact_id": artifact.id}, created_by=current_user.id)
+    return respond(ArtifactResponse, ArtifactResponse.model_validate(artifact).model_copy(
+        update={"deduplicated": deduplicated, "metadata_job_id": job.id}
+    ))
 
+@router.post("/{app_id}/uploads", response_model=UploadStatus)
+async def create_upload(
+    app_id: int,
+    upload_init: UploadInit,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a resumable upload"""
+    await _get_upload_app(db, app_id, current_user)
+    upload = await open_upload(db, app_id, upload_init, current_user.id)
+    return respond(UploadStatus, _upload_status(upload))
+
+@router.get("/{app_id}/uploads/{upload_id}", response_model=UploadStatus)
+async def get_upload(
+    app_id: int,
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the offset to resume an upload from"""
+    await _get_upload_app(db, app_id, current_user)
+    return respond(UploadStatus, _upload_status(await _get_upload(db, app_id, upload_id)))
+
+@router.patch("/{app_id}/uploads/{upload_id}", response_model=UploadStatus)
+async def append_upload(
+    app_id: int,
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Append the raw request body at the ``Upload-Offset`` header"""
+    await _get_upload_app(db, app_id, current_user)
+    upload = await _get_upload(db, app_id, upload_id)
+    upload = await append_chunk(db, upload, upload_offset, request.stream())
+    return respond(UploadStatus, _upload_status(upload))
 
+@router.post("/{app_id}/uploads/{upload_id}/complete", response_model=ArtifactResponse)
+async def complete_app_upload(
+    app_id: int,
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Finish an upload and store the file; build metadata is extracted afterwards"""
+    await _get_upload_app(db, app_id, current_user)
+    upload = await _get_upload(db, app_id, upload_id)
+    artifact, deduplicated = await complete_upload(db, upload)
+    job = await enqueue(EXTRACT_ARTIFACT, {"artifact_id": artifact.id}, created_by=current_user.id)
+    return respond(ArtifactResponse, ArtifactResponse.model_validate(artifact).model_copy(
+        update={"deduplicated": deduplicated, "metadata_job_id": job.id}
+    ))
+
+@router.delete("/{app_id}/uploads/{upload_id}")
+async def delete_upload(
+    app_id: int,
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Abort an upload"""
+    await _get_upload_app(db, app_id, current_user)
+    await abort_upload(db, await _get_upload(db, app_id, upload_id))
+    return {"message": "Upload aborted"}
+
+@router.get("/{app_id}/artifacts", response_model=List[ArtifactResponse])
+async def get_app_artifacts(
+    app_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List stored files of an app"""
+    await _get_upload_app(db, app_id, current_user)
+    artifacts = await db.scalars(
+        select(AppArtifact).where(AppArtifact.app_id == app_id).order_by(AppArtifact.created_at.desc(), AppArtifact.id.desc())
+    )
+    return respond(List[ArtifactResponse], artifacts.all())
+
+@router.get("/{app_id}/artifacts/{artifact_id}", response_model=ArtifactResponse)
+async def get_app_artifact(
+    app_id: int,
+    artifact_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a stored file, including its metadata extraction progress"""
+    await _get_upload_app(db, app_id, current_user)
+    artifact = await db.get(AppArtifact, artifact_id)
+    if not artifact or artifact.app_id != app_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Artifact not found"
+        )
+    return respond(ArtifactResponse, artifact)
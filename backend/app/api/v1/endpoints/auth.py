@@ -1,18 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 from ....core.database import get_db
-from ....core.auth import verify_google_token, create_access_token, get_current_user
+from ....core.auth import (
+    verify_google_token, create_token_pair, decode_token, verify_token, get_current_user
+)
+from ....core.revocation import claim_token, revoke_token
+from ....core.serialization import respond
 from ....models.user import User
-from ....schemas.user import GoogleAuthRequest, AuthResponse, UserResponse
+from ....schemas.user import (
+    GoogleAuthRequest, AuthResponse, UserResponse, RefreshRequest, LogoutRequest,
+    TokenResponse, CurrentUser
+)
 
 router = APIRouter()
 
 @router.post("/google", response_model=AuthResponse)
 async def google_auth(
     auth_request: GoogleAuthRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Authenticate user with Google OAuth"""
     try:
@@ -32,7 +41,7 @@ async def google_auth(
             )
         
         # Find or create user
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
         
         if not user:
             # Create new user
@@ -45,8 +54,8 @@ async def google_auth(
                 is_active=True
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
         else:
             # Update existing user info
             user.google_id = google_id
@@ -54,18 +63,11 @@ async def google_auth(
             user.full_name = name or user.full_name
             user.is_verified = True
             user.last_login = datetime.utcnow()
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
         
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
-        
-        return AuthResponse(
-            access_token=access_token,
-            user=UserResponse.model_validate(user)
-        )
+        # Create access and refresh tokens
+        return respond(AuthResponse, {**create_token_pair(user), "user": user})
         
     except Exception as e:
         raise HTTPException(
@@ -73,14 +75,57 @@ async def google_auth(
             detail=f"Authentication failed: {str(e)}"
         )
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_tokens(
+    refresh_request: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Exchange a refresh token for a new token pair (refresh tokens are single use)"""
+    token_data = decode_token(refresh_request.refresh_token, token_type="refresh")
+    
+    # Revoking and checking in one step: a token presented twice at once is used once
+    if not await claim_token(token_data.get("jti"), token_data["exp"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Reload role and status so changes made since the last refresh take effect
+    user = await db.get(User, int(token_data["sub"]))
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user"
+        )
+    
+    return respond(TokenResponse, create_token_pair(user))
+
 @router.post("/logout")
-async def logout():
-    """Logout user (client should remove token)"""
+async def logout(
+    logout_request: Optional[LogoutRequest] = None,
+    token_data: Dict[str, Any] = Depends(verify_token)
+):
+    """Logout user by revoking the access token and, if given, the refresh token"""
+    await revoke_token(token_data.get("jti"), token_data["exp"])
+    
+    if logout_request and logout_request.refresh_token:
+        refresh_data = decode_token(logout_request.refresh_token, token_type="refresh")
+        await revoke_token(refresh_data["jti"], refresh_data["exp"])
+    
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current authenticated user information"""
-    return UserResponse.model_validate(current_user)
\ No newline at end of file
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    return respond(UserResponse, user)
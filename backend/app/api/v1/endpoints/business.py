@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from datetime import date
+
+from ....core.database import get_db
+from ....core.auth import require_role
+from ....core.config import settings
+from ....core.conditional import Conditional
+from ....core.serialization import respond
+from ....models.analytics import BusinessMetrics
+from ....models.user import UserRole
+from ....schemas.business import BusinessMetricsResponse, BusinessSummary, RevenueForecast, RevenueReport
+from ....schemas.user import CurrentUser
+from ....services.business import (
+    business_summary, month_index, month_timestamp, revenue_forecast, revenue_report
+)
+from ....services.versions import ANALYTICS, get_versions
+
+router = APIRouter()
+
+# Roles that see financials
+BUSINESS_ROLES = [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.BUSINESS_MANAGER, UserRole.ANALYST]
+
+# Longest window of months one request may cover
+MAX_MONTHS = 120
+
+def _month_window(start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+    """Month indexes covering start_date..end_date; the last 12 months by default"""
+    last = month_index(end_date or date.today())
+    first = month_index(start_date) if start_date else last - 11
+    if first > last:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    if last - first + 1 > MAX_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_MONTHS} months per request"
+        )
+    return first, last
+
+@router.get("/metrics", response_model=List[BusinessMetricsResponse])
+async def get_business_metrics(
+    app_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(BUSINESS_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Monthly business metrics as reported, by app and month"""
+    first, last = _month_window(start_date, end_date)
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, first, last, last_modified=modified):
+        return not_modified
+
+    query = select(BusinessMetrics).where(
+        BusinessMetrics.month >= month_timestamp(first),
+        BusinessMetrics.month < month_timestamp(last + 1)
+    ).order_by(BusinessMetrics.app_id, BusinessMetrics.month)
+    if app_id is not None:
+        query = query.where(BusinessMetrics.app_id == app_id)
+    metrics = (await db.execute(query)).scalars().all()
+
+    return respond(List[BusinessMetricsResponse], metrics, headers=cache.headers)
+
+@router.get("/summary", response_model=BusinessSummary)
+async def get_business_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    app_id: Optional[List[int]] = Query(None, description="Limit to these apps (repeatable); all apps if omitted"),
+    limit: int = Query(100, ge=0, le=settings.BULK_MAX_ITEMS, description="Apps listed, highest revenue first"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(BUSINESS_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Portfolio and per-app LTV, CAC, LTV/CAC, payback, margin and churn, with margin and churn trends"""
+    first, last = _month_window(start_date, end_date)
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, first, last, last_modified=modified):
+        return not_modified
+
+    summary = await business_summary(db, first, last, app_id, limit)
+    return respond(BusinessSummary, summary, headers=cache.headers)
+
+@router.get("/revenue", response_model=RevenueReport)
+async def get_revenue_report(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    app_id: Optional[List[int]] = Query(None, description="Limit to these apps (repeatable); all apps if omitted"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(BUSINESS_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Monthly revenue breakdown, costs and unit economics"""
+    first, last = _month_window(start_date, end_date)
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, first, last, last_modified=modified):
+        return not_modified
+
+    report = await revenue_report(db, first, last, app_id)
+    return respond(RevenueReport, report, headers=cache.headers)
+
+@router.get("/forecast", response_model=RevenueForecast)
+async def get_revenue_forecast(
+    horizon: int = Query(6, ge=3, le=12, description="Months to forecast"),
+    history: int = Query(24, ge=6, le=MAX_MONTHS, description="Complete months to fit on"),
+    app_id: Optional[List[int]] = Query(None, description="Limit to these apps (repeatable); all apps if omitted"),
+    limit: int = Query(20, ge=0, le=settings.BULK_MAX_ITEMS, description="Apps listed, highest recent revenue first"),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(BUSINESS_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Monthly revenue forecast per app and for the portfolio (damped Holt smoothing)"""
+    # The current month is still incomplete
+    last = month_index(date.today()) - 1
+    first = last - history + 1
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, last, last_modified=modified):
+        return not_modified
+
+    forecast = await revenue_forecast(db, first, last, horizon, app_id, limit)
+    return respond(RevenueForecast, forecast, headers=cache.headers)
@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
 
+from ....core.config import settings
 from ....core.database import get_db
 from ....core.auth import get_current_user
-from ....models.user import User
+from ....core.conditional import Conditional
+from ....core.serialization import respond
+from ....models.analytics import RollupPeriod
+from ....models.app import AppMember
+from ....models.user import UserRole
+from ....schemas.dashboard import ChartResponse
+from ....schemas.user import CurrentUser
+from ....services.membership import member_app_ids
+from ....services.versions import ANALYTICS, APPS, get_versions
+from ....services.charts import (
+    CHART_ALIASES, CHART_METRICS, chart_series, downsample, granularity_for, parse_period
+)
 
 router = APIRouter()
 
 @router.get("/stats")
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get dashboard statistics"""
+    version, modified = await get_versions(db, APPS, ANALYTICS)
+    if not_modified := cache.check(version, current_user.id, date.today(), last_modified=modified):
+        return not_modified
+    
     # TODO: Implement actual dashboard statistics
     # For now, return mock data
-    return {
+    return ORJSONResponse({
         "total_apps": 24,
         "published_apps": 18,
         "total_revenue": 125000,
@@ -23,41 +43,60 @@ async def get_dashboard_stats(
         "total_downloads": 1200000,
         "avg_rating": 4.3,
         "growth_rate": 12.5
-    }
+    }, headers=cache.headers)
 
-@router.get("/charts/{chart_type}")
+@router.get("/charts/{chart_type}", response_model=ChartResponse)
 async def get_chart_data(
     chart_type: str,
     period: str = "30d",
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    granularity: Optional[RollupPeriod] = None,
+    app_id: Optional[int] = None,
+    max_points: int = Query(settings.CHART_MAX_POINTS, ge=3, le=settings.CHART_MAX_POINTS_LIMIT),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get chart data for dashboard"""
-    # TODO: Implement actual chart data queries
-    # For now, return mock data based on chart type
-    
-    if chart_type == "revenue":
-        return [
-            {"month": "Jan", "revenue": 45000},
-            {"month": "Feb", "revenue": 52000},
-            {"month": "Mar", "revenue": 48000},
-            {"month": "Apr", "revenue": 61000},
-            {"month": "May", "revenue": 75000},
-            {"month": "Jun", "revenue": 68000},
-        ]
-    elif chart_type == "users":
-        return [
-            {"month": "Jan", "users": 12000},
-            {"month": "Feb", "users": 15000},
-            {"month": "Mar", "users": 14000},
-            {"month": "Apr", "users": 18000},
-            {"month": "May", "users": 22000},
-            {"month": "Jun", "users": 20000},
-        ]
-    else:
+    """Get a metric over time, bucketed by day/week/month and capped at max_points"""
+    metric = CHART_ALIASES.get(chart_type, chart_type)
+    if metric not in CHART_METRICS:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chart type not found"
         )
-
-
+    
+    end = date.today()
+    try:
+        start = parse_period(period, end)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    granularity = granularity or granularity_for(start, end)
+    
+    version, modified = await get_versions(db, APPS, ANALYTICS)
+    if not_modified := cache.check(version, current_user.id, current_user.role, end, last_modified=modified):
+        return not_modified
+    
+    # Role-based filtering
+    app_filter = None
+    if current_user.role not in [UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.ANALYST]:
+        app_filter = member_app_ids(current_user.id)
+    if app_id is not None:
+        app_filter = app_filter.where(AppMember.app_id == app_id) if app_filter is not None else [app_id]
+    
+    dates, values = await chart_series(db, metric, start, end, granularity, app_filter)
+    points_dates, points_values = downsample(dates, values, max_points)
+    
+    return respond(ChartResponse, {
+        "metric": metric,
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "points": [
+            {"date": day, "value": round(float(value), 4)}
+            for day, value in zip(points_dates, points_values)
+        ],
+        "source_points": len(dates),
+        "downsampled": len(points_dates) < len(dates)
+    }, headers=cache.headers)
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ....core.auth import get_current_user, require_role
+from ....core.jobs import enqueue, get_job, job_stats
+from ....core.serialization import respond
+from ....models.user import UserRole
+from ....schemas.job import Job, JobCreate, JobStats
+from ....schemas.user import CurrentUser
+
+router = APIRouter()
+
+@router.post("/", response_model=Job)
+async def create_job(
+    job_data: JobCreate,
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN]))
+):
+    """Queue a registered task (admin only)"""
+    try:
+        job = await enqueue(
+            job_data.name,
+            job_data.kwargs,
+            priority=job_data.priority,
+            delay=job_data.delay_seconds,
+            created_by=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return respond(Job, job)
+
+@router.get("/stats", response_model=JobStats)
+async def get_job_stats(
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN]))
+):
+    """Queue depth and recent wait/run latency"""
+    return respond(JobStats, await job_stats())
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job_status(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get job status and result"""
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Check permissions
+    if current_user.role != UserRole.ADMIN and job.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return respond(Job, job)
@@ -0,0 +1,172 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from ....core.database import get_db
+from ....core.auth import require_role
+from ....core.conditional import Conditional
+from ....core.pagination import PageParams, paginate
+from ....core.serialization import respond
+from ....models.analytics import MarketingCampaign
+from ....models.app import App
+from ....models.user import UserRole
+from ....schemas.marketing import CampaignCreate, CampaignReport, CampaignResponse, CampaignUpdate
+from ....schemas.pagination import PaginatedResponse
+from ....schemas.user import CurrentUser
+from ....services.marketing import campaign_report
+from ....services.versions import ANALYTICS, get_versions
+
+router = APIRouter()
+
+# Roles that read campaigns and their performance
+MARKETING_READ_ROLES = [
+    UserRole.ADMIN, UserRole.EXECUTIVE, UserRole.BUSINESS_MANAGER, UserRole.MARKETING_MANAGER, UserRole.ANALYST
+]
+
+# Roles that create, edit and delete campaigns
+MARKETING_MANAGER_ROLES = [UserRole.ADMIN, UserRole.MARKETING_MANAGER]
+
+def _cost_per_install(campaign: MarketingCampaign) -> float:
+    return round(campaign.spent / campaign.installs, 4) if campaign.installs else 0.0
+
+async def _get_campaign(db: AsyncSession, campaign_id: int) -> MarketingCampaign:
+    campaign = await db.get(MarketingCampaign, campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    return campaign
+
+async def _check_unique_name(db: AsyncSession, app_id: int, name: str, campaign_id: Optional[int] = None) -> None:
+    query = select(MarketingCampaign.id).where(MarketingCampaign.app_id == app_id, MarketingCampaign.name == name)
+    if campaign_id is not None:
+        query = query.where(MarketingCampaign.id != campaign_id)
+    if await db.scalar(query):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A campaign with this name already exists for the app"
+        )
+
+@router.get("/campaigns", response_model=PaginatedResponse[CampaignResponse])
+async def get_campaigns(
+    page_params: PageParams = Depends(),
+    app_id: Optional[int] = None,
+    campaign_type: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(MARKETING_READ_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """List campaigns, newest first"""
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, last_modified=modified):
+        return not_modified
+
+    query = select(MarketingCampaign)
+    if app_id is not None:
+        query = query.where(MarketingCampaign.app_id == app_id)
+    if campaign_type:
+        query = query.where(MarketingCampaign.campaign_type == campaign_type)
+    if is_active is not None:
+        query = query.where(MarketingCampaign.is_active.is_(is_active))
+
+    page = await paginate(db, query, MarketingCampaign, page_params)
+    return respond(PaginatedResponse[CampaignResponse], page, headers=cache.headers)
+
+@router.get("/campaigns/report", response_model=CampaignReport)
+async def get_campaign_report(
+    app_id: Optional[List[int]] = Query(None, description="Limit to these apps (repeatable); all apps if omitted"),
+    active_only: bool = False,
+    as_of: Optional[date] = None,
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role(MARKETING_READ_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """CTR, CPI, ROAS, budget burn and projected exhaustion for an app's or the portfolio's campaigns"""
+    as_of = as_of or date.today()
+    version, modified = await get_versions(db, ANALYTICS)
+    if not_modified := cache.check(version, as_of, last_modified=modified):
+        return not_modified
+
+    report = await campaign_report(db, as_of, app_ids=app_id, active_only=active_only)
+    return respond(CampaignReport, report, headers=cache.headers)
+
+@router.get("/campaigns/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(
+    campaign_id: int,
+    current_user: CurrentUser = Depends(require_role(MARKETING_READ_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get campaign by ID"""
+    return respond(CampaignResponse, await _get_campaign(db, campaign_id))
+
+@router.post("/campaigns", response_model=CampaignResponse)
+async def create_campaign(
+    campaign_data: CampaignCreate,
+    current_user: CurrentUser = Depends(require_role(MARKETING_MANAGER_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create campaign"""
+    if not await db.get(App, campaign_data.app_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="App not found"
+        )
+    await _check_unique_name(db, campaign_data.app_id, campaign_data.name)
+
+    campaign = MarketingCampaign(**campaign_data.model_dump(), created_by=current_user.id)
+    campaign.cost_per_install = _cost_per_install(campaign)
+    db.add(campaign)
+    await db.commit()
+    await db.refresh(campaign)
+
+    return respond(CampaignResponse, campaign)
+
+@router.put("/campaigns/{campaign_id}", response_model=CampaignResponse)
+async def update_campaign(
+    campaign_id: int,
+    campaign_update: CampaignUpdate,
+    current_user: CurrentUser = Depends(require_role(MARKETING_MANAGER_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update campaign"""
+    campaign = await _get_campaign(db, campaign_id)
+
+    update_data = campaign_update.model_dump(exclude_unset=True)
+    for field in ("name", "campaign_type", "start_date"):
+        if field in update_data and update_data[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{field} cannot be null"
+            )
+    if "name" in update_data:
+        await _check_unique_name(db, campaign.app_id, update_data["name"], campaign.id)
+
+    for field, value in update_data.items():
+        setattr(campaign, field, value)
+    if campaign.end_date is not None and campaign.end_date < campaign.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    campaign.cost_per_install = _cost_per_install(campaign)
+    await db.commit()
+    await db.refresh(campaign)
+
+    return respond(CampaignResponse, campaign)
+
+@router.delete("/campaigns/{campaign_id}")
+async def delete_campaign(
+    campaign_id: int,
+    current_user: CurrentUser = Depends(require_role(MARKETING_MANAGER_ROLES)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete campaign"""
+    campaign = await _get_campaign(db, campaign_id)
+    await db.delete(campaign)
+    await db.commit()
+
+    return {"message": "Campaign deleted successfully"}
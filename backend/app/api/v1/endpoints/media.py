@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, status, Path
+from fastapi.responses import FileResponse
+
+from ....services.thumbnails import get_thumbnail
+
+router = APIRouter()
+
+# Thumbnail URLs embed the source digest, so their content never changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/thumbs/{preset}/{sha256}.webp")
+async def get_thumbnail_image(
+    preset: str,
+    sha256: str = Path(..., pattern="^[0-9a-f]{64}$")
+):
+    """Resized WebP version of an icon or screenshot"""
+    try:
+        path = await get_thumbnail(preset, sha256)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
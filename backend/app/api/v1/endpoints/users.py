@@ -1,30 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....core.database import get_db
 from ....core.auth import get_current_user, require_role
+from ....core.conditional import Conditional
+from ....core.pagination import PageParams, paginate
+from ....core.revocation import revoke_user_tokens
+from ....core.serialization import respond
 from ....models.user import User, UserRole
-from ....schemas.user import UserResponse, UserUpdate
+from ....schemas.user import UserResponse, UserUpdate, CurrentUser
+from ....schemas.pagination import PaginatedResponse
+from ....schemas.search import SearchMode, SearchResults
+from ....services.search import USER_SEARCH, search, search_hits
+from ....services.versions import USERS, get_versions
 
 router = APIRouter()
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=PaginatedResponse[UserResponse])
 async def get_users(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    page_params: PageParams = Depends(),
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get list of users (Admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return [UserResponse.model_validate(user) for user in users]
+    return respond(PaginatedResponse[UserResponse], await paginate(db, select(User), User, page_params))
+
+@router.get("/search", response_model=SearchResults[UserResponse])
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Words of the name or email"),
+    mode: SearchMode = SearchMode.AUTO,
+    limit: int = Query(20, ge=1, le=100),
+    cache: Conditional = Depends(),
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search users by name and email, best match first (Admin only)"""
+    version, modified = await get_versions(db, USERS)
+    if not_modified := cache.check(version, last_modified=modified):
+        return not_modified
+    
+    results = await search(db, USER_SEARCH, q, mode, limit)
+    return respond(SearchResults[UserResponse], {
+        "query": q, "mode": mode, "items": search_hits(results)
+    }, headers=cache.headers)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user by ID"""
     # Users can only view their own profile unless they're admin
@@ -34,21 +59,21 @@ async def get_user(
             detail="Not enough permissions"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return UserResponse.model_validate(user)
+    return respond(UserResponse, user)
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user"""
     # Users can only update their own profile unless they're admin
@@ -58,7 +83,7 @@ async def update_user(
             detail="Not enough permissions"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,19 +97,27 @@ async def update_user(
     
     # Update user fields
     update_data = user_update.model_dump(exclude_unset=True)
+    claims_changed = (
+        update_data.get("role", user.role) != user.role or
+        update_data.get("is_active", user.is_active) != user.is_active
+    )
     for field, value in update_data.items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    
+    # Outstanding access tokens carry the old role/status claims
+    if claims_changed:
+        await revoke_user_tokens(user.id)
     
-    return UserResponse.model_validate(user)
+    return respond(UserResponse, user)
 
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete user (Admin only)"""
     if current_user.id == user_id:
@@ -93,15 +126,16 @@ async def delete_user(
             detail="Cannot delete yourself"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await revoke_user_tokens(user_id)
     
     return {"message": "User deleted successfully"}
 
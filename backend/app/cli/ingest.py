@@ -0,0 +1,46 @@
+"""
+Bulk load analytics, campaign or business metric rows from a file.
+
+    python -m app.cli.ingest app_analytics exports/2024-06.csv
+    python -m app.cli.ingest marketing_campaigns campaigns.ndjson --created-by 1
+"""
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from ..core.database import AsyncSessionLocal, async_engine
+from ..models import analytics, app, user, version  # noqa: F401  (register every mapper)
+from ..schemas.ingest import IngestDataset, DataFormat
+from ..services.ingest import DEFAULT_BATCH_SIZE, ingest
+
+CHUNK_SIZE = 1024 * 1024
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            yield chunk
+
+async def main(args: argparse.Namespace) -> None:
+    path = Path(args.path)
+    fmt = DataFormat(args.format or ("ndjson" if path.suffix in (".ndjson", ".jsonl") else "csv"))
+    async with AsyncSessionLocal() as db:
+        report = await ingest(
+            db,
+            IngestDataset(args.dataset),
+            read_chunks(path),
+            fmt=fmt,
+            batch_size=args.batch_size,
+            created_by=args.created_by
+        )
+    await async_engine.dispose()
+    print(report.model_dump_json(indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load rows through the ingest pipeline")
+    parser.add_argument("dataset", choices=[dataset.value for dataset in IngestDataset])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[fmt.value for fmt in DataFormat])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--created-by", type=int, help="User id recorded on marketing campaigns")
+    asyncio.run(main(parser.parse_args()))
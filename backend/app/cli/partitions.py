@@ -0,0 +1,51 @@
+"""
+Manage the monthly partitions of app_analytics (Postgres).
+
+    python -m app.cli.partitions list
+    python -m app.cli.partitions ensure --months-ahead 6
+    python -m app.cli.partitions detach --keep-months 24 [--drop]
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from ..core.config import settings
+from ..core.database import async_engine
+from ..services.partitions import (
+    add_months, detach_partitions, ensure_partitions, is_partitioned, list_partitions, month_start
+)
+
+async def main(args: argparse.Namespace) -> None:
+    today = date.today()
+    try:
+        if args.command == "list":
+            async with async_engine.connect() as connection:
+                if not await is_partitioned(connection):
+                    print("app_analytics is not partitioned")
+                    return
+                for month, name in sorted((await list_partitions(connection)).items()):
+                    print(f"{name}\t{month:%Y-%m}")
+        elif args.command == "ensure":
+            for name in await ensure_partitions(today, add_months(today, args.months_ahead)):
+                print(f"created {name}")
+        else:
+            # Keep the current month plus the previous keep_months - 1
+            before = add_months(month_start(today), 1 - args.keep_months)
+            for name in await detach_partitions(before, drop=args.drop):
+                print(f"{'dropped' if args.drop else 'detached'} {name}")
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage app_analytics partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show attached partitions")
+    ensure = commands.add_parser("ensure", help="Create partitions for upcoming months")
+    ensure.add_argument("--months-ahead", type=int, default=settings.ANALYTICS_PARTITION_MONTHS_AHEAD)
+    detach = commands.add_parser("detach", help="Detach partitions older than the retention window")
+    detach.add_argument("--keep-months", type=int, required=True)
+    detach.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+    args = parser.parse_args()
+    if args.command == "detach" and args.keep_months < 1:
+        parser.error("--keep-months must be at least 1")
+    asyncio.run(main(args))
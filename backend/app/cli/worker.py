@@ -0,0 +1,34 @@
+"""
+Run background job workers outside the API process.
+
+    JOB_WORKER_IN_PROCESS=false uvicorn main:app
+    python -m app.cli.worker --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from ..core.config import settings
+from ..core.database import async_engine
+from ..core.jobs import JobRunner
+from ..core.workers import shutdown_process_pool
+from ..models import analytics, app, user, version  # noqa: F401  (register every mapper)
+from ..services import tasks  # noqa: F401  (register background tasks)
+
+async def main(args: argparse.Namespace) -> None:
+    runner = JobRunner(concurrency=args.concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, runner.request_stop)
+    try:
+        await runner.run_forever()
+    finally:
+        shutdown_process_pool()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(parser.parse_args()))
@@ -1,17 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from google.auth.transport import requests
-from google.oauth2 import id_token
+from starlette.concurrency import run_in_threadpool
 import httpx
 
 from .config import settings
+from .google_jwks import google_cert_cache, decode_google_token
+from .revocation import is_token_revoked
 from ..models.user import User
-from ..core.database import get_db
-from sqlalchemy.orm import Session
+from ..schemas.user import CurrentUser
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -27,86 +28,125 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
-def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+def _encode_token(data: Dict[str, Any], token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.utcnow()
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    to_encode.update({
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + expires_delta
+    })
+    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
-    """Verify JWT token"""
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Create short-lived JWT access token; role and is_active travel as claims"""
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=settings.JWT_ACCESS_EXPIRATION_MINUTES)
+    return _encode_token(data, "access", expires_delta)
+
+def create_refresh_token(user_id: int) -> str:
+    """Create long-lived JWT refresh token"""
+    return _encode_token(
+        {"sub": str(user_id)},
+        "refresh",
+        timedelta(days=settings.JWT_REFRESH_EXPIRATION_DAYS)
+    )
+
+def create_token_pair(user: User) -> Dict[str, Any]:
+    """Issue access and refresh tokens carrying the user's current role and status"""
+    access_token = create_access_token(
+        data={
+            "sub": str(user.id),
+            "email": user.email,
+            "role": user.role.value,
+            "is_active": user.is_active
+        }
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(user.id),
+        "expires_in": settings.JWT_ACCESS_EXPIRATION_MINUTES * 60
+    }
+
+def decode_token(token: str, token_type: str = "access") -> Dict[str, Any]:
+    """Decode a JWT and check its type"""
     try:
         payload = jwt.decode(
-            credentials.credentials, 
+            token, 
             settings.JWT_SECRET, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return payload
     except JWTError:
+        payload = None
+    
+    if payload is None or payload.get("sub") is None or payload.get("type", "access") != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Verify JWT access token"""
+    return decode_token(credentials.credentials)
 
 async def verify_google_token(token: str) -> Dict[str, Any]:
-    """Verify Google ID token"""
+    """Verify Google ID token against cached signing keys"""
     try:
-        # Verify the token with Google
-        idinfo = id_token.verify_oauth2_token(
-            token, 
-            requests.Request(), 
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = await google_cert_cache.get_key(kid)
+        
+        # Signature and claim checks are CPU-bound; keep them off the event loop
+        return await run_in_threadpool(
+            decode_google_token,
+            token,
+            key,
             settings.GOOGLE_CLIENT_ID
         )
-        
-        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-            raise ValueError('Wrong issuer.')
-            
-        return idinfo
-    except ValueError as e:
+    except (JWTError, ValueError, httpx.HTTPError) as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid Google token: {str(e)}"
         )
 
-def get_current_user(
-    token_data: Dict[str, Any] = Depends(verify_token),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    user_id = token_data.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_current_user(
+    token_data: Dict[str, Any] = Depends(verify_token)
+) -> CurrentUser:
+    """Get current authenticated user from token claims, without a database round trip"""
+    if "role" not in token_data:
+        # Tokens minted before role claims existed must be refreshed
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    if user is None:
+    user_id = int(token_data["sub"])
+    if await is_token_revoked(token_data.get("jti"), user_id, token_data.get("iat", 0)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not user.is_active:
+    if not token_data.get("is_active", False):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Inactive user"
         )
     
-    return user
+    return CurrentUser(
+        id=user_id,
+        email=token_data.get("email"),
+        role=token_data["role"],
+        is_active=True
+    )
 
 def require_role(required_roles: list):
     """Decorator to require specific roles"""
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: CurrentUser = Depends(get_current_user)):
         if current_user.role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,142 @@
+"""
+Response compression (brotli or gzip, by Accept-Encoding).
+
+Applies to text-like responses at least ``minimum_size`` bytes long and to
+streamed ones (exports), which are compressed chunk by chunk and flushed so
+they keep streaming. Images, builds and already-encoded bodies pass through.
+A strong ETag gets the encoding appended (``"abc"`` -> ``"abc-gzip"``) since
+the compressed bytes are a different representation; ``core.conditional``
+strips it again when comparing.
+"""
+import zlib
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # higher levels cost far more CPU for little gain on JSON
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Preferred first
+ENCODINGS = ("br", "gzip")
+
+def strip_encoding_suffix(etag: str) -> str:
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    # An encoding listed by name keeps its own weight: "br;q=0, *" excludes br
+    for encoding in ENCODINGS:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so the client can decode everything sent so far"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class _Responder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+
+    def _should_compress(self, status: int, headers: Headers, body: bytes, more_body: bool) -> bool:
+        if status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows what is being sent
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if self._should_compress(start["status"], headers, body, more_body):
+                self.compressor = _Compressor(self.encoding)
+                headers["content-encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/") and etag.endswith('"'):
+                    headers["etag"] = f'{etag[:-1]}-{self.encoding}"'
+                if more_body:
+                    del headers["content-length"]
+                    body = self.compressor.chunk(body)
+                else:
+                    body = self.compressor.finish(body)
+                    headers["content-length"] = str(len(body))
+                start = {**start, "headers": headers.raw}
+            await self.send(start)
+            await self.send({**message, "body": body})
+            return
+
+        if self.compressor is not None:
+            body = self.compressor.chunk(body) if more_body else self.compressor.finish(body)
+            message = {**message, "body": body}
+        await self.send(message)
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding:
+                await self.app(scope, receive, _Responder(send, encoding, self.minimum_size))
+                return
+        await self.app(scope, receive, send)
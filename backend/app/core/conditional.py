@@ -0,0 +1,71 @@
+"""
+Conditional GET for read endpoints.
+
+A route opts in with ``cache: Conditional = Depends()`` and calls
+``cache.check(...)`` with whatever its response depends on (a data version,
+the caller, the day) before doing the expensive work. A match against
+If-None-Match (or If-Modified-Since) returns a ready 304 without querying or
+serializing anything more; otherwise the full response carries
+``cache.headers``.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from .compression import strip_encoding_suffix
+
+def make_etag(*parts: Any) -> str:
+    """Strong entity tag from the values a response is built from"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+class Conditional:
+    def __init__(self, request: Request):
+        self.request = request
+        self.headers: Dict[str, str] = {}
+
+    def _matching_tag(self, if_none_match: str, etag: str) -> Optional[str]:
+        """The client's tag that matches ``etag`` (weak comparison), if any"""
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*":
+                return etag
+            if strip_encoding_suffix(candidate.removeprefix("W/")) == etag:
+                return candidate
+        return None
+
+    def check(self, *parts: Any, last_modified: Optional[datetime] = None) -> Optional[Response]:
+        """
+        Set the validators for this response from ``parts`` (the request URL
+        is always included) and return a 304 if the client's copy is current.
+        """
+        url = self.request.url
+        etag = make_etag(url.path, url.query, *parts)
+        # Responses are per user: browsers may keep them but must revalidate
+        self.headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if last_modified is not None:
+            self.headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            matched = self._matching_tag(if_none_match, etag)
+            if matched is None:
+                return None
+            # Echo the tag the client holds, which may carry an encoding suffix
+            return Response(status_code=304, headers={**self.headers, "ETag": matched})
+
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = _as_utc(parsedate_to_datetime(if_modified_since))
+            except (TypeError, ValueError):
+                return None
+            if _as_utc(last_modified).replace(microsecond=0) <= since:
+                return Response(status_code=304, headers=self.headers)
+        return None
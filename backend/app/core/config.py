@@ -14,15 +14,27 @@ class Settings(BaseSettings):
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Token revocation list backend: "redis" or "memory" (single process only)
+    TOKEN_REVOCATION_BACKEND: str = "redis"
+    
+    # Background jobs: "redis" or "sqlite" (JOB_SQLITE_PATH, ":memory:" for one process)
+    JOB_BACKEND: str = "redis"
+    JOB_SQLITE_PATH: str = "jobs.sqlite3"
+    JOB_WORKER_IN_PROCESS: bool = True  # run workers inside the API; false with `python -m app.cli.worker`
+    JOB_CONCURRENCY: int = 4
+    JOB_RESULT_TTL_SECONDS: int = 24 * 3600
+    
     # JWT Configuration
     JWT_SECRET: str = "your-super-secret-jwt-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
-    JWT_EXPIRATION_HOURS: int = 24
+    JWT_ACCESS_EXPIRATION_MINUTES: int = 15
+    JWT_REFRESH_EXPIRATION_DAYS: int = 30
     
     # Google OAuth Configuration
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/google/callback"
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"  # or file:// for offline use
     
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = [
@@ -35,10 +47,42 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
     ALLOWED_EXTENSIONS: List[str] = [".apk", ".ipa", ".aab", ".zip", ".png", ".jpg", ".jpeg"]
     
+    # CPU-bound work (build parsing, thumbnails, exports) runs in this many processes,
+    # niced so that the server process answering requests is scheduled first
+    WORKER_PROCESSES: int = 2
+    WORKER_NICENESS: int = 19
+    
+    # Revenue forecasts for this many apps or more are fitted in the worker processes,
+    # off the event loop (a few hundred apps take ~10 ms in-process)
+    FORECAST_PROCESS_MIN_APPS: int = 2000
+    
+    # Derived images (thumbnails), evicted least recently used beyond this size
+    THUMBNAIL_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    
+    # Monthly app_analytics partitions (Postgres) kept ready beyond the current month
+    ANALYTICS_PARTITION_MONTHS_AHEAD: int = 3
+    
+    # Dense retention cohort blocks kept in memory (per app set and horizon)
+    COHORT_CACHE_ENTRIES: int = 64
+    
+    # Search (Postgres): matches ranked per query, taken from the indexes in no
+    # particular order; bounds the cost of very common words
+    SEARCH_MAX_CANDIDATES: int = 5000
+
+    # Dashboard charts: default and largest allowed number of points per series
+    CHART_MAX_POINTS: int = 300
+    CHART_MAX_POINTS_LIMIT: int = 2000
+    
+    # Compress text responses (brotli or gzip) from this many bytes
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Largest number of ids in one batch read or bulk update
+    BULK_MAX_ITEMS: int = 500
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
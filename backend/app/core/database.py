@@ -1,29 +1,69 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
-# Create database engine
+# Async drivers for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+# Postgres pools record checkout wait; SQLite keeps its default pools
+TIMED_POOLS = settings.DATABASE_URL.startswith("postgresql")
+
+# Create database engine (sync, for scripts and migrations)
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool if TIMED_POOLS else None,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=settings.ENVIRONMENT == "development"
+)
+
+# Create async database engine (for request handlers)
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncQueuePool if TIMED_POOLS else None,
     pool_pre_ping=True,
     pool_recycle=300,
     echo=settings.ENVIRONMENT == "development"
 )
 
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create AsyncSessionLocal class; objects stay usable after commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
-# Dependency to get database session
-def get_db():
+# Dependency to get async database session
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Sync database session for scripts and background work
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
-
-
-
@@ -0,0 +1,170 @@
+"""
+Cached Google signing keys for local ID token verification.
+
+Google rotates its ID token signing keys roughly daily and publishes them as a
+JWKS document with a Cache-Control max-age. The cache below fetches that
+document asynchronously, honors max-age, refreshes in the background before
+expiry, and builds the RSA keys once, so verifying an ID token is a local,
+CPU-only signature check that runs off the event loop.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Used when the response carries no usable Cache-Control header
+DEFAULT_MAX_AGE = 3600
+
+# Start a background refresh once this fraction of max-age has elapsed
+REFRESH_AHEAD_RATIO = 0.8
+
+# Minimum seconds between refetches triggered by an unknown kid
+MIN_REFRESH_INTERVAL = 60
+
+JWKSFetcher = Callable[[], Awaitable[Tuple[Dict[str, Any], int]]]
+
+def parse_max_age(cache_control: Optional[str]) -> int:
+    """Extract max-age seconds from a Cache-Control header"""
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+async def fetch_jwks(url: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Fetch a JWKS document over HTTP(S), or read it from a file:// URL"""
+    url = url or settings.GOOGLE_JWKS_URL
+    if url.startswith("file://"):
+        return json.loads(Path(url[len("file://"):]).read_text()), DEFAULT_MAX_AGE
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json(), parse_max_age(response.headers.get("cache-control"))
+
+class GoogleCertCache:
+    """JWKS cache keyed by kid with max-age expiry and refresh-ahead"""
+
+    def __init__(self, fetcher: JWKSFetcher = fetch_jwks):
+        self._fetcher = fetcher
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at = 0.0
+        self._max_age = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _age(self) -> float:
+        return time.monotonic() - self._fetched_at
+
+    def _is_fresh(self) -> bool:
+        return bool(self._keys) and self._age() < self._max_age
+
+    async def refresh(self, force: bool = False) -> None:
+        """Fetch the JWKS document and rebuild the key objects"""
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if not force and self._is_fresh():
+                return
+            document, max_age = await self._fetcher()
+            self._keys = {
+                key["kid"]: jwk.construct(key, key.get("alg", "RS256"))
+                for key in document.get("keys", [])
+            }
+            self._max_age = max_age
+            self._fetched_at = time.monotonic()
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh(force=True)
+        except Exception:
+            # Keep serving the current keys until they expire
+            logger.exception("Background refresh of Google signing keys failed")
+
+    async def get_key(self, kid: str) -> Key:
+        """Return the signing key for ``kid``, fetching only when needed"""
+        if not self._is_fresh():
+            await self.refresh()
+        elif self._age() >= self._max_age * REFRESH_AHEAD_RATIO and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+
+        if kid not in self._keys and self._age() >= MIN_REFRESH_INTERVAL:
+            # Keys may have rotated since the last fetch
+            await self.refresh(force=True)
+        if kid not in self._keys:
+            raise ValueError("Unknown signing key")
+        return self._keys[kid]
+
+google_cert_cache = GoogleCertCache()
+
+def decode_google_token(token: str, key: Key, audience: str) -> Dict[str, Any]:
+    """Verify signature and claims of a Google ID token (CPU only)"""
+    return jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        audience=audience,
+        issuer=GOOGLE_ISSUERS,
+        options={"verify_at_hash": False}
+    )
+
+class LocalJWKS:
+    """
+    Offline stand-in for Google's signing keys: generates an RSA key pair,
+    serves it as a JWKS document and mints ID tokens signed with it.
+    """
+
+    def __init__(self, kid: Optional[str] = None, max_age: int = DEFAULT_MAX_AGE):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid or uuid.uuid4().hex
+        self.max_age = max_age
+        self._private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+        public_jwk.update({"kid": self.kid, "use": "sig", "alg": "RS256"})
+        self._public_jwk = public_jwk
+
+    def jwks(self) -> Dict[str, Any]:
+        return {"keys": [self._public_jwk]}
+
+    async def fetch(self) -> Tuple[Dict[str, Any], int]:
+        """Drop-in JWKSFetcher for GoogleCertCache"""
+        return self.jwks(), self.max_age
+
+    def mint_id_token(self, email: str, sub: Optional[str] = None, audience: Optional[str] = None,
+                      expires_in: int = 3600, **claims: Any) -> str:
+        """Mint a Google-style ID token signed with the local key"""
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": audience if audience is not None else settings.GOOGLE_CLIENT_ID,
+            "sub": sub or uuid.uuid5(uuid.NAMESPACE_DNS, email).hex,
+            "email": email,
+            "email_verified": True,
+            "iat": now,
+            "exp": now + expires_in,
+            **claims
+        }
+        return jwt.encode(payload, self._private_pem, algorithm="RS256", headers={"kid": self.kid})
@@ -0,0 +1,529 @@
+"""
+Background jobs: task registry, queue backends and the worker loop.
+
+Tasks are plain functions (async or sync) registered with ``@task``. Routers
+call ``enqueue`` and poll ``get_job``; tasks registered with ``every`` are
+also enqueued by each runner's housekeeping loop at that interval. Workers claim jobs highest priority
+first, retry failures with exponential backoff and keep finished jobs for
+JOB_RESULT_TTL_SECONDS. Two backends share one interface:
+
+- Redis, for deployments with several API and worker processes.
+- SQLite, a file shared by processes on one host, or ``:memory:`` for a
+  single process, for when no outside services are available.
+"""
+import asyncio
+import inspect
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio as aioredis
+from fastapi.encoders import jsonable_encoder
+
+from .config import settings
+from ..schemas.job import Job, JobStats, JobStatus, LatencySummary
+
+logger = logging.getLogger(__name__)
+
+# A claimed job is presumed lost (worker died) this long after its timeout
+LEASE_GRACE_SECONDS = 60
+
+# Recent finished jobs used for latency statistics
+LATENCY_SAMPLES = 1000
+
+POLL_INTERVAL = 1.0
+HOUSEKEEPING_INTERVAL = 30.0
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+@dataclass
+class TaskSpec:
+    func: Callable[..., Any]
+    max_retries: int
+    retry_backoff: float
+    retry_backoff_max: float
+    priority: int
+    timeout: float
+    every: Optional[float] = None
+
+TASKS: Dict[str, TaskSpec] = {}
+
+def task(name: str, max_retries: int = 3, retry_backoff: float = 2.0, retry_backoff_max: float = 300.0,
+         priority: int = 0, timeout: float = 600.0, every: Optional[float] = None):
+    """
+    Register a function as a background task; keyword arguments must be
+    JSON-serializable. With ``every`` (seconds) running workers also enqueue it
+    periodically, with no arguments.
+    """
+    def register(func: Callable[..., Any]) -> Callable[..., Any]:
+        TASKS[name] = TaskSpec(func, max_retries, retry_backoff, retry_backoff_max, priority, timeout, every)
+        return func
+    return register
+
+def retry_delay(spec: TaskSpec, attempts: int) -> float:
+    # Jitter keeps jobs that failed together from retrying in lockstep
+    delay = min(spec.retry_backoff_max, spec.retry_backoff * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _latencies(job: Job) -> tuple:
+    wait = (job.started_at - max(job.run_at, job.enqueued_at)).total_seconds()
+    run = (job.finished_at - job.started_at).total_seconds()
+    return max(wait, 0.0), max(run, 0.0)
+
+def summarize(values: List[float]) -> LatencySummary:
+    if not values:
+        return LatencySummary()
+    ordered = sorted(values)
+    return LatencySummary(
+        count=len(ordered),
+        avg=round(sum(ordered) / len(ordered), 4),
+        p50=round(ordered[len(ordered) // 2], 4),
+        p95=round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        max=round(ordered[-1], 4)
+    )
+
+def _claimed(job: Job, now: datetime) -> float:
+    """Mark a job as claimed and return its lease deadline (epoch seconds)"""
+    job.status = JobStatus.RUNNING
+    job.attempts += 1
+    job.started_at = now
+    job.error = None
+    return now.timestamp() + job.timeout + LEASE_GRACE_SECONDS
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    lease_until REAL,
+    finished_at REAL,
+    wait_seconds REAL,
+    run_seconds REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (status, priority DESC, run_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_finished_at ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS job_totals (
+    status TEXT PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+"""
+
+class SQLiteJobBackend:
+    """Jobs in a SQLite file (processes on one host) or in memory (one process)"""
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SQLITE_SCHEMA)
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        def locked():
+            with self._lock:
+                return func(*args)
+        return await asyncio.to_thread(locked)
+
+    def _write(self, job: Job, lease_until: Optional[float] = None) -> None:
+        wait = run = None
+        if job.status in FINISHED and job.started_at:
+            wait, run = _latencies(job)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, priority, run_at, enqueued_at, lease_until, finished_at,"
+            " wait_seconds, run_seconds, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.id, job.status.value, job.priority, job.run_at.timestamp(), job.enqueued_at.timestamp(),
+                lease_until, job.finished_at.timestamp() if job.finished_at else None, wait, run,
+                job.model_dump_json()
+            )
+        )
+
+    def _add(self, job: Job) -> None:
+        self._write(job)
+
+    def _claim(self, now: datetime) -> Optional[Job]:
+        connection = self._connection
+        # IMMEDIATE takes the write lock up front, so two processes never claim one job
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT data FROM jobs WHERE status IN ('queued', 'retrying') AND run_at <= ?"
+                " ORDER BY priority DESC, run_at, enqueued_at LIMIT 1",
+                (now.timestamp(),)
+            ).fetchone()
+            job = None
+            if row is not None:
+                job = Job.model_validate_json(row[0])
+                self._write(job, _claimed(job, now))
+            connection.execute("COMMIT")
+            return job
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _save(self, job: Job) -> None:
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._write(job)
+            if job.status in FINISHED:
+                connection.execute(
+                    "INSERT INTO job_totals (status, total) VALUES (?, 1)"
+                    " ON CONFLICT (status) DO UPDATE SET total = total + 1",
+                    (job.status.value,)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        row = self._connection.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def _expired(self, now: datetime) -> List[Job]:
+        rows = self._connection.execute(
+            "SELECT data FROM jobs WHERE status = 'running' AND lease_until < ?", (now.timestamp(),)
+        ).fetchall()
+        return [Job.model_validate_json(row[0]) for row in rows]
+
+    def _purge(self, before: datetime) -> None:
+        self._connection.execute("DELETE FROM jobs WHERE finished_at < ?", (before.timestamp(),))
+
+    def _stats(self, now: datetime) -> JobStats:
+        connection = self._connection
+        counts = dict(connection.execute(
+            "SELECT CASE WHEN status IN ('queued', 'retrying') AND run_at <= ? THEN 'queued'"
+            " WHEN status IN ('queued', 'retrying') THEN 'scheduled' ELSE status END AS state, count(*)"
+            " FROM jobs WHERE status NOT IN ('succeeded', 'failed') GROUP BY state",
+            (now.timestamp(),)
+        ).fetchall())
+        totals = dict(connection.execute("SELECT status, total FROM job_totals").fetchall())
+        samples = connection.execute(
+            "SELECT wait_seconds, run_seconds FROM jobs WHERE finished_at IS NOT NULL"
+            " ORDER BY finished_at DESC LIMIT ?",
+            (LATENCY_SAMPLES,)
+        ).fetchall()
+        return JobStats(
+            queued=counts.get("queued", 0),
+            scheduled=counts.get("scheduled", 0),
+            running=counts.get("running", 0),
+            succeeded=totals.get("succeeded", 0),
+            failed=totals.get("failed", 0),
+            wait_seconds=summarize([wait for wait, _ in samples if wait is not None]),
+            run_seconds=summarize([run for _, run in samples if run is not None])
+        )
+
+    async def add(self, job: Job) -> None:
+        await self._call(self._add, job)
+
+    async def claim(self, now: datetime) -> Optional[Job]:
+        return await self._call(self._claim, now)
+
+    async def save(self, job: Job) -> None:
+        await self._call(self._save, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self._call(self._get, job_id)
+
+    async def expired(self, now: datetime) -> List[Job]:
+        return await self._call(self._expired, now)
+
+    async def purge(self, before: datetime) -> None:
+        await self._call(self._purge, before)
+
+    async def stats(self, now: datetime) -> JobStats:
+        return await self._call(self._stats, now)
+
+# Pop the best ready job and record it as running in one step
+REDIS_CLAIM_SCRIPT = """
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if #popped == 0 then return false end
+redis.call('ZADD', KEYS[2], ARGV[1], popped[1])
+return popped[1]
+"""
+
+class RedisJobBackend:
+    """
+    Jobs in Redis: records as JSON strings, a ``ready`` sorted set ordered by
+    priority then run_at, a ``scheduled`` set for future run_at and a
+    ``running`` set scored by lease deadline.
+    """
+
+    def __init__(self, url: str, prefix: str = "jobs"):
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._claim_script = self._redis.register_script(REDIS_CLAIM_SCRIPT)
+        self._prefix = prefix
+
+    def _key(self, name: str) -> str:
+        return f"{self._prefix}:{name}"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._prefix}:job:{job_id}"
+
+    @staticmethod
+    def _ready_score(job: Job) -> float:
+        return -job.priority * 1e10 + job.run_at.timestamp()
+
+    async def add(self, job: Job) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.id), job.model_dump_json())
+            if job.run_at <= _utcnow():
+                pipe.zadd(self._key("ready"), {job.id: self._ready_score(job)})
+            else:
+                pipe.zadd(self._key("scheduled"), {job.id: job.run_at.timestamp()})
+            await pipe.execute()
+
+    async def _promote(self, now: datetime) -> None:
+        due = await self._redis.zrangebyscore(self._key("scheduled"), "-inf", now.timestamp(), start=0, num=100)
+        for job_id in due:
+            # Only the process whose ZREM succeeds moves the job
+            if await self._redis.zrem(self._key("scheduled"), job_id):
+                job = await self.get(job_id)
+                if job is not None:
+                    await self._redis.zadd(self._key("ready"), {job_id: self._ready_score(job)})
+
+    async def claim(self, now: datetime) -> Optional[Job]:
+        await self._promote(now)
+        job_id = await self._claim_script(
+            keys=[self._key("ready"), self._key("running")],
+            args=[now.timestamp() + LEASE_GRACE_SECONDS]
+        )
+        if not job_id:
+            return None
+        job = await self.get(job_id)
+        if job is None:
+            await self._redis.zrem(self._key("running"), job_id)
+            return None
+        lease_until = _claimed(job, now)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.id), job.model_dump_json())
+            pipe.zadd(self._key("running"), {job.id: lease_until})
+            await pipe.execute()
+        return job
+
+    async def save(self, job: Job) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key("running"), job.id)
+            if job.status in FINISHED:
+                pipe.set(self._job_key(job.id), job.model_dump_json(), ex=settings.JOB_RESULT_TTL_SECONDS)
+                pipe.hincrby(self._key("totals"), job.status.value, 1)
+                if job.started_at:
+                    pipe.lpush(self._key("latency"), "%f %f" % _latencies(job))
+                    pipe.ltrim(self._key("latency"), 0, LATENCY_SAMPLES - 1)
+            else:
+                pipe.set(self._job_key(job.id), job.model_dump_json())
+                pipe.zadd(self._key("scheduled"), {job.id: job.run_at.timestamp()})
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self._redis.get(self._job_key(job_id))
+        return Job.model_validate_json(data) if data else None
+
+    async def expired(self, now: datetime) -> List[Job]:
+        job_ids = await self._redis.zrangebyscore(self._key("running"), "-inf", now.timestamp())
+        jobs = [await self.get(job_id) for job_id in job_ids]
+        return [job for job in jobs if job is not None]
+
+    async def purge(self, before: datetime) -> None:
+        # Finished records expire on their own
+        return None
+
+    async def stats(self, now: datetime) -> JobStats:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(self._key("ready"))
+            pipe.zcount(self._key("scheduled"), "-inf", now.timestamp())
+            pipe.zcount(self._key("scheduled"), f"({now.timestamp()}", "+inf")
+            pipe.zcard(self._key("running"))
+            pipe.hgetall(self._key("totals"))
+            pipe.lrange(self._key("latency"), 0, -1)
+            ready, due, scheduled, running, totals, samples = await pipe.execute()
+        pairs = [tuple(map(float, sample.split())) for sample in samples]
+        return JobStats(
+            queued=ready + due,
+            scheduled=scheduled,
+            running=running,
+            succeeded=int(totals.get("succeeded", 0)),
+            failed=int(totals.get("failed", 0)),
+            wait_seconds=summarize([wait for wait, _ in pairs]),
+            run_seconds=summarize([run for _, run in pairs])
+        )
+
+def create_job_backend():
+    """Create the configured job queue backend"""
+    if settings.JOB_BACKEND == "sqlite":
+        return SQLiteJobBackend(settings.JOB_SQLITE_PATH)
+    return RedisJobBackend(settings.REDIS_URL)
+
+job_backend = create_job_backend()
+
+# Wake-up events of runners in this process, set on enqueue
+_wakeups: List[asyncio.Event] = []
+
+async def enqueue(name: str, kwargs: Optional[Dict[str, Any]] = None, priority: Optional[int] = None,
+                  delay: float = 0.0, created_by: Optional[int] = None) -> Job:
+    """Queue a registered task; raises ValueError for an unknown task name"""
+    spec = TASKS.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown task {name}")
+    now = _utcnow()
+    job = Job(
+        id=uuid.uuid4().hex,
+        name=name,
+        kwargs=jsonable_encoder(kwargs or {}),
+        priority=spec.priority if priority is None else priority,
+        max_retries=spec.max_retries,
+        timeout=spec.timeout,
+        created_by=created_by,
+        enqueued_at=now,
+        run_at=now + timedelta(seconds=delay)
+    )
+    await job_backend.add(job)
+    for event in _wakeups:
+        event.set()
+    return job
+
+async def get_job(job_id: str) -> Optional[Job]:
+    return await job_backend.get(job_id)
+
+async def job_stats() -> JobStats:
+    return await job_backend.stats(_utcnow())
+
+class JobRunner:
+    """Claims and runs jobs with bounded concurrency until stopped"""
+
+    def __init__(self, backend=None, concurrency: int = 4, poll_interval: float = POLL_INTERVAL):
+        self.backend = backend or job_backend
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # Periodic task name -> monotonic time it is next due
+        self._periodic_due: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        _wakeups.append(self._wakeup)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._housekeeping()))
+
+    def request_stop(self) -> None:
+        """Ask the runner to stop (safe to call from a signal handler)"""
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def stop(self, grace: float = 10.0) -> None:
+        """Stop claiming, give running jobs ``grace`` seconds, then cancel them"""
+        self.request_stop()
+        if self._wakeup in _wakeups:
+            _wakeups.remove(self._wakeup)
+        _, pending = await asyncio.wait(self._tasks, timeout=grace) if self._tasks else (None, [])
+        for pending_task in pending:
+            pending_task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def run_forever(self) -> None:
+        await self.start()
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.stop()
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self.backend.claim(_utcnow())
+            except Exception:
+                logger.exception("Claiming a job failed")
+                await self._idle(self.poll_interval * 5)
+                continue
+            if job is None:
+                await self._idle(self.poll_interval)
+                continue
+            await self.run_job(job)
+
+    async def _housekeeping(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                now = _utcnow()
+                for job in await self.backend.expired(now):
+                    await self._failed(job, TASKS.get(job.name), "Lease expired (worker lost)")
+                await self.backend.purge(now - timedelta(seconds=settings.JOB_RESULT_TTL_SECONDS))
+                await self._enqueue_periodic()
+            except Exception:
+                logger.exception("Job housekeeping failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), HOUSEKEEPING_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _enqueue_periodic(self) -> None:
+        # Due on start, then every ``spec.every`` seconds; every runner enqueues
+        # its own, so periodic tasks must tolerate running concurrently
+        now = time.monotonic()
+        for name, spec in TASKS.items():
+            if spec.every and self._periodic_due.get(name, now) <= now:
+                self._periodic_due[name] = now + spec.every
+                await enqueue(name)
+
+    async def _failed(self, job: Job, spec: Optional[TaskSpec], error: str) -> None:
+        job.error = error
+        if spec is not None and job.attempts <= job.max_retries:
+            job.status = JobStatus.RETRYING
+            job.run_at = _utcnow() + timedelta(seconds=retry_delay(spec, job.attempts))
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = _utcnow()
+        await self.backend.save(job)
+
+    async def run_job(self, job: Job) -> None:
+        """Run one claimed job and record its outcome"""
+        spec = TASKS.get(job.name)
+        if spec is None:
+            await self._failed(job, None, f"Unknown task {job.name}")
+            return
+
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(spec.func):
+                call = spec.func(**job.kwargs)
+            else:
+                call = asyncio.to_thread(spec.func, **job.kwargs)
+            result = await asyncio.wait_for(call, job.timeout)
+        except asyncio.CancelledError:
+            # Shutting down: put the job back without counting the attempt
+            job.status = JobStatus.QUEUED
+            job.attempts -= 1
+            await self.backend.save(job)
+            raise
+        except Exception as e:
+            logger.warning("Job %s (%s) failed on attempt %s: %r", job.id, job.name, job.attempts, e)
+            await self._failed(job, spec, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+            return
+
+        job.status = JobStatus.SUCCEEDED
+        job.result = jsonable_encoder(result)
+        job.finished_at = _utcnow()
+        await self.backend.save(job)
+        logger.info("Job %s (%s) succeeded in %.3fs", job.id, job.name, time.perf_counter() - started)
@@ -0,0 +1,174 @@
+"""
+Prometheus metrics, served at /metrics.
+
+- Per-route request latency and in-flight requests (MetricsMiddleware). Routes
+  are labelled by their path template, so label cardinality stays bounded.
+- Per-request SQL statement count and time, gathered by cursor events on both
+  engines into a context variable the middleware sets per request.
+- Connection pool checkout wait (pool classes below) and utilization, the
+  latter read from the pools only when scraped.
+- Background job queue depth and latency (``observe_job_stats``).
+
+The request path costs two perf_counter calls and a few dict updates; the
+statement hooks the same per statement.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..schemas.job import JobStats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", ["method"])
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per request",
+    ["route"], buckets=STATEMENT_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+STATEMENTS = Counter("db_statements", "SQL statements executed", ["engine"])
+STATEMENT_SECONDS = Counter("db_statement_seconds", "Time spent in SQL statements", ["engine"])
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection",
+    ["engine"], buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+# Background job queue, refreshed from core.jobs.job_stats when scraped
+JOBS = Gauge("jobs", "Background jobs by state", ["state"])
+JOB_WAIT_P95 = Gauge("jobs_wait_seconds_p95", "95th percentile queue wait of recent jobs")
+JOB_RUN_P95 = Gauge("jobs_run_seconds_p95", "95th percentile run time of recent jobs")
+
+def observe_job_stats(stats: JobStats) -> None:
+    for state in ("queued", "scheduled", "running", "succeeded", "failed"):
+        JOBS.labels(state).set(getattr(stats, state))
+    JOB_WAIT_P95.set(stats.wait_seconds.p95)
+    JOB_RUN_P95.set(stats.run_seconds.p95)
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    seconds: float = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait"""
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.labels(self.engine_label).observe(time.perf_counter() - started)
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait"""
+    engine_label = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.labels(self.engine_label).observe(time.perf_counter() - started)
+
+# engine label -> engine, for pool utilization at scrape time
+_engines: Dict[str, Engine] = {}
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """Count statements and their time on a (sync) engine"""
+    _engines[label] = engine
+    statements = STATEMENTS.labels(label)
+    statement_seconds = STATEMENT_SECONDS.labels(label)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+        statements.inc()
+        statement_seconds.inc(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # after_cursor_execute does not run for failed statements
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("statement_started"):
+            connection.info["statement_started"].pop()
+
+class _PoolCollector:
+    """Pool size and use, read when scraped"""
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["engine"])
+        for label, engine in _engines.items():
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                size.add_metric([label], pool.size())
+                checked_out.add_metric([label], pool.checkedout())
+                overflow.add_metric([label], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+REGISTRY.register(_PoolCollector())
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            in_flight.dec()
+            # Set by the router once a route matched; static mounts and 404s share one label
+            route = getattr(scope.get("route"), "path", "<other>")
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(elapsed)
+            REQUEST_STATEMENTS.labels(route).observe(stats.statements)
+            REQUEST_DB_SECONDS.labels(route).observe(stats.seconds)
@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+
+class PageParams:
+    """
+    Listing parameters. Passing ``cursor`` selects keyset pagination; otherwise
+    ``page``/``per_page`` (or the older ``skip``/``limit``) select offset mode.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous next_cursor"),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+        page: Optional[int] = Query(None, ge=1),
+        per_page: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+        include_total: bool = Query(False, description="Add an estimated total count")
+    ):
+        self.cursor = cursor
+        self.limit = per_page or limit
+        self.page = page
+        self.offset = (page - 1) * self.limit if page else skip
+        self.include_total = include_total
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode an opaque cursor back into (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(created_at) if created_at else None, int(row_id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """
+    Cheap row count for a listing query. On Postgres this reads the planner's
+    estimate via EXPLAIN instead of counting rows; elsewhere it counts.
+    """
+    if db.bind.dialect.name == "postgresql":
+        try:
+            compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        except CompileError:
+            compiled = None
+        if compiled is not None:
+            result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+async def paginate(db: AsyncSession, query: Select, model: Any, params: PageParams) -> Dict[str, Any]:
+    """
+    Run a listing query ordered newest first by (created_at, id).
+
+    Keyset mode seeks past the cursor using the (created_at, id) index, so deep
+    pages cost the same as the first one and rows created meanwhile do not
+    shift later pages.
+    """
+    order_key = tuple_(model.created_at, model.id)
+    page_query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if params.cursor:
+        created_at, row_id = decode_cursor(params.cursor)
+        # Seek from the cursor row's stored created_at (a primary key lookup)
+        # so driver datetime formatting cannot skew the comparison; fall back
+        # to the decoded value if that row has since been deleted
+        anchor = select(model.created_at).where(model.id == row_id).scalar_subquery()
+        page_query = page_query.where(order_key < tuple_(func.coalesce(anchor, created_at), row_id))
+    else:
+        page_query = page_query.offset(params.offset)
+
+    # Fetch one extra row to know whether another page follows
+    result = await db.execute(page_query.limit(params.limit + 1))
+    rows: Sequence[Any] = result.scalars().all()
+    has_more = len(rows) > params.limit
+    rows = rows[:params.limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    total = await estimate_count(db, query) if params.include_total else None
+    return {
+        "items": rows,
+        "next_cursor": next_cursor,
+        "total": total,
+        "page": params.page if not params.cursor else None,
+        "per_page": params.limit,
+        "pages": -(-total // params.limit) if total is not None else None
+    }
@@ -0,0 +1,34 @@
+"""
+Single-pass response serialization.
+
+An endpoint that returns ``respond(Schema, value)`` validates ``value`` (ORM
+objects, dicts or model instances) once against a cached TypeAdapter and has
+pydantic-core encode the JSON. The result is a finished Response, so FastAPI
+skips validating and encoding it again through ``response_model``; keep
+``response_model`` on the route for the OpenAPI schema. Plain dicts returned
+from other endpoints are encoded by orjson (the app's default response class).
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter for a response type, built once per type"""
+    return TypeAdapter(schema)
+
+def dump_json(schema: Any, value: Any) -> bytes:
+    adapter = get_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def respond(schema: Any, value: Any, status_code: int = 200,
+            headers: Optional[Mapping[str, str]] = None) -> Response:
+    """JSON response of ``value`` validated as ``schema``"""
+    return Response(
+        content=dump_json(schema, value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
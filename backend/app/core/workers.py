@@ -0,0 +1,45 @@
+"""
+Shared process pool for CPU-bound work (build parsing, image resizing).
+
+Work submitted here never runs on the event loop or a request thread. The pool
+is bounded by WORKER_PROCESSES and created on first use. Workers run at
+WORKER_NICENESS, so when cores are scarce the server's own process (the event
+loop answering requests) is scheduled first.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from .config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _lower_priority(niceness: int) -> None:
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop is not safe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.WORKER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_priority,
+            initargs=(settings.WORKER_NICENESS,)
+        )
+    return _pool
+
+async def start_process_pool() -> None:
+    """Spawn the workers now rather than in the middle of the first request that needs one"""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(settings.WORKER_PROCESSES)))
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,10 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from enum import Enum
 from ..core.database import Base
 
+class RollupPeriod(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
 class AppAnalytics(Base):
+    # On Postgres the table is partitioned by month on ``date`` with primary
+    # key (id, date); see alembic 0002 and services.partitions
     __tablename__ = "app_analytics"
+    __table_args__ = (
+        UniqueConstraint("app_id", "date", name="uq_app_analytics_app_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     app_id = Column(Integer, ForeignKey("apps.id"), nullable=False)
@@ -43,8 +54,64 @@ class AppAnalytics(Base):
     def __repr__(self):
         return f"<AppAnalytics(app_id={self.app_id}, date='{self.date}')>"
 
+class AppAnalyticsRollup(Base):
+    __tablename__ = "app_analytics_rollups"
+    __table_args__ = (
+        UniqueConstraint("app_id", "period", "bucket_start", name="uq_app_analytics_rollups_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    app_id = Column(Integer, ForeignKey("apps.id"), nullable=False)
+    period = Column(SQLEnum(RollupPeriod), nullable=False)
+    bucket_start = Column(Date, nullable=False)  # day, Monday of the week, or 1st of the month
+    
+    # Number of daily rows folded into this bucket
+    row_count = Column(Integer, default=0, nullable=False)
+    
+    # Additive metrics (plain sums)
+    daily_active_users = Column(Integer, default=0, nullable=False)
+    new_users = Column(Integer, default=0, nullable=False)
+    returning_users = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+    in_app_purchases = Column(Float, default=0.0, nullable=False)
+    ad_revenue = Column(Float, default=0.0, nullable=False)
+    
+    # Averaged metrics (sums, divide by row_count)
+    retention_day_1_sum = Column(Float, default=0.0, nullable=False)
+    retention_day_7_sum = Column(Float, default=0.0, nullable=False)
+    retention_day_30_sum = Column(Float, default=0.0, nullable=False)
+    crash_rate_sum = Column(Float, default=0.0, nullable=False)
+    app_store_rating_sum = Column(Float, default=0.0, nullable=False)
+    
+    # Peak metrics (never lowered when daily rows are removed)
+    monthly_active_users_peak = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<AppAnalyticsRollup(app_id={self.app_id}, period='{self.period}', bucket_start='{self.bucket_start}')>"
+
+class RetentionCohort(Base):
+    # One row per app, install day and day since install; the primary key is
+    # the storage order, so a cohort's curve is one contiguous range
+    __tablename__ = "retention_cohorts"
+    __table_args__ = (
+        Index("ix_retention_cohorts_install_date", "install_date", "day_n"),
+    )
+    
+    app_id = Column(Integer, ForeignKey("apps.id"), primary_key=True)
+    install_date = Column(Date, primary_key=True)
+    day_n = Column(SmallInteger, primary_key=True)  # 0 is the install day
+    users = Column(Integer, default=0, nullable=False)  # installs on day 0, active users after
+    
+    def __repr__(self):
+        return f"<RetentionCohort(app_id={self.app_id}, install_date='{self.install_date}', day_n={self.day_n})>"
+
 class MarketingCampaign(Base):
     __tablename__ = "marketing_campaigns"
+    __table_args__ = (
+        UniqueConstraint("app_id", "name", name="uq_marketing_campaigns_app_name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -81,6 +148,9 @@ class MarketingCampaign(Base):
 
 class BusinessMetrics(Base):
     __tablename__ = "business_metrics"
+    __table_args__ = (
+        UniqueConstraint("app_id", "month", name="uq_business_metrics_app_month"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     app_id = Column(Integer, ForeignKey("apps.id"), nullable=False)
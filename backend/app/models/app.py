@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import BigInteger, Column, Index, Integer, JSON, String, Text, Boolean, DateTime, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
@@ -17,14 +18,31 @@ class AppType(str, Enum):
     GAME = "game"
     WEB_APP = "web_app"
 
+class MetadataStatus(str, Enum):
+    PENDING = "pending"
+    EXTRACTING = "extracting"
+    APPLYING = "applying"
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
 class Platform(str, Enum):
     ANDROID = "android"
     IOS = "ios"
     WEB = "web"
     CROSS_PLATFORM = "cross_platform"
 
+# JSON list columns: jsonb on Postgres (indexable), JSON text elsewhere; None is SQL NULL
+JSON_LIST = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 class App(Base):
     __tablename__ = "apps"
+    __table_args__ = (
+        # Keyset pagination order (created_at, id)
+        Index("ix_apps_created_at_id", "created_at", "id"),
+        # tags_any / tags_all filters (?| and @>)
+        Index("ix_apps_tags", "tags", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -43,11 +61,11 @@ class App(Base):
     
     # Media
     icon_url = Column(String, nullable=True)
-    screenshots = Column(Text, nullable=True)  # JSON array of URLs
+    screenshots = Column(JSON_LIST, nullable=True)  # list of URLs
     
     # Business info
     category = Column(String, nullable=True)
-    tags = Column(Text, nullable=True)  # JSON array
+    tags = Column(JSON_LIST, nullable=True)  # list of strings
     target_audience = Column(String, nullable=True)
     
     # Relationships
@@ -68,4 +86,76 @@ class App(Base):
     def __repr__(self):
         return f"<App(name='{self.name}', status='{self.status}')>"
 
+class MemberRole(str, Enum):
+    OWNER = "owner"  # created_by
+    PRODUCT_MANAGER = "product_manager"  # assigned_pm
+    MARKETING = "marketing"  # assigned_marketing
+
+class AppMember(Base):
+    """A user's part in an app, mirrored from the app's columns by services.membership"""
+    __tablename__ = "app_members"
+    __table_args__ = (
+        Index("ix_app_members_app_id", "app_id"),
+    )
+    
+    # The primary key leads with user_id and holds every column, so it covers
+    # looking up a user's apps (optionally by role)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    app_id = Column(Integer, ForeignKey("apps.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(SQLEnum(MemberRole), primary_key=True)
+    
+    def __repr__(self):
+        return f"<AppMember(user_id={self.user_id}, app_id={self.app_id}, role='{self.role}')>"
 
+class AppArtifact(Base):
+    """A stored build or media file, content-addressed by its SHA-256"""
+    __tablename__ = "app_artifacts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    app_id = Column(Integer, ForeignKey("apps.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    extension = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    storage_path = Column(String, nullable=False)  # relative to UPLOAD_DIR
+    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Build metadata extraction progress
+    metadata_status = Column(SQLEnum(MetadataStatus), default=MetadataStatus.PENDING, nullable=False)
+    metadata_error = Column(Text, nullable=True)
+    
+    def __repr__(self):
+        return f"<AppArtifact(filename='{self.filename}', sha256='{self.sha256[:12]}')>"
+
+class ArtifactUpload(Base):
+    """An in-progress resumable upload"""
+    __tablename__ = "artifact_uploads"
+    
+    id = Column(String(32), primary_key=True)
+    app_id = Column(Integer, ForeignKey("apps.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)  # declared total size
+    offset = Column(BigInteger, nullable=False, default=0)  # bytes received so far
+    expected_sha256 = Column(String(64), nullable=True)
+    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ArtifactUpload(filename='{self.filename}', offset={self.offset}/{self.size})>"
+
+class ArtifactMetadata(Base):
+    """Metadata extracted from a build, cached by content hash"""
+    __tablename__ = "artifact_metadata"
+    
+    sha256 = Column(String(64), primary_key=True)
+    platform = Column(String, nullable=True)
+    package_name = Column(String, nullable=True)
+    version = Column(String, nullable=True)
+    build_number = Column(Integer, nullable=True)
+    icon_path = Column(String, nullable=True)  # relative to UPLOAD_DIR
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ArtifactMetadata(package_name='{self.package_name}', version='{self.version}')>"
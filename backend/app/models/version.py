@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class DataVersion(Base):
+    """Change counter per dataset, used to build HTTP cache validators"""
+    __tablename__ = "data_versions"
+    
+    name = Column(String, primary_key=True)  # "apps", "analytics"
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<DataVersion(name='{self.name}', version={self.version})>"
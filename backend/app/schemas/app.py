@@ -1,7 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, computed_field, model_validator
+from typing import Optional, List, Tuple
 from datetime import datetime
 from ..models.app import AppStatus, AppType, Platform
+from ..services.thumbnails import thumbnail_url
 
 class AppBase(BaseModel):
     name: str
@@ -45,6 +46,18 @@ class AppResponse(AppBase):
     published_at: Optional[datetime] = None
     
     model_config = {"from_attributes": True}
+    
+    @computed_field
+    @property
+    def icon_thumbnail_url(self) -> Optional[str]:
+        return thumbnail_url(self.icon_url, "icon-192")
+    
+    @computed_field
+    @property
+    def screenshot_thumbnail_urls(self) -> Optional[List[Optional[str]]]:
+        if self.screenshots is None:
+            return None
+        return [thumbnail_url(url, "screenshot-360") for url in self.screenshots]
 
 class AppListResponse(BaseModel):
     id: int
@@ -55,6 +68,52 @@ class AppListResponse(BaseModel):
     status: AppStatus
     version: str
     icon_url: Optional[str] = None
+    tags: Optional[List[str]] = None
     created_at: datetime
     
     model_config = {"from_attributes": True}
+    
+    @computed_field
+    @property
+    def icon_thumbnail_url(self) -> Optional[str]:
+        return thumbnail_url(self.icon_url, "icon-96")
+
+class AppBatchResponse(BaseModel):
+    items: List[AppResponse]  # in the order requested
+    missing: List[int] = []  # not found, or not visible to the caller
+
+class AppBulkUpdateItem(AppUpdate):
+    id: int
+
+class AppBulkUpdate(BaseModel):
+    """Either per-app ``items``, or one set of ``changes`` applied to every id in ``ids``"""
+    items: Optional[List[AppBulkUpdateItem]] = None
+    ids: Optional[List[int]] = None
+    changes: Optional[AppUpdate] = None
+    atomic: bool = False  # apply nothing if any item fails
+    
+    @model_validator(mode="after")
+    def check_form(self) -> "AppBulkUpdate":
+        if (self.items is None) == (self.ids is None):
+            raise ValueError("Give either items, or ids with changes")
+        if self.ids is not None and self.changes is None:
+            raise ValueError("changes is required with ids")
+        app_ids = [app_id for app_id, _ in self.expand()]
+        if len(set(app_ids)) != len(app_ids):
+            raise ValueError("Each app id may appear only once")
+        return self
+    
+    def expand(self) -> List[Tuple[int, AppUpdate]]:
+        if self.items is not None:
+            return [(item.id, item) for item in self.items]
+        return [(app_id, self.changes) for app_id in self.ids]
+
+class AppBulkItemResult(BaseModel):
+    id: int
+    status_code: int  # as the single-app endpoint would have answered
+    detail: Optional[str] = None
+    app: Optional[AppResponse] = None
+
+class AppBulkUpdateResponse(BaseModel):
+    results: List[AppBulkItemResult]
+    updated: int
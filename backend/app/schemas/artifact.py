@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from ..models.app import MetadataStatus
+
+class UploadInit(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-fA-F]{64}$")
+
+class UploadStatus(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    offset: int
+    chunk_size: int
+
+class ArtifactResponse(BaseModel):
+    id: int
+    app_id: int
+    filename: str
+    extension: str
+    size: int
+    sha256: str
+    uploaded_by: int
+    created_at: datetime
+    metadata_status: MetadataStatus
+    metadata_error: Optional[str] = None
+    metadata_job_id: Optional[str] = None  # set right after upload
+    deduplicated: bool = False
+    
+    model_config = {"from_attributes": True}
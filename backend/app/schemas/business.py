@@ -0,0 +1,83 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+class BusinessMetricsResponse(BaseModel):
+    id: int
+    app_id: int
+    revenue_total: float
+    revenue_subscriptions: float
+    revenue_one_time: float
+    revenue_ads: float
+    development_cost: float
+    marketing_cost: float
+    operational_cost: float
+    customer_acquisition_cost: float
+    lifetime_value: float
+    churn_rate: float
+    month: datetime
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+class UnitEconomics(BaseModel):
+    revenue: float
+    cost: float
+    profit: float
+    margin: float  # % of revenue
+    cac: float  # marketing cost per acquired customer
+    ltv: float
+    ltv_cac: Optional[float] = None
+    payback_months: Optional[float] = None  # months of contribution to recover the CAC
+    churn_rate: float  # monthly, %
+
+class AppEconomics(UnitEconomics):
+    app_id: int
+    name: str
+    months: int  # months with reported metrics
+    margin_trend: Optional[float] = None  # percentage points per month
+    churn_trend: Optional[float] = None  # percentage points per month
+
+class BusinessSummary(BaseModel):
+    start: date
+    end: date
+    apps_reporting: int
+    totals: UnitEconomics
+    apps: List[AppEconomics]  # highest revenue first
+
+class MonthlyBusiness(UnitEconomics):
+    month: date
+    revenue_subscriptions: float
+    revenue_one_time: float
+    revenue_ads: float
+    development_cost: float
+    marketing_cost: float
+    operational_cost: float
+
+class RevenueReport(BaseModel):
+    start: date
+    end: date
+    months: List[MonthlyBusiness]
+
+class RevenuePoint(BaseModel):
+    month: date
+    revenue: float
+
+class ForecastPoint(RevenuePoint):
+    lower: float  # 80% interval
+    upper: float
+
+class AppForecast(BaseModel):
+    app_id: int
+    name: str
+    alpha: float  # level smoothing
+    beta: float  # trend smoothing
+    rmse: float  # one-step-ahead, over the history
+    forecast: List[ForecastPoint]
+
+class RevenueForecast(BaseModel):
+    horizon: int
+    history: List[RevenuePoint]  # portfolio
+    forecast: List[ForecastPoint]  # portfolio, the sum of the app forecasts
+    apps_fitted: int
+    apps: List[AppForecast]  # highest recent revenue first
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+class Cohort(BaseModel):
+    install_date: date
+    size: int  # day-0 users
+    retention: List[Optional[float]]  # % of size by day since install, up to the last day reached
+
+class CohortMatrix(BaseModel):
+    start: date
+    end: date
+    max_day: int
+    cohorts: List[Cohort]  # the triangle, oldest install day first
+    curve: List[Optional[float]]  # retention % by day, weighted by cohort size
+    curve_cohorts: List[int]  # cohorts behind each point of the curve
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import date
+from ..models.analytics import RollupPeriod
+
+class ChartPoint(BaseModel):
+    date: date
+    value: float
+
+class ChartResponse(BaseModel):
+    metric: str
+    granularity: RollupPeriod
+    start: date
+    end: date
+    points: List[ChartPoint]
+    source_points: int  # buckets before downsampling
+    downsampled: bool
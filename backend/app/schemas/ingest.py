@@ -0,0 +1,115 @@
+from pydantic import AfterValidator, BaseModel, Field, BeforeValidator, model_validator
+from typing import List, Optional, Dict, Any
+from typing_extensions import Annotated
+from datetime import date, datetime, timezone
+from enum import Enum
+
+def _midnight_if_date(value: Any) -> Any:
+    # Exports usually carry plain dates ("2024-06-01")
+    if isinstance(value, str) and len(value) == 10:
+        return f"{value}T00:00:00"
+    return value
+
+def _utc_midnight(value: datetime) -> datetime:
+    # Naive values are UTC, like everywhere else in ingest
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return datetime.combine(value.date(), datetime.min.time(), tzinfo=timezone.utc)
+
+def _utc_month_start(value: datetime) -> datetime:
+    return _utc_midnight(value).replace(day=1)
+
+DayOrDateTime = Annotated[datetime, BeforeValidator(_midnight_if_date)]
+# Keys of the daily and monthly datasets, so one period is always one row
+UtcDay = Annotated[DayOrDateTime, AfterValidator(_utc_midnight)]
+UtcMonth = Annotated[DayOrDateTime, AfterValidator(_utc_month_start)]
+
+class IngestDataset(str, Enum):
+    APP_ANALYTICS = "app_analytics"
+    MARKETING_CAMPAIGNS = "marketing_campaigns"
+    BUSINESS_METRICS = "business_metrics"
+    RETENTION_COHORTS = "retention_cohorts"
+
+class DataFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class AppAnalyticsIngestRow(BaseModel):
+    app_id: int
+    date: UtcDay
+    daily_active_users: int = 0
+    monthly_active_users: int = 0
+    new_users: int = 0
+    returning_users: int = 0
+    session_duration_avg: float = 0.0
+    sessions_per_user: float = 0.0
+    retention_day_1: float = 0.0
+    retention_day_7: float = 0.0
+    retention_day_30: float = 0.0
+    revenue: float = 0.0
+    in_app_purchases: float = 0.0
+    ad_revenue: float = 0.0
+    arpu: float = 0.0
+    crash_rate: float = 0.0
+    app_store_rating: float = 0.0
+    app_store_reviews_count: int = 0
+
+class MarketingCampaignIngestRow(BaseModel):
+    app_id: int
+    name: str
+    description: Optional[str] = None
+    campaign_type: str
+    budget: float = Field(0.0, ge=0)
+    spent: float = Field(0.0, ge=0)
+    is_active: bool = True
+    start_date: DayOrDateTime
+    end_date: Optional[DayOrDateTime] = None
+    impressions: int = Field(0, ge=0)
+    clicks: int = Field(0, ge=0)
+    installs: int = Field(0, ge=0)
+    cost_per_install: float = 0.0  # derived from spent and installs; a value in the file is ignored
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "MarketingCampaignIngestRow":
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+    @model_validator(mode="after")
+    def derive_cost_per_install(self) -> "MarketingCampaignIngestRow":
+        # As on the API path
+        self.cost_per_install = round(self.spent / self.installs, 4) if self.installs else 0.0
+        return self
+
+class BusinessMetricsIngestRow(BaseModel):
+    app_id: int
+    month: UtcMonth
+    revenue_total: float = 0.0
+    revenue_subscriptions: float = 0.0
+    revenue_one_time: float = 0.0
+    revenue_ads: float = 0.0
+    development_cost: float = 0.0
+    marketing_cost: float = 0.0
+    operational_cost: float = 0.0
+    customer_acquisition_cost: float = 0.0
+    lifetime_value: float = 0.0
+    churn_rate: float = 0.0
+
+class RetentionCohortIngestRow(BaseModel):
+    app_id: int
+    install_date: date
+    day_n: int = Field(ge=0, le=32767)
+    users: int = Field(ge=0)
+
+class RejectedRow(BaseModel):
+    line: int
+    errors: List[Dict[str, Any]]
+
+class IngestReport(BaseModel):
+    dataset: IngestDataset
+    rows_received: int
+    rows_loaded: int
+    rows_rejected: int
+    rejected: List[RejectedRow] = Field(default_factory=list)  # first rejections only
+    elapsed_seconds: float
+    rows_per_second: float
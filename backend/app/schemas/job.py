@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    id: str
+    name: str
+    kwargs: Dict[str, Any] = Field(default_factory=dict)
+    priority: int = 0  # higher runs first
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_retries: int = 0
+    timeout: float
+    result: Any = None
+    error: Optional[str] = None
+    created_by: Optional[int] = None
+    enqueued_at: datetime
+    run_at: datetime  # not claimed before this (retry backoff, delays)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobCreate(BaseModel):
+    name: str
+    kwargs: Dict[str, Any] = Field(default_factory=dict)
+    priority: Optional[int] = None
+    delay_seconds: float = Field(0, ge=0)
+
+class LatencySummary(BaseModel):
+    count: int = 0
+    avg: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    max: float = 0.0
+
+class JobStats(BaseModel):
+    queued: int  # ready to run now
+    scheduled: int  # waiting for run_at (retries, delays)
+    running: int
+    succeeded: int  # totals since the backend was created
+    failed: int
+    wait_seconds: LatencySummary  # enqueue (or run_at) to start, recent jobs
+    run_seconds: LatencySummary
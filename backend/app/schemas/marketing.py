@@ -0,0 +1,99 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from datetime import date, datetime
+
+class CampaignBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    app_id: int
+    campaign_type: str  # social_media, google_ads, apple_search_ads, etc.
+    budget: float = Field(0.0, ge=0)
+    spent: float = Field(0.0, ge=0)
+    is_active: bool = True
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    impressions: int = Field(0, ge=0)
+    clicks: int = Field(0, ge=0)
+    installs: int = Field(0, ge=0)
+
+class CampaignCreate(CampaignBase):
+    @model_validator(mode="after")
+    def check_dates(self) -> "CampaignCreate":
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+class CampaignUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    campaign_type: Optional[str] = None
+    budget: Optional[float] = Field(None, ge=0)
+    spent: Optional[float] = Field(None, ge=0)
+    is_active: Optional[bool] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    impressions: Optional[int] = Field(None, ge=0)
+    clicks: Optional[int] = Field(None, ge=0)
+    installs: Optional[int] = Field(None, ge=0)
+
+class CampaignResponse(CampaignBase):
+    id: int
+    cost_per_install: float
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+class CampaignPerformance(BaseModel):
+    id: int
+    name: str
+    app_id: int
+    campaign_type: str
+    is_active: bool
+    start_date: date
+    end_date: Optional[date] = None
+    budget: float
+    spent: float
+    impressions: int
+    clicks: int
+    installs: int
+    revenue: float  # attributed, see services.marketing
+    ctr: float  # clicks / impressions
+    conversion_rate: float  # installs / clicks
+    cpi: float  # spent / installs
+    roas: float  # revenue / spent
+    daily_burn: float  # average spend per day so far
+    budget_remaining: float
+    pacing: Optional[float] = None  # spent vs. spending the budget evenly over the flight; 1.0 is on pace
+    projected_exhaustion: Optional[date] = None  # when the budget runs out at the current burn
+
+class ChannelPerformance(BaseModel):
+    campaign_type: str
+    campaigns: int
+    spent: float
+    installs: int
+    revenue: float
+    ctr: float
+    cpi: float
+    roas: float
+
+class PerformanceTotals(BaseModel):
+    campaigns: int
+    active_campaigns: int
+    budget: float
+    spent: float
+    impressions: int
+    clicks: int
+    installs: int
+    revenue: float
+    ctr: float
+    cpi: float
+    roas: float
+    daily_burn: float  # across active campaigns
+
+class CampaignReport(BaseModel):
+    as_of: date
+    totals: PerformanceTotals
+    channels: List[ChannelPerformance]
+    campaigns: List[CampaignPerformance]
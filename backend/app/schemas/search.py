@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Generic, List, TypeVar
+from enum import Enum
+
+T = TypeVar("T")
+
+class SearchMode(str, Enum):
+    AUTO = "auto"  # all of the below, the last word as a prefix
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"  # trigram similarity, tolerates typos
+    FULLTEXT = "fulltext"  # whole words
+
+class SearchHit(BaseModel, Generic[T]):
+    item: T
+    score: float
+
+class SearchResults(BaseModel, Generic[T]):
+    query: str
+    mode: SearchMode
+    items: List[SearchHit[T]]  # best match first
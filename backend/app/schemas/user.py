@@ -31,11 +31,28 @@ class UserResponse(UserBase):
 class GoogleAuthRequest(BaseModel):
     id_token: str
 
-class AuthResponse(BaseModel):
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
+    expires_in: int
+
+class AuthResponse(TokenResponse):
     user: UserResponse
 
+class CurrentUser(BaseModel):
+    """Authenticated user as described by access token claims"""
+    id: int
+    email: Optional[str] = None
+    role: UserRole
+    is_active: bool
+
 class TokenData(BaseModel):
     sub: Optional[str] = None
     email: Optional[str] = None
@@ -0,0 +1,271 @@
+"""
+Metadata parsers for APK, AAB and IPA builds.
+
+These functions are CPU-bound and run in worker processes (see
+``services.extraction``), so this module only imports the standard library
+to keep worker start-up cheap.
+"""
+import os
+import plistlib
+import re
+import struct
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Refuse archive members larger than this (zip bombs, corrupt headers)
+MAX_MEMBER_SIZE = 16 * 1024 * 1024
+
+# android:* attribute resource ids, used when attribute names are stripped
+ANDROID_ATTRIBUTES = {
+    0x01010001: "label",
+    0x01010002: "icon",
+    0x0101021B: "versionCode",
+    0x0101021C: "versionName",
+}
+
+DENSITY_ORDER = ["xxxhdpi", "xxhdpi", "xhdpi", "hdpi", "mdpi", "ldpi", "anydpi"]
+
+def _read_member(archive: zipfile.ZipFile, name: str) -> bytes:
+    info = archive.getinfo(name)
+    if info.file_size > MAX_MEMBER_SIZE:
+        raise ValueError(f"{name} is too large")
+    return archive.read(info)
+
+# --- Android binary XML (APK manifest) ---
+
+def _string_pool(data: bytes, pos: int) -> List[str]:
+    _, header_size, _, count, _, flags, strings_start, _ = struct.unpack_from("<HHIIIIII", data, pos)
+    offsets = struct.unpack_from(f"<{count}I", data, pos + header_size)
+    base = pos + strings_start
+    strings = []
+    for offset in offsets:
+        at = base + offset
+        if flags & 0x100:
+            # UTF-8: character count, then byte count, each 1 or 2 bytes
+            at += 2 if data[at] & 0x80 else 1
+            length = data[at]
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[at + 1]
+                at += 2
+            else:
+                at += 1
+            strings.append(data[at:at + length].decode("utf-8", "replace"))
+        else:
+            length = struct.unpack_from("<H", data, at)[0]
+            at += 2
+            if length & 0x8000:
+                length = ((length & 0x7FFF) << 16) | struct.unpack_from("<H", data, at)[0]
+                at += 2
+            strings.append(data[at:at + length * 2].decode("utf-16-le", "replace"))
+    return strings
+
+def _typed_value(strings: List[str], raw: int, data_type: int, value: int) -> Any:
+    if raw != 0xFFFFFFFF:
+        return strings[raw]
+    if data_type == 0x03:
+        return strings[value]
+    if data_type in (0x10, 0x11):
+        return struct.unpack("<i", struct.pack("<I", value))[0]
+    if data_type == 0x12:
+        return value != 0
+    if data_type == 0x01:
+        return f"@0x{value:08x}"
+    return value
+
+def iter_binary_xml(data: bytes) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (tag, attributes) for every start element of an Android binary XML file"""
+    kind, header_size, _ = struct.unpack_from("<HHI", data, 0)
+    if kind != 0x0003:
+        raise ValueError("Not an Android binary XML document")
+
+    strings: List[str] = []
+    resource_ids: List[int] = []
+    pos = header_size
+    while pos + 8 <= len(data):
+        kind, header_size, size = struct.unpack_from("<HHI", data, pos)
+        if size < 8:
+            raise ValueError("Corrupt binary XML chunk")
+        if kind == 0x0001:
+            strings = _string_pool(data, pos)
+        elif kind == 0x0180:
+            resource_ids = list(struct.unpack_from(f"<{(size - header_size) // 4}I", data, pos + header_size))
+        elif kind == 0x0102:
+            _, name, attribute_start, attribute_size, attribute_count = struct.unpack_from("<IIHHH", data, pos + 16)
+            attributes = {}
+            at = pos + 16 + attribute_start
+            for _ in range(attribute_count):
+                _, attr_name, raw, _, _, data_type, value = struct.unpack_from("<IIIHBBI", data, at)
+                key = strings[attr_name] if attr_name < len(strings) else ""
+                if attr_name < len(resource_ids) and resource_ids[attr_name] in ANDROID_ATTRIBUTES:
+                    key = ANDROID_ATTRIBUTES[resource_ids[attr_name]]
+                attributes[key] = _typed_value(strings, raw, data_type, value)
+                at += attribute_size
+            yield strings[name], attributes
+        pos += size
+
+# --- aapt2 protobuf XML (AAB manifest) ---
+
+def _proto_fields(buf: bytes) -> Iterator[Tuple[int, Any]]:
+    pos = 0
+    while pos < len(buf):
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _varint(buf, pos)
+        elif wire == 1:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire == 2:
+            length, pos = _varint(buf, pos)
+            value, pos = buf[pos:pos + length], pos + length
+        elif wire == 5:
+            value, pos = buf[pos:pos + 4], pos + 4
+        else:
+            raise ValueError("Unsupported protobuf wire type")
+        yield field, value
+
+def _varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def iter_proto_xml(data: bytes) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (tag, attributes) for every element of an aapt2 proto XmlNode"""
+    for field, node in _proto_fields(data):
+        if field != 1:  # XmlNode.element
+            continue
+        name = ""
+        attributes: Dict[str, Any] = {}
+        children = []
+        for element_field, value in _proto_fields(node):
+            if element_field == 3:
+                name = value.decode()
+            elif element_field == 4:
+                key, text, resource_id = "", None, None
+                for attr_field, attr_value in _proto_fields(value):
+                    if attr_field == 2:
+                        key = attr_value.decode()
+                    elif attr_field == 3:
+                        text = attr_value.decode()
+                    elif attr_field == 5:
+                        resource_id = attr_value
+                key = ANDROID_ATTRIBUTES.get(resource_id, key)
+                attributes[key] = text
+            elif element_field == 5:
+                children.append(value)
+        yield name, attributes
+        for child in children:
+            yield from iter_proto_xml(child)
+
+# --- shared ---
+
+def _int_or_none(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _density_rank(path: str) -> int:
+    folder = path.split("/")[-2]
+    for rank, density in enumerate(DENSITY_ORDER):
+        if density in folder:
+            return rank
+    return len(DENSITY_ORDER)
+
+def _pick_android_icon(names: List[str], prefix: str, icon: Any) -> Optional[str]:
+    # Without resolving resources.arsc an icon reference is only usable when it
+    # is symbolic (AAB); otherwise fall back to the usual launcher icon name
+    match = re.match(r"@(?:[\w.]+:)?(mipmap|drawable)/(\w+)$", icon) if isinstance(icon, str) else None
+    stem = match.group(2) if match else "ic_launcher"
+    candidates = [
+        name for name in names
+        if name.startswith(f"{prefix}res/") and name.endswith(".png")
+        and os.path.splitext(os.path.basename(name))[0] == stem
+    ]
+    return min(candidates, key=_density_rank) if candidates else None
+
+def _android_metadata(archive: zipfile.ZipFile, manifest: str, elements: Iterator[Tuple[str, Dict[str, Any]]],
+                      res_prefix: str) -> Dict[str, Any]:
+    package = version = build = icon = None
+    for tag, attributes in elements:
+        if tag == "manifest":
+            package = attributes.get("package")
+            version = attributes.get("versionName")
+            build = attributes.get("versionCode")
+        elif tag == "application":
+            icon = attributes.get("icon")
+            break
+    if not package:
+        raise ValueError(f"No package name in {manifest}")
+
+    icon_name = _pick_android_icon(archive.namelist(), res_prefix, icon)
+    return {
+        "platform": "android",
+        "package_name": package,
+        "version": str(version) if version is not None else None,
+        "build_number": _int_or_none(build),
+        "icon": _read_member(archive, icon_name) if icon_name else None,
+    }
+
+def _apk_metadata(archive: zipfile.ZipFile) -> Dict[str, Any]:
+    manifest = _read_member(archive, "AndroidManifest.xml")
+    return _android_metadata(archive, "AndroidManifest.xml", iter_binary_xml(manifest), "")
+
+def _aab_metadata(archive: zipfile.ZipFile) -> Dict[str, Any]:
+    manifest = _read_member(archive, "base/manifest/AndroidManifest.xml")
+    return _android_metadata(archive, "base/manifest/AndroidManifest.xml", iter_proto_xml(manifest), "base/")
+
+def _ipa_metadata(archive: zipfile.ZipFile) -> Dict[str, Any]:
+    names = archive.namelist()
+    plist_name = next((name for name in names if re.fullmatch(r"Payload/[^/]+\.app/Info\.plist", name)), None)
+    if plist_name is None:
+        raise ValueError("No Info.plist in Payload/")
+    info = plistlib.loads(_read_member(archive, plist_name))
+    bundle = plist_name[:-len("Info.plist")]
+
+    icon_files = list(
+        info.get("CFBundleIcons", {}).get("CFBundlePrimaryIcon", {}).get("CFBundleIconFiles", [])
+        or info.get("CFBundleIconFiles", [])
+    )
+    if info.get("CFBundleIconFile"):
+        icon_files.append(info["CFBundleIconFile"])
+    candidates = [
+        archive.getinfo(name) for name in names
+        if name.startswith(bundle) and name.count("/") == bundle.count("/") and name.endswith(".png")
+        and any(os.path.basename(name).startswith(os.path.splitext(icon)[0]) for icon in icon_files)
+    ]
+    # Largest file is the highest resolution variant (@3x); note that iOS
+    # stores these as CgBI PNGs, which most decoders cannot read as-is
+    icon = max(candidates, key=lambda member: member.file_size) if candidates else None
+
+    return {
+        "platform": "ios",
+        "package_name": info.get("CFBundleIdentifier"),
+        "version": info.get("CFBundleShortVersionString"),
+        "build_number": _int_or_none(info.get("CFBundleVersion")),
+        "icon": _read_member(archive, icon.filename) if icon else None,
+    }
+
+PARSERS = {
+    ".apk": _apk_metadata,
+    ".aab": _aab_metadata,
+    ".ipa": _ipa_metadata,
+}
+
+def extract_metadata(path: str, extension: str) -> Dict[str, Any]:
+    """
+    Read package name, version, build number and icon bytes from a build.
+    Raises ValueError when the file is not a readable build.
+    """
+    parser = PARSERS.get(extension)
+    if parser is None:
+        raise ValueError(f"No metadata parser for {extension}")
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return parser(archive)
+    except (zipfile.BadZipFile, KeyError, struct.error, IndexError, UnicodeDecodeError, plistlib.InvalidFileException) as e:
+        raise ValueError(f"Unreadable {extension} build: {e}") from e
@@ -0,0 +1,328 @@
+"""
+Unit economics and revenue forecasts from monthly business metrics.
+
+The metrics of every app in the window are read with one query into dense
+(apps x months) matrices. Per-app figures reduce along the month axis,
+portfolio trends along the app axis and the totals over both, all through
+the same vectorized ``unit_economics``.
+
+Forecasts use damped Holt (additive trend) exponential smoothing. Each app
+gets its own smoothing parameters, picked by the smallest one-step-ahead
+squared error over a fixed grid: every app and every grid point advance
+together, one month per step, so a fit is a few dozen array operations
+whatever the number of apps. Large portfolios are split across the worker
+processes.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.workers import get_process_pool
+from ..models.analytics import BusinessMetrics
+from ..models.app import App
+from .marketing import ratio
+from .rollups import to_day
+
+MONTHLY_FIELDS = (
+    "revenue_total", "revenue_subscriptions", "revenue_one_time", "revenue_ads",
+    "development_cost", "marketing_cost", "operational_cost",
+    "customer_acquisition_cost", "lifetime_value", "churn_rate",
+)
+
+# Smoothing grid: every (alpha, beta) pair is fitted for every app
+ALPHAS = np.linspace(0.1, 0.9, 9)
+BETAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3, 0.5])
+DAMPING = 0.9
+Z_80 = 1.2816
+
+def month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+def month_start(index: int) -> date:
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_timestamp(index: int) -> datetime:
+    """Start of the month, as stored in BusinessMetrics.month"""
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+@dataclass
+class MonthlyMatrix:
+    apps: np.ndarray  # sorted app ids, one row each
+    first: int  # month index of column 0
+    present: np.ndarray  # (apps x months) True where the app reported that month
+    values: Dict[str, np.ndarray]  # field -> (apps x months), 0 where not reported
+
+    @property
+    def months(self) -> int:
+        return self.present.shape[1]
+
+async def load_monthly(db: AsyncSession, first: int, last: int,
+                       app_ids: Optional[List[int]] = None) -> MonthlyMatrix:
+    """Business metrics for months first..last (month indexes) of every reporting app"""
+    query = select(BusinessMetrics.app_id, BusinessMetrics.month, *[
+        getattr(BusinessMetrics, name) for name in MONTHLY_FIELDS
+    ]).where(BusinessMetrics.month >= month_timestamp(first), BusinessMetrics.month < month_timestamp(last + 1))
+    if app_ids is not None:
+        query = query.where(BusinessMetrics.app_id.in_(app_ids))
+    # Core rows: the ORM result layer would dominate at this row count
+    rows = (await (await db.connection()).execute(query)).all()
+
+    months = max(last - first + 1, 0)
+    if not rows:
+        return MonthlyMatrix(np.zeros(0, dtype=np.int64), first, np.zeros((0, months), dtype=bool),
+                             {name: np.zeros((0, months)) for name in MONTHLY_FIELDS})
+
+    app_column, month_column, *value_columns = zip(*rows)
+    apps, app_index = np.unique(np.array(app_column, dtype=np.int64), return_inverse=True)
+    indexes = {value: month_index(to_day(value)) for value in set(month_column)}
+    month_position = np.array([indexes[value] for value in month_column], dtype=np.int64) - first
+
+    present = np.zeros((len(apps), months), dtype=bool)
+    present[app_index, month_position] = True
+    values = {}
+    for name, column in zip(MONTHLY_FIELDS, value_columns):
+        matrix = np.zeros((len(apps), months))
+        matrix[app_index, month_position] = np.array([value or 0.0 for value in column], dtype=float)
+        values[name] = matrix
+    return MonthlyMatrix(apps, first, present, values)
+
+def unit_economics(values: Dict[str, np.ndarray], axis: Optional[int]) -> Dict[str, np.ndarray]:
+    """
+    Revenue, cost, margin, CAC, LTV, LTV/CAC, payback and churn, summed along
+    ``axis`` (None for the grand total). Customers acquired in a cell are its
+    marketing cost over its CAC; LTV is averaged over those customers (over
+    revenue where nothing was acquired) and churn over revenue.
+    """
+    revenue = values["revenue_total"].sum(axis)
+    marketing = values["marketing_cost"].sum(axis)
+    operational = values["operational_cost"].sum(axis)
+    cost = values["development_cost"].sum(axis) + marketing + operational
+
+    acquired_cells = ratio(values["marketing_cost"], values["customer_acquisition_cost"])
+    acquired = acquired_cells.sum(axis)
+    cac = ratio(marketing, acquired)
+    ltv = np.where(
+        acquired > 0,
+        ratio((values["lifetime_value"] * acquired_cells).sum(axis), acquired),
+        ratio((values["lifetime_value"] * values["revenue_total"]).sum(axis), revenue)
+    )
+    churn = ratio((values["churn_rate"] * values["revenue_total"]).sum(axis), revenue)
+
+    # Monthly contribution of a customer: ARPU (LTV x churn) less operating cost
+    contribution = ltv * churn / 100 * (1 - ratio(operational, revenue))
+    return {
+        "revenue": revenue,
+        "cost": cost,
+        "profit": revenue - cost,
+        "margin": ratio(revenue - cost, revenue) * 100,
+        "cac": cac,
+        "ltv": ltv,
+        "ltv_cac": np.where(cac > 0, ratio(ltv, cac), np.nan),
+        "payback_months": np.where((cac > 0) & (contribution > 0), ratio(cac, contribution), np.nan),
+        "churn_rate": churn,
+    }
+
+def trend(series: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Least-squares slope per row over the reported months; NaN with fewer than two"""
+    x = np.arange(series.shape[1], dtype=float)
+    weight = present.astype(float)
+    count = weight.sum(axis=1)
+    x_mean = ratio((weight * x).sum(axis=1), count)[:, None]
+    y_mean = ratio((weight * series).sum(axis=1), count)[:, None]
+    dx = (x - x_mean) * weight
+    slope = ratio((dx * (series - y_mean)).sum(axis=1), (dx * (x - x_mean)).sum(axis=1))
+    return np.where(count >= 2, slope, np.nan)
+
+def _optional(values: np.ndarray, digits: int) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(value, digits) for value in values.tolist()]
+
+def _economics_columns(economics: Dict[str, np.ndarray]) -> Dict[str, List[Any]]:
+    """Rounded Python columns, converted once per metric"""
+    return {
+        "revenue": np.round(economics["revenue"], 2).tolist(),
+        "cost": np.round(economics["cost"], 2).tolist(),
+        "profit": np.round(economics["profit"], 2).tolist(),
+        "margin": np.round(economics["margin"], 2).tolist(),
+        "cac": np.round(economics["cac"], 2).tolist(),
+        "ltv": np.round(economics["ltv"], 2).tolist(),
+        "ltv_cac": _optional(economics["ltv_cac"], 3),
+        "payback_months": _optional(economics["payback_months"], 1),
+        "churn_rate": np.round(economics["churn_rate"], 2).tolist(),
+    }
+
+def _rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+async def app_names(db: AsyncSession, app_ids: List[int]) -> Dict[int, str]:
+    if not app_ids:
+        return {}
+    rows = await db.execute(select(App.id, App.name).where(App.id.in_(app_ids)))
+    return {row.id: row.name for row in rows}
+
+async def business_summary(db: AsyncSession, first: int, last: int, app_ids: Optional[List[int]] = None,
+                           limit: int = 100) -> Dict[str, Any]:
+    """Portfolio totals and per-app unit economics with margin and churn trends"""
+    matrix = await load_monthly(db, first, last, app_ids)
+    values = matrix.values
+    per_app = unit_economics(values, axis=1)
+    monthly_margin = ratio(values["revenue_total"] - values["development_cost"] - values["marketing_cost"]
+                           - values["operational_cost"], values["revenue_total"]) * 100
+    margin_trend = trend(monthly_margin, matrix.present & (values["revenue_total"] > 0))
+    churn_trend = trend(values["churn_rate"], matrix.present)
+
+    top = np.argsort(-per_app["revenue"], kind="stable")[:limit]
+    columns = {
+        "app_id": matrix.apps[top].tolist(),
+        "months": matrix.present[top].sum(axis=1).tolist(),
+        **_economics_columns({name: column[top] for name, column in per_app.items()}),
+        "margin_trend": _optional(margin_trend[top], 3),
+        "churn_trend": _optional(churn_trend[top], 3),
+    }
+    apps = _rows(columns)
+    names = await app_names(db, columns["app_id"])
+    for app in apps:
+        app["name"] = names.get(app["app_id"], "")
+
+    totals = _rows(_economics_columns({
+        name: np.atleast_1d(column) for name, column in unit_economics(values, axis=None).items()
+    }))[0]
+    return {
+        "start": month_start(first),
+        "end": month_start(last),
+        "apps_reporting": len(matrix.apps),
+        "totals": totals,
+        "apps": apps,
+    }
+
+async def revenue_report(db: AsyncSession, first: int, last: int,
+                         app_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Portfolio revenue breakdown, costs and unit economics per month"""
+    matrix = await load_monthly(db, first, last, app_ids)
+    values = matrix.values
+    columns = {
+        "month": [month_start(first + k) for k in range(matrix.months)],
+        **_economics_columns(unit_economics(values, axis=0)),
+        **{
+            name: np.round(values[name].sum(axis=0), 2).tolist()
+            for name in ("revenue_subscriptions", "revenue_one_time", "revenue_ads",
+                         "development_cost", "marketing_cost", "operational_cost")
+        },
+    }
+    return {"start": month_start(first), "end": month_start(last), "months": _rows(columns)}
+
+def fit_holt(series: np.ndarray, starts: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """
+    Fit damped Holt smoothing to every row of ``series`` (apps x months) from
+    its ``starts`` month on, choosing (alpha, beta) per row from the grid.
+    Returns the chosen parameters, one-step RMSE and ``horizon`` forecasts
+    with their standard errors. Runs in worker processes for large inputs.
+    """
+    apps, months = series.shape
+    alpha = np.repeat(ALPHAS, len(BETAS))[None, :]
+    beta = np.tile(BETAS, len(ALPHAS))[None, :]
+    level = np.zeros((apps, alpha.shape[1]))
+    slope = np.zeros_like(level)
+    sse = np.zeros_like(level)
+
+    for t in range(months):
+        y = series[:, t, None]
+        fitted = (t > starts)[:, None]
+        predicted = level + DAMPING * slope
+        error = np.where(fitted, y - predicted, 0.0)
+        sse += error ** 2
+        # The first observed month sets the level; the trend starts flat
+        level = np.where(fitted, predicted + alpha * error, np.where((t == starts)[:, None], y, level))
+        slope = np.where(fitted, DAMPING * slope + alpha * beta * error, slope)
+
+    rows = np.arange(apps)
+    best = np.argmin(sse, axis=1)
+    observations = np.maximum(months - 1 - starts, 1)
+    rmse = np.sqrt(sse[rows, best] / observations)
+    best_alpha, best_beta = alpha[0, best], beta[0, best]
+
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(DAMPING ** steps)
+    forecast = level[rows, best, None] + damped[None, :] * slope[rows, best, None]
+    # Standard error grows with the level and trend updates carried forward
+    carried = np.concatenate([
+        np.zeros((apps, 1)),
+        np.cumsum((best_alpha[:, None] * (1 + best_beta[:, None] * damped[None, :-1])) ** 2, axis=1)
+    ], axis=1)
+    return {
+        "alpha": best_alpha,
+        "beta": best_beta,
+        "rmse": rmse,
+        "forecast": np.maximum(forecast, 0.0),
+        "stderr": rmse[:, None] * np.sqrt(1 + carried),
+    }
+
+async def fit_all(series: np.ndarray, starts: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    """``fit_holt`` in-process, or in chunks across the worker pool for large portfolios"""
+    if len(series) < settings.FORECAST_PROCESS_MIN_APPS:
+        return fit_holt(series, starts, horizon)
+    loop = asyncio.get_running_loop()
+    chunks = np.array_split(np.arange(len(series)), settings.WORKER_PROCESSES)
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(get_process_pool(), fit_holt, series[chunk], starts[chunk], horizon)
+        for chunk in chunks if len(chunk)
+    ])
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+def _forecast_points(first: int, forecast: np.ndarray, stderr: np.ndarray) -> List[Dict[str, Any]]:
+    lower = np.maximum(forecast - Z_80 * stderr, 0.0)
+    upper = forecast + Z_80 * stderr
+    return [
+        {"month": month_start(first + k), "revenue": value, "lower": low, "upper": high}
+        for k, (value, low, high) in enumerate(zip(
+            np.round(forecast, 2).tolist(), np.round(lower, 2).tolist(), np.round(upper, 2).tolist()
+        ))
+    ]
+
+async def revenue_forecast(db: AsyncSession, first: int, last: int, horizon: int,
+                           app_ids: Optional[List[int]] = None, limit: int = 20) -> Dict[str, Any]:
+    """
+    Forecast monthly revenue for ``horizon`` months after ``last`` from the
+    history first..last, per app and for the portfolio (the sum of the apps,
+    with their errors treated as independent)
+    """
+    matrix = await load_monthly(db, first, last, app_ids)
+    series = matrix.values["revenue_total"]
+    # Months before an app's first report are not part of its history
+    starts = np.where(matrix.present.any(axis=1), matrix.present.argmax(axis=1), matrix.months)
+    fit = await fit_all(series, starts, horizon)
+
+    ahead = last + 1
+    portfolio = _forecast_points(ahead, fit["forecast"].sum(axis=0), np.sqrt((fit["stderr"] ** 2).sum(axis=0)))
+
+    # Rank apps by their latest quarter of revenue
+    top = np.argsort(-series[:, -3:].sum(axis=1), kind="stable")[:limit]
+    names = await app_names(db, matrix.apps[top].tolist())
+    apps = [
+        {
+            "app_id": app_id,
+            "name": names.get(app_id, ""),
+            "alpha": round(alpha, 2),
+            "beta": round(beta, 2),
+            "rmse": round(rmse, 2),
+            "forecast": _forecast_points(ahead, fit["forecast"][k], fit["stderr"][k]),
+        }
+        for k, app_id, alpha, beta, rmse in zip(
+            top.tolist(), matrix.apps[top].tolist(), fit["alpha"][top].tolist(),
+            fit["beta"][top].tolist(), fit["rmse"][top].tolist()
+        )
+    ]
+    history = np.round(series.sum(axis=0), 2).tolist()
+    return {
+        "horizon": horizon,
+        "history": [{"month": month_start(first + k), "revenue": value} for k, value in enumerate(history)],
+        "forecast": portfolio,
+        "apps_fitted": len(matrix.apps),
+        "apps": apps,
+    }
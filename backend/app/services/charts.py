@@ -0,0 +1,136 @@
+"""
+Time-bucketed chart series for the dashboard.
+
+Series are read from the day/week/month rollups (so a multi-year chart reads
+a few hundred rows, not one per app per day) and then capped at a point
+budget with Largest-Triangle-Three-Buckets downsampling, which keeps the
+visual shape (peaks, dips) that plain striding would drop.
+"""
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.analytics import AppAnalyticsRollup, RollupPeriod
+from .rollups import bucket_start
+
+# metric -> (aggregation, rollup column)
+# sum: total over the bucket; mean: per-day average of a *_sum column;
+# peak: highest daily value per app, added up across apps
+CHART_METRICS = {
+    "revenue": ("sum", "revenue"),
+    "in_app_purchases": ("sum", "in_app_purchases"),
+    "ad_revenue": ("sum", "ad_revenue"),
+    "daily_active_users": ("sum", "daily_active_users"),
+    "new_users": ("sum", "new_users"),
+    "returning_users": ("sum", "returning_users"),
+    "monthly_active_users": ("peak", "monthly_active_users_peak"),
+    "retention_day_1": ("mean", "retention_day_1_sum"),
+    "retention_day_7": ("mean", "retention_day_7_sum"),
+    "retention_day_30": ("mean", "retention_day_30_sum"),
+    "crash_rate": ("mean", "crash_rate_sum"),
+    "app_store_rating": ("mean", "app_store_rating_sum"),
+}
+
+# Older chart names
+CHART_ALIASES = {"users": "daily_active_users"}
+
+PERIOD_PATTERN = re.compile(r"^(\d{1,4})([dwmy])$")
+PERIOD_DAYS = {"d": 1, "w": 7, "m": 30, "y": 365}
+# Longest period a chart may cover
+PERIOD_MAX_DAYS = 20 * 365
+
+def parse_period(period: str, end: date) -> date:
+    """Start date for a period such as ``30d``, ``12w``, ``6m`` or ``2y``"""
+    match = PERIOD_PATTERN.match(period)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid period {period!r}; use e.g. 30d, 12w, 6m or 2y")
+    days = int(match.group(1)) * PERIOD_DAYS[match.group(2)]
+    if days > PERIOD_MAX_DAYS:
+        raise ValueError(f"Period {period!r} is longer than {PERIOD_MAX_DAYS} days")
+    return end - timedelta(days=days - 1)
+
+def granularity_for(start: date, end: date) -> RollupPeriod:
+    days = (end - start).days + 1
+    if days <= 92:
+        return RollupPeriod.DAY
+    if days <= 731:
+        return RollupPeriod.WEEK
+    return RollupPeriod.MONTH
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Bucket averages come from cumulative sums in one pass, and each bucket's
+    triangle areas are computed as one array operation; only the walk over
+    buckets (at most ``n_out``) is a Python loop, because each choice depends
+    on the previous one.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = ends - starts
+    avg_x = (cum_x[ends] - cum_x[starts]) / counts
+    avg_y = (cum_y[ends] - cum_y[starts]) / counts
+    # The third corner for bucket i is the average of bucket i + 1 (the last point for the final bucket)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(len(starts)):
+        s, e = starts[i], ends[i]
+        area = np.abs(
+            (x[anchor] - next_x[i]) * (y[s:e] - y[anchor])
+            - (x[anchor] - x[s:e]) * (next_y[i] - y[anchor])
+        )
+        anchor = s + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+async def chart_series(
+    db: AsyncSession,
+    metric: str,
+    start: date,
+    end: date,
+    granularity: RollupPeriod,
+    app_ids: Optional[Union[List[int], Select]] = None
+) -> Tuple[List[date], np.ndarray]:
+    """Bucket dates and metric values, summed across apps, oldest first"""
+    aggregation, column = CHART_METRICS[metric]
+    rollup = AppAnalyticsRollup
+    value = func.sum(getattr(rollup, column))
+    if aggregation == "mean":
+        value = value / func.nullif(func.sum(rollup.row_count), 0)
+
+    query = select(rollup.bucket_start, value.label("value")).where(
+        rollup.period == granularity,
+        rollup.bucket_start >= bucket_start(start, granularity),
+        rollup.bucket_start <= end
+    ).group_by(rollup.bucket_start).order_by(rollup.bucket_start)
+    if app_ids is not None:
+        query = query.where(rollup.app_id.in_(app_ids))
+
+    rows = (await db.execute(query)).all()
+    dates = [row.bucket_start for row in rows]
+    values = np.fromiter((row.value or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+    return dates, values
+
+def downsample(dates: List[date], values: np.ndarray, max_points: int) -> Tuple[List[date], np.ndarray]:
+    """Cap a series at ``max_points`` with LTTB (x is days since the first point)"""
+    if len(dates) <= max_points:
+        return dates, values
+    x = np.fromiter((d.toordinal() for d in dates), dtype=np.float64, count=len(dates))
+    keep = lttb(x, values, max_points)
+    return [dates[i] for i in keep], values[keep]
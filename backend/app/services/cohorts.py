@@ -0,0 +1,157 @@
+"""
+Retention cohort matrices from retention_cohorts.
+
+The users of every (install day, day since install) cell are summed over the
+requested apps in the database, then laid out as a dense (cohorts x days)
+array; retention, the triangle and the size-weighted curve are array
+operations on it.
+
+Those dense blocks are cached in memory per app set and horizon, keyed by the
+cohorts data version, and any install-date range inside a cached block is a
+slice of it. Dashboards keep asking for the most recent cohorts, so after the
+first request those are served without touching the database until the next
+cohort load.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.analytics import RetentionCohort
+from .marketing import ratio
+from .versions import COHORTS, get_versions
+
+# A cached block is widened to neighbouring ranges up to this many install days
+MAX_BLOCK_DAYS = 1100
+
+@dataclass
+class CohortBlock:
+    version: str
+    first: int  # ordinal of the first install day
+    last: int
+    users: np.ndarray  # (cohorts x max_day + 1), NaN where nothing was reported
+
+class CohortCache:
+    """LRU of dense cohort blocks, by app set and horizon"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CohortBlock]" = OrderedDict()
+
+    def get(self, key: Hashable, version: str) -> Optional[CohortBlock]:
+        block = self._entries.get(key)
+        if block is None or block.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return block
+
+    def put(self, key: Hashable, block: CohortBlock) -> None:
+        self._entries[key] = block
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+cohort_cache = CohortCache(settings.COHORT_CACHE_ENTRIES)
+
+async def load_block(db: AsyncSession, first: int, last: int, max_day: int,
+                     app_ids: Optional[List[int]]) -> np.ndarray:
+    """Users per cell, summed over the apps, for install days first..last"""
+    cohort = RetentionCohort
+    query = select(cohort.install_date, cohort.day_n, func.sum(cohort.users)).where(
+        cohort.install_date >= date.fromordinal(first),
+        cohort.install_date <= date.fromordinal(last),
+        cohort.day_n <= max_day
+    ).group_by(cohort.install_date, cohort.day_n)
+    if app_ids is not None:
+        query = query.where(cohort.app_id.in_(app_ids))
+    rows = (await (await db.connection()).execute(query)).all()
+
+    users = np.full((last - first + 1, max_day + 1), np.nan)
+    if rows:
+        days, day_n, totals = zip(*rows)
+        ordinals = {value: value.toordinal() for value in set(days)}
+        cohort_index = np.array([ordinals[value] for value in days], dtype=np.int64) - first
+        users[cohort_index, np.array(day_n, dtype=np.int64)] = np.array(totals, dtype=float)
+    return users
+
+async def cohort_users(db: AsyncSession, first: int, last: int, max_day: int,
+                       app_ids: Optional[List[int]] = None) -> np.ndarray:
+    """The users block for install days first..last, from the cache when it covers them"""
+    version, _ = await get_versions(db, COHORTS)
+    key = (tuple(sorted(set(app_ids))) if app_ids is not None else None, max_day)
+    block = cohort_cache.get(key, version)
+    if block is None or first < block.first or last > block.last:
+        load_first, load_last = first, last
+        if block is not None and first <= block.last + 1 and last >= block.first - 1:
+            # Overlapping or adjacent: widen, so both ranges keep hitting
+            widened = min(first, block.first), max(last, block.last)
+            if widened[1] - widened[0] < MAX_BLOCK_DAYS:
+                load_first, load_last = widened
+        users = await load_block(db, load_first, load_last, max_day, app_ids)
+        block = CohortBlock(version, load_first, load_last, users)
+        cohort_cache.put(key, block)
+    return block.users[first - block.first:last - block.first + 1]
+
+def retention_matrix(users: np.ndarray, first: int, as_of: int) -> Dict[str, np.ndarray]:
+    """
+    Retention (% of the day-0 users) per cell, blanked where the cohort has
+    not reached that day by ``as_of``, and the curve averaged over cohorts
+    weighted by their size
+    """
+    cohorts, days = users.shape
+    size = np.nan_to_num(users[:, 0]) if days else np.zeros(cohorts)
+    install = first + np.arange(cohorts)
+    reached = install[:, None] + np.arange(days)[None, :] <= as_of
+    observed = reached & ~np.isnan(users) & (size[:, None] > 0)
+
+    retained = np.where(observed, users, 0.0)
+    rates = np.where(observed, ratio(retained, size[:, None]) * 100, np.nan)
+    weights = np.where(observed, size[:, None], 0.0)
+    curve = np.where(observed.any(axis=0), ratio(retained.sum(axis=0), weights.sum(axis=0)) * 100, np.nan)
+    return {
+        "size": size,
+        "rates": rates,
+        "reached": np.minimum(np.clip(as_of - install + 1, 0, None), days),
+        "curve": curve,
+        "curve_cohorts": observed.sum(axis=0),
+    }
+
+def _optional(values: List[float], digits: int) -> List[Optional[float]]:
+    return [None if value != value else round(value, digits) for value in values]
+
+async def cohort_report(db: AsyncSession, start: date, end: date, max_day: int, as_of: date,
+                        app_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Triangle retention matrix and weighted curve for install days start..end, as of the last complete day"""
+    first, last = start.toordinal(), end.toordinal()
+    users = await cohort_users(db, first, last, max_day, app_ids)
+    matrix = retention_matrix(users, first, as_of.toordinal())
+
+    # Each row stops at the last day its cohort has reached: the triangle
+    rates = np.round(matrix["rates"], 2).tolist()
+    cohorts = [
+        {"install_date": date.fromordinal(first + k), "size": int(size), "retention": _optional(row[:reached], 2)}
+        for k, (size, row, reached) in enumerate(zip(matrix["size"].tolist(), rates, matrix["reached"].tolist()))
+        if size > 0
+    ]
+    return {
+        "start": start,
+        "end": end,
+        "max_day": max_day,
+        "cohorts": cohorts,
+        "curve": _optional(matrix["curve"].tolist(), 2),
+        "curve_cohorts": matrix["curve_cohorts"].tolist(),
+    }
+
+async def retention_rate(db: AsyncSession, start: date, end: date, day_n: int,
+                         app_ids: Optional[List[int]] = None) -> Optional[float]:
+    """Share of the users installed start..end still active on day ``day_n``, weighted by cohort size"""
+    users = await cohort_users(db, start.toordinal(), end.toordinal(), day_n, app_ids)
+    matrix = retention_matrix(users, start.toordinal(), date.today().toordinal() - 1)
+    if not matrix["curve_cohorts"][day_n]:
+        return None
+    return float(matrix["curve"][day_n]) / 100
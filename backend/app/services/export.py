@@ -0,0 +1,110 @@
+"""
+Streaming CSV/NDJSON export of analytics tables.
+
+Rows are read and encoded in worker processes, one keyset page at a time,
+so memory use is bounded by the page size no matter how large the requested
+range is, and the event loop only passes finished chunks on: reading and
+encoding tens of thousands of rows in the server process would hold the
+loop (and the GIL) for most of the export, and every other request would
+wait behind it. The next page is read while the current one is sent.
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+
+from ..core.database import engine
+from ..core.workers import get_process_pool
+from ..models.analytics import AppAnalytics, BusinessMetrics
+from ..schemas.ingest import DataFormat
+
+EXPORT_PARTITION_ROWS = 2000
+
+# Tables workers may read, by name; (app_id, <date column>) is unique in each
+EXPORTABLE_TABLES = {model.__table__.name: model.__table__ for model in (AppAnalytics, BusinessMetrics)}
+
+MEDIA_TYPES = {
+    DataFormat.CSV: "text/csv",
+    DataFormat.NDJSON: "application/x-ndjson",
+}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def _encode_csv(rows: List[Any], header: List[str] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(rows: List[Any], columns: List[str]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+        for row in rows
+    ).encode()
+
+def export_query(table_name: str, date_column: str, start: datetime, end: datetime,
+                 app_id: Optional[int] = None) -> Select:
+    """Rows of one app (or all) with ``date_column`` in [start, end), in (app_id, date) order"""
+    table = EXPORTABLE_TABLES[table_name]
+    query = select(*table.c).where(
+        table.c[date_column] >= start,
+        table.c[date_column] < end
+    ).order_by(table.c.app_id, table.c[date_column])
+    if app_id is not None:
+        query = query.where(table.c.app_id == app_id)
+    return query
+
+def export_page(table_name: str, date_column: str, start: datetime, end: datetime, app_id: Optional[int],
+                fmt: DataFormat, after: Optional[Tuple[Any, Any]], limit: int) -> Tuple[bytes, Optional[Tuple[Any, Any]]]:
+    """
+    Encode the ``limit`` rows following the (app_id, date) key ``after``
+    (from the start if None). Returns the chunk and the key to continue
+    from, None after the last page. Runs in worker processes.
+    """
+    query = export_query(table_name, date_column, start, end, app_id)
+    columns = [column.name for column in query.selected_columns]
+    table = EXPORTABLE_TABLES[table_name]
+    if after is not None:
+        query = query.where(tuple_(table.c.app_id, table.c[date_column]) > tuple_(*after))
+    with engine.connect() as connection:
+        rows = connection.execute(query.limit(limit)).all()
+
+    if fmt == DataFormat.CSV:
+        chunk = _encode_csv(rows, header=columns if after is None else None)
+    else:
+        chunk = _encode_ndjson(rows, columns)
+    last = rows[-1]._mapping if len(rows) == limit else None
+    return chunk, (last["app_id"], last[date_column]) if last is not None else None
+
+async def stream_export(table_name: str, date_column: str, start: datetime, end: datetime,
+                        app_id: Optional[int], fmt: DataFormat,
+                        partition_rows: int = EXPORT_PARTITION_ROWS) -> AsyncIterator[bytes]:
+    """Yield the encoded pages of ``export_query``, each read and encoded in the worker pool"""
+    loop = asyncio.get_running_loop()
+
+    def fetch(after: Optional[Tuple[Any, Any]]) -> asyncio.Future:
+        return loop.run_in_executor(
+            get_process_pool(), export_page, table_name, date_column, start, end, app_id, fmt, after, partition_rows
+        )
+
+    pending = fetch(None)
+    try:
+        while pending is not None:
+            chunk, after = await pending
+            pending = fetch(after) if after is not None else None
+            yield chunk
+    finally:
+        if pending is not None:
+            pending.cancel()
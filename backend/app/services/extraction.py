@@ -0,0 +1,107 @@
+"""
+Off-request build metadata extraction.
+
+Parsing a build runs in the shared process pool so neither the event loop nor
+the request thread does the zip and binary XML work. Progress is recorded on
+the artifact (``metadata_status``) and the result is written back to the App.
+Results are cached by content hash in ``artifact_metadata``, so uploading the
+same build again skips parsing entirely.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+import aiofiles
+import aiofiles.os
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import AsyncSessionLocal
+from ..core.workers import get_process_pool
+from ..models.app import App, AppArtifact, ArtifactMetadata, MetadataStatus
+from .build_metadata import PARSERS, extract_metadata
+from .uploads import upload_root
+
+ICON_URL_PREFIX = "/media"
+
+def icon_url(icon_path: str) -> str:
+    return f"{ICON_URL_PREFIX}/{icon_path}"
+
+async def _store_icon(icon: bytes) -> str:
+    """Store icon bytes content-addressed; returns the path relative to UPLOAD_DIR"""
+    sha256 = hashlib.sha256(icon).hexdigest()
+    icon_path = os.path.join("icons", sha256[:2], f"{sha256}.png")
+    destination = upload_root() / icon_path
+    if not await aiofiles.os.path.exists(destination):
+        await aiofiles.os.makedirs(destination.parent, exist_ok=True)
+        async with aiofiles.open(f"{destination}.tmp", "wb") as f:
+            await f.write(icon)
+        await aiofiles.os.replace(f"{destination}.tmp", destination)
+    return icon_path
+
+async def _set_status(db: AsyncSession, artifact: AppArtifact, metadata_status: MetadataStatus,
+                      error: Optional[str] = None) -> None:
+    artifact.metadata_status = metadata_status
+    artifact.metadata_error = error
+    await db.commit()
+
+async def _extract(artifact: AppArtifact) -> ArtifactMetadata:
+    loop = asyncio.get_running_loop()
+    path = str(upload_root() / artifact.storage_path)
+    result: Dict[str, Any] = await loop.run_in_executor(get_process_pool(), extract_metadata, path, artifact.extension)
+    icon = result.pop("icon", None)
+    return ArtifactMetadata(
+        sha256=artifact.sha256,
+        icon_path=await _store_icon(icon) if icon else None,
+        **result
+    )
+
+async def _apply(db: AsyncSession, app: App, metadata: ArtifactMetadata) -> Optional[str]:
+    """Copy extracted fields onto the App; returns a warning for skipped fields"""
+    warning = None
+    if metadata.package_name and metadata.package_name != app.package_name:
+        taken = await db.scalar(
+            select(App.id).where(App.package_name == metadata.package_name, App.id != app.id)
+        )
+        if taken:
+            warning = f"Package name {metadata.package_name} belongs to another app"
+        else:
+            app.package_name = metadata.package_name
+    if metadata.version:
+        app.version = metadata.version
+    if metadata.build_number is not None:
+        app.build_number = metadata.build_number
+    if metadata.icon_path:
+        app.icon_url = icon_url(metadata.icon_path)
+    return warning
+
+async def extract_artifact(artifact_id: int) -> None:
+    """Extract metadata for an uploaded artifact and apply it to its App"""
+    async with AsyncSessionLocal() as db:
+        artifact = await db.get(AppArtifact, artifact_id)
+        if artifact is None:
+            return
+        if artifact.extension not in PARSERS:
+            await _set_status(db, artifact, MetadataStatus.SKIPPED)
+            return
+
+        metadata = await db.get(ArtifactMetadata, artifact.sha256)
+        if metadata is None:
+            await _set_status(db, artifact, MetadataStatus.EXTRACTING)
+            try:
+                metadata = await _extract(artifact)
+            except ValueError as e:
+                # Not a readable build; retrying will not help
+                await _set_status(db, artifact, MetadataStatus.FAILED, str(e))
+                return
+            except Exception as e:
+                await _set_status(db, artifact, MetadataStatus.FAILED, str(e))
+                raise
+            # Another upload of the same build may have finished first
+            metadata = await db.merge(metadata)
+
+        await _set_status(db, artifact, MetadataStatus.APPLYING)
+        app = await db.get(App, artifact.app_id)
+        warning = await _apply(db, app, metadata) if app else None
+        await _set_status(db, artifact, MetadataStatus.DONE, warning)
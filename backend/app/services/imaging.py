@@ -0,0 +1,52 @@
+"""
+Image resizing for derived images. Runs in worker processes (see
+``services.thumbnails``) and imports nothing from the app.
+"""
+import os
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps
+
+# preset -> (width, height, crop to exactly that size)
+PRESETS: Dict[str, Tuple[int, int, bool]] = {
+    "icon-48": (48, 48, True),
+    "icon-96": (96, 96, True),
+    "icon-192": (192, 192, True),
+    "screenshot-360": (360, 780, False),
+    "screenshot-720": (720, 1560, False),
+}
+
+WEBP_QUALITY = 80
+
+# Refuse sources larger than this many pixels (decompression bombs)
+MAX_SOURCE_PIXELS = 40_000_000
+
+def render_thumbnail(source: str, destination: str, preset: str) -> int:
+    """
+    Resize ``source`` to a preset and write it as WebP without EXIF, ICC or
+    other metadata. Returns the size of the written file in bytes. Raises
+    ValueError when the source is not a readable image.
+    """
+    width, height, crop = PRESETS[preset]
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+    try:
+        with Image.open(source) as image:
+            # Let JPEG decode at a reduced scale instead of full size
+            image.draft("RGB", (width * 2, height * 2))
+            image = ImageOps.exif_transpose(image)
+            if crop:
+                image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+            else:
+                image.thumbnail((width, height), Image.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+                image = image.convert("RGBA" if has_alpha else "RGB")
+
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            partial = f"{destination}.{os.getpid()}.tmp"
+            image.save(partial, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(partial, destination)
+    except (OSError, Image.DecompressionBombError, SyntaxError) as e:
+        # OSError covers UnidentifiedImageError and truncated files
+        raise ValueError(f"Unreadable image: {e}") from e
+    return os.path.getsize(destination)
@@ -0,0 +1,252 @@
+"""
+Streaming bulk ingestion for AppAnalytics, MarketingCampaign, BusinessMetrics
+and RetentionCohort.
+
+Input (CSV with a header row, or NDJSON) is read chunk by chunk and validated
+in batches. Valid rows are loaded into a temporary staging table, through
+COPY on Postgres and plain INSERTs elsewhere, and then merged into the target
+table with one set-based upsert on its natural key. Only the current batch is
+ever held in memory.
+"""
+import codecs
+import csv
+import json
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import BigInteger, Column, MetaData, Table, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.analytics import AppAnalytics, BusinessMetrics, MarketingCampaign, RetentionCohort
+from ..models.app import App
+from ..schemas.ingest import (
+    AppAnalyticsIngestRow, BusinessMetricsIngestRow, IngestDataset, DataFormat,
+    IngestReport, MarketingCampaignIngestRow, RejectedRow, RetentionCohortIngestRow
+)
+from .partitions import ensure_partitions
+from .rollups import rebuild_rollups
+from .versions import TRACKED, bump
+
+# dataset -> (model, row schema, upsert key)
+DATASETS = {
+    IngestDataset.APP_ANALYTICS: (AppAnalytics, AppAnalyticsIngestRow, ("app_id", "date")),
+    IngestDataset.MARKETING_CAMPAIGNS: (MarketingCampaign, MarketingCampaignIngestRow, ("app_id", "name")),
+    IngestDataset.BUSINESS_METRICS: (BusinessMetrics, BusinessMetricsIngestRow, ("app_id", "month")),
+    IngestDataset.RETENTION_COHORTS: (RetentionCohort, RetentionCohortIngestRow, ("app_id", "install_date", "day_n")),
+}
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Rejections beyond this are counted but not listed in the report
+MAX_REPORTED_REJECTIONS = 100
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines (newline kept) without buffering it"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+async def _iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # A record is complete once its quotes balance (fields may contain newlines)
+    pending: List[str] = []
+    quotes = 0
+    async for line in iter_lines(chunks):
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield "".join(pending)
+            pending = []
+            quotes = 0
+    if pending:
+        yield "".join(pending)
+
+async def iter_batches(
+    chunks: AsyncIterator[bytes],
+    fmt: DataFormat,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """
+    Yield batches of (line, record) pairs. CSV records are dicts keyed by the
+    header (empty cells dropped); NDJSON records are parsed objects, or the
+    raw line when it is not valid JSON.
+    """
+    batch: List[Tuple[int, Any]] = []
+    if fmt == DataFormat.NDJSON:
+        line_no = 0
+        async for line in iter_lines(chunks):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                batch.append((line_no, json.loads(line)))
+            except ValueError:
+                batch.append((line_no, line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        header: Optional[List[str]] = None
+        pending: List[Tuple[int, str]] = []
+        line_no = 0
+
+        def parse(records: List[Tuple[int, str]]) -> List[Tuple[int, Any]]:
+            rows = csv.reader(text for _, text in records)
+            return [
+                (number, {key: value for key, value in zip(header, values) if value != ""})
+                for (number, _), values in zip(records, rows)
+            ]
+
+        async for text in _iter_csv_records(chunks):
+            line_no += 1
+            if header is None:
+                header = [name.strip() for name in next(csv.reader([text]))]
+                continue
+            if not text.strip():
+                continue
+            pending.append((line_no, text))
+            if len(pending) >= batch_size:
+                yield parse(pending)
+                pending = []
+        batch = parse(pending) if pending else []
+
+    if batch:
+        yield batch
+
+def _staging_table(target: Table, columns: List[str]) -> Table:
+    return Table(
+        f"staging_{target.name}_{uuid.uuid4().hex[:8]}",
+        MetaData(),
+        *[Column(name, target.c[name].type) for name in columns],
+        Column("seq", BigInteger, nullable=False),
+        prefixes=["TEMPORARY"]
+    )
+
+def _to_utc(value: Any) -> Any:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+async def _load_staging(db: AsyncSession, staging: Table, columns: List[str], rows: List[tuple]) -> None:
+    if db.bind.dialect.name == "postgresql":
+        # Binary COPY straight from the validated tuples
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            staging.name, records=rows, columns=[*columns, "seq"]
+        )
+    else:
+        await db.execute(insert(staging), [dict(zip([*columns, "seq"], row)) for row in rows])
+
+async def _merge_staging(db: AsyncSession, target: Table, staging: Table, columns: List[str], keys: Tuple[str, ...]) -> int:
+    # Last occurrence wins when a key appears more than once in the input
+    latest = select(func.max(staging.c.seq)).group_by(*[staging.c[key] for key in keys])
+    source = select(*[staging.c[name] for name in columns]).where(staging.c.seq.in_(latest))
+
+    dialect_insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(target).from_select(columns, source)
+    updates = {name: stmt.excluded[name] for name in columns if name not in keys}
+    if "updated_at" in target.c:
+        updates["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=updates)
+    result = await db.execute(stmt)
+    return result.rowcount
+
+async def ingest(
+    db: AsyncSession,
+    dataset: IngestDataset,
+    chunks: AsyncIterator[bytes],
+    fmt: DataFormat = DataFormat.CSV,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    created_by: Optional[int] = None
+) -> IngestReport:
+    """Stream, validate and upsert one dataset; commits on success"""
+    started = time.perf_counter()
+    model, row_schema, keys = DATASETS[dataset]
+    target = model.__table__
+
+    columns = list(row_schema.model_fields)
+    extra: Dict[str, Any] = {}
+    if "created_by" in target.c:
+        if created_by is None:
+            raise ValueError(f"created_by is required for {dataset.value}")
+        columns.append("created_by")
+        extra["created_by"] = created_by
+
+    known_apps = set(await db.scalars(select(App.id)))
+    track_days = dataset == IngestDataset.APP_ANALYTICS
+    first_day: Optional[date] = None
+    last_day: Optional[date] = None
+
+    staging = _staging_table(target, columns)
+    await db.run_sync(lambda session: staging.create(session.connection()))
+
+    received = 0
+    staged = 0
+    rejected: List[RejectedRow] = []
+    rejected_count = 0
+
+    async for batch in iter_batches(chunks, fmt, batch_size):
+        rows = []
+        for line, record in batch:
+            received += 1
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("Row is not an object")
+                row = row_schema.model_validate(record).model_dump()
+                if row["app_id"] not in known_apps:
+                    raise ValueError(f"Unknown app_id {row['app_id']}")
+            except (ValidationError, ValueError) as e:
+                rejected_count += 1
+                if len(rejected) < MAX_REPORTED_REJECTIONS:
+                    errors = e.errors(include_url=False) if isinstance(e, ValidationError) else [{"msg": str(e)}]
+                    rejected.append(RejectedRow(line=line, errors=[
+                        {key: value for key, value in error.items() if key in ("loc", "msg", "type")}
+                        for error in errors
+                    ]))
+                continue
+
+            row.update(extra)
+            if track_days:
+                # Day range of the load, to bound the rollup rebuild
+                day = _to_utc(row["date"]).astimezone(timezone.utc).date()
+                first_day = day if first_day is None or day < first_day else first_day
+                last_day = day if last_day is None or day > last_day else last_day
+            staged += 1
+            rows.append(tuple(_to_utc(row[name]) for name in columns) + (staged,))
+
+        if rows:
+            await _load_staging(db, staging, columns, rows)
+
+    if track_days and staged:
+        await ensure_partitions(first_day, last_day)
+    loaded = await _merge_staging(db, target, staging, columns, keys) if staged else 0
+    if track_days and staged:
+        await rebuild_rollups(db, staging, first_day, last_day)
+
+    await db.run_sync(lambda session: staging.drop(session.connection()))
+    if loaded:
+        await bump(db, TRACKED[model])
+    await db.commit()
+
+    elapsed = time.perf_counter() - started
+    return IngestReport(
+        dataset=dataset,
+        rows_received=received,
+        rows_loaded=loaded,
+        rows_rejected=rejected_count,
+        rejected=rejected,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(received / elapsed, 1) if elapsed else 0.0
+    )
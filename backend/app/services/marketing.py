@@ -0,0 +1,257 @@
+"""
+Campaign performance for one app, a set of apps or the whole portfolio.
+
+The campaigns are read with one query, and the revenue and new users of
+each campaign's app over its flight with another, summed per campaign in
+the database from the week rollups of its whole weeks and the day rollups
+of the days around them. Everything else runs on arrays: each metric is
+one vectorized expression over all campaigns at once.
+
+Attribution: a campaign is credited with the share of its app's revenue
+during its flight that matches its share of the app's new users in that
+period (installs / new users, capped at 1).
+"""
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import Integer, and_, case, cast, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.analytics import AppAnalyticsRollup, MarketingCampaign, RollupPeriod
+from .rollups import bucket_expression, to_day
+
+CAMPAIGN_FIELDS = (
+    "id", "name", "app_id", "campaign_type", "is_active", "start_date", "end_date",
+    "budget", "spent", "impressions", "clicks", "installs",
+)
+
+def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise numerator / denominator, 0 where the denominator is not positive"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+def _filter_campaigns(query, app_ids: Optional[Iterable[int]], active_only: bool):
+    if app_ids is not None:
+        query = query.where(MarketingCampaign.app_id.in_(list(app_ids)))
+    if active_only:
+        query = query.where(MarketingCampaign.is_active.is_(True))
+    return query
+
+async def load_campaigns(db: AsyncSession, app_ids: Optional[Iterable[int]] = None,
+                         active_only: bool = False) -> Dict[str, np.ndarray]:
+    """Campaign columns as arrays; dates as ordinals, a missing end date as -1"""
+    query = _filter_campaigns(
+        select(*[getattr(MarketingCampaign, name) for name in CAMPAIGN_FIELDS]).order_by(MarketingCampaign.id),
+        app_ids, active_only
+    )
+    rows = (await (await db.connection()).execute(query)).all()
+
+    columns = dict(zip(CAMPAIGN_FIELDS, zip(*rows))) if rows else {name: () for name in CAMPAIGN_FIELDS}
+    return {
+        "id": np.array(columns["id"], dtype=np.int64),
+        "name": np.array(columns["name"], dtype=object),
+        "app_id": np.array(columns["app_id"], dtype=np.int64),
+        "campaign_type": np.array(columns["campaign_type"], dtype=object),
+        "is_active": np.array([bool(value) for value in columns["is_active"]], dtype=bool),
+        "start": np.array([to_day(value).toordinal() for value in columns["start_date"]], dtype=np.int64),
+        "end": np.array([to_day(value).toordinal() if value else -1 for value in columns["end_date"]], dtype=np.int64),
+        "budget": np.array([value or 0.0 for value in columns["budget"]], dtype=float),
+        "spent": np.array([value or 0.0 for value in columns["spent"]], dtype=float),
+        "impressions": np.array([value or 0 for value in columns["impressions"]], dtype=np.int64),
+        "clicks": np.array([value or 0 for value in columns["clicks"]], dtype=np.int64),
+        "installs": np.array([value or 0 for value in columns["installs"]], dtype=np.int64),
+    }
+
+def _week_bounds(first_day, last_day, dialect: str):
+    """
+    Day expressions splitting first_day..last_day into leading days, whole
+    Monday-to-Sunday weeks and trailing days: the first Monday on or after
+    ``first_day`` and the day before it, and the last Sunday on or before
+    ``last_day`` and the day after it.
+    """
+    if dialect == "postgresql":
+        first_monday = first_day + cast((8 - func.extract("isodow", first_day)) % 7, Integer)
+        last_sunday = last_day - cast(func.extract("isodow", last_day) % 7, Integer)
+        return first_monday, first_monday - 1, last_sunday, last_sunday + 1
+    return (
+        func.date(first_day, "weekday 1"), func.date(first_day, "-1 day", "weekday 0"),
+        func.date(last_day, "-6 days", "weekday 0"), func.date(last_day, "-5 days", "weekday 1"),
+    )
+
+async def load_flight_totals(db: AsyncSession, campaigns: Dict[str, np.ndarray], as_of: date,
+                             app_ids: Optional[Iterable[int]] = None,
+                             active_only: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Revenue and new users of each campaign's app from its start day through
+    its end day or ``as_of``, whichever is first; arrays aligned with
+    ``campaigns`` (loaded with the same filters).
+    """
+    count = len(campaigns["id"])
+    revenue, new_users = np.zeros(count), np.zeros(count)
+    if count:
+        campaign, rollup = MarketingCampaign, AppAnalyticsRollup
+        dialect = db.bind.dialect.name
+        first_day = bucket_expression(campaign.start_date, RollupPeriod.DAY, dialect)
+        last_day = bucket_expression(campaign.end_date, RollupPeriod.DAY, dialect)
+        flight_end = case((campaign.end_date.is_(None) | (last_day > as_of), as_of), else_=last_day)
+        first_monday, lead_end, last_sunday, trail_start = _week_bounds(first_day, flight_end, dialect)
+        least, greatest = (func.least, func.greatest) if dialect == "postgresql" else (func.min, func.max)
+        # Bounds computed once per campaign, so that each part below is one range search of the rollup key
+        flights = _filter_campaigns(
+            select(
+                campaign.id, campaign.app_id, first_day.label("first_day"),
+                least(lead_end, flight_end).label("lead_end"),
+                first_monday.label("first_monday"), last_sunday.label("last_sunday"),
+                # Without a whole week the leading days run up to the end of the flight
+                greatest(trail_start, first_monday).label("trail_start"), flight_end.label("flight_end"),
+            ),
+            app_ids, active_only
+        ).cte("flights").prefix_with("MATERIALIZED")
+
+        def rollups(period: RollupPeriod, *bounds):
+            return select(flights.c.id, rollup.revenue, rollup.new_users).join(
+                rollup, and_(rollup.app_id == flights.c.app_id, rollup.period == period, *bounds)
+            )
+
+        # Whole weeks of the flight from week rollups, the days before and after them from day rollups
+        start = rollup.bucket_start
+        parts = union_all(
+            rollups(RollupPeriod.DAY, start >= flights.c.first_day, start <= flights.c.lead_end),
+            rollups(RollupPeriod.WEEK, start >= flights.c.first_monday, start < flights.c.last_sunday),
+            rollups(RollupPeriod.DAY, start >= flights.c.trail_start, start <= flights.c.flight_end),
+        ).subquery()
+        query = select(parts.c.id, func.sum(parts.c.revenue), func.sum(parts.c.new_users)).group_by(parts.c.id)
+        rows = (await (await db.connection()).execute(query)).all()
+        if rows:
+            id_column, revenue_column, new_column = zip(*rows)
+            # Campaigns are sorted by id; those without rollups in their flight keep zeros
+            ids = np.array(id_column, dtype=np.int64)
+            index = np.searchsorted(campaigns["id"], ids)
+            known = (index < count) & (campaigns["id"][np.minimum(index, count - 1)] == ids)
+            revenue[index[known]] = np.array([value or 0.0 for value in revenue_column], dtype=float)[known]
+            new_users[index[known]] = np.array([value or 0 for value in new_column], dtype=float)[known]
+    return {"revenue": revenue, "new_users": new_users}
+
+def campaign_metrics(campaigns: Dict[str, np.ndarray], flight: Dict[str, np.ndarray],
+                     as_of: int) -> Dict[str, np.ndarray]:
+    """Per-campaign metrics, every one an array aligned with ``campaigns``"""
+    start, end = campaigns["start"], campaigns["end"]
+    has_end = end >= 0
+    spent, budget = campaigns["spent"], campaigns["budget"]
+    installs = campaigns["installs"]
+
+    flight_end = np.where(has_end, np.minimum(end, as_of), as_of)
+    revenue = flight["revenue"] * np.minimum(ratio(installs, flight["new_users"]), 1.0)
+
+    elapsed = np.clip(flight_end - start + 1, 0, None)
+    daily_burn = ratio(spent, elapsed)
+    duration = np.where(has_end, end - start + 1, 0)
+    expected = budget * np.clip(ratio(elapsed, duration), 0, 1)
+    pacing = np.where(has_end & (expected > 0), ratio(spent, expected), np.nan)
+
+    remaining = np.maximum(budget - spent, 0)
+    running = campaigns["is_active"] & (start <= as_of) & (~has_end | (end >= as_of))
+    projects = running & (daily_burn > 0) & (remaining > 0)
+    exhaustion = np.where(projects, as_of + np.ceil(ratio(remaining, daily_burn)), -1).astype(np.int64)
+    # A flight that ends before the money runs out never exhausts its budget
+    exhaustion[has_end & (exhaustion > end)] = -1
+
+    return {
+        "revenue": revenue,
+        "ctr": ratio(campaigns["clicks"], campaigns["impressions"]),
+        "conversion_rate": ratio(installs, campaigns["clicks"]),
+        "cpi": ratio(spent, installs),
+        "roas": ratio(revenue, spent),
+        "daily_burn": daily_burn,
+        "budget_remaining": remaining,
+        "pacing": pacing,
+        "exhaustion": exhaustion,
+        "running": running,
+    }
+
+def _channels(campaigns: Dict[str, np.ndarray], metrics: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    types, index = np.unique(campaigns["campaign_type"].astype(str), return_inverse=True)
+
+    def total(values: np.ndarray) -> np.ndarray:
+        return np.bincount(index, weights=values, minlength=len(types))
+
+    spent, installs, revenue = total(campaigns["spent"]), total(campaigns["installs"]), total(metrics["revenue"])
+    impressions, clicks = total(campaigns["impressions"]), total(campaigns["clicks"])
+    ctr, cpi, roas = ratio(clicks, impressions), ratio(spent, installs), ratio(revenue, spent)
+    counts = np.bincount(index, minlength=len(types))
+    return [
+        {
+            "campaign_type": str(types[k]),
+            "campaigns": int(counts[k]),
+            "spent": round(float(spent[k]), 2),
+            "installs": int(installs[k]),
+            "revenue": round(float(revenue[k]), 2),
+            "ctr": round(float(ctr[k]), 5),
+            "cpi": round(float(cpi[k]), 4),
+            "roas": round(float(roas[k]), 4),
+        }
+        for k in np.argsort(-spent, kind="stable")
+    ]
+
+async def campaign_report(db: AsyncSession, as_of: date, app_ids: Optional[List[int]] = None,
+                          active_only: bool = False) -> Dict[str, Any]:
+    """Performance of every matching campaign, per channel and in total, as of a day"""
+    campaigns = await load_campaigns(db, app_ids, active_only)
+    count = len(campaigns["id"])
+    flight = await load_flight_totals(db, campaigns, as_of, app_ids, active_only)
+    metrics = campaign_metrics(campaigns, flight, as_of.toordinal())
+
+    spent, budget = campaigns["spent"], campaigns["budget"]
+    impressions, clicks, installs = (campaigns[name].sum() for name in ("impressions", "clicks", "installs"))
+    revenue = metrics["revenue"].sum()
+    totals = {
+        "campaigns": count,
+        "active_campaigns": int(metrics["running"].sum()),
+        "budget": round(float(budget.sum()), 2),
+        "spent": round(float(spent.sum()), 2),
+        "impressions": int(impressions),
+        "clicks": int(clicks),
+        "installs": int(installs),
+        "revenue": round(float(revenue), 2),
+        "ctr": round(float(ratio(clicks, impressions)), 5),
+        "cpi": round(float(ratio(spent.sum(), installs)), 4),
+        "roas": round(float(ratio(revenue, spent.sum())), 4),
+        "daily_burn": round(float(metrics["daily_burn"][metrics["running"]].sum()), 2),
+    }
+
+    # Round in bulk, then convert each column to Python values once
+    columns = {
+        "id": campaigns["id"].tolist(),
+        "name": campaigns["name"].tolist(),
+        "app_id": campaigns["app_id"].tolist(),
+        "campaign_type": campaigns["campaign_type"].tolist(),
+        "is_active": campaigns["is_active"].tolist(),
+        "start_date": [date.fromordinal(value) for value in campaigns["start"].tolist()],
+        "end_date": [date.fromordinal(value) if value >= 0 else None for value in campaigns["end"].tolist()],
+        "budget": np.round(budget, 2).tolist(),
+        "spent": np.round(spent, 2).tolist(),
+        "impressions": campaigns["impressions"].tolist(),
+        "clicks": campaigns["clicks"].tolist(),
+        "installs": campaigns["installs"].tolist(),
+        "revenue": np.round(metrics["revenue"], 2).tolist(),
+        "ctr": np.round(metrics["ctr"], 5).tolist(),
+        "conversion_rate": np.round(metrics["conversion_rate"], 5).tolist(),
+        "cpi": np.round(metrics["cpi"], 4).tolist(),
+        "roas": np.round(metrics["roas"], 4).tolist(),
+        "daily_burn": np.round(metrics["daily_burn"], 2).tolist(),
+        "budget_remaining": np.round(metrics["budget_remaining"], 2).tolist(),
+        "pacing": [None if np.isnan(value) else round(value, 4) for value in metrics["pacing"].tolist()],
+        "projected_exhaustion": [
+            date.fromordinal(value) if value >= 0 else None for value in metrics["exhaustion"].tolist()
+        ],
+    }
+    names = list(columns)
+    return {
+        "as_of": as_of,
+        "totals": totals,
+        "channels": _channels(campaigns, metrics) if count else [],
+        "campaigns": [dict(zip(names, row)) for row in zip(*columns.values())],
+    }
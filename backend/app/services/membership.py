@@ -0,0 +1,92 @@
+"""
+App membership (``app_members``) and role-scoped access to apps.
+
+Every app has a row per user it involves: its creator (owner), product
+manager and marketing manager. Flushes that create, delete or reassign apps
+resync those apps' rows in the same transaction, and bulk paths that bypass
+the ORM call ``resync_members`` themselves.
+
+Access checks and listing filters all go through ``member_app_ids``, which
+reads the table's primary key (user_id, app_id, role): an index-only lookup
+of one user's apps, whatever the size of the catalog.
+"""
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, event, insert, inspect, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.app import App, AppMember, MemberRole
+from ..models.user import UserRole
+from ..schemas.user import CurrentUser
+
+# Roles that see and edit every app
+APP_MANAGER_ROLES = [UserRole.ADMIN, UserRole.EXECUTIVE]
+
+# Members who may edit an app
+EDITOR_ROLES = [MemberRole.OWNER, MemberRole.PRODUCT_MANAGER]
+
+# App column -> the member role it grants
+MEMBER_COLUMNS = {
+    "created_by": MemberRole.OWNER,
+    "assigned_pm": MemberRole.PRODUCT_MANAGER,
+    "assigned_marketing": MemberRole.MARKETING,
+}
+
+# Apps resynced per statement
+SYNC_CHUNK = 500
+
+def sync_members(connection, app_ids: Optional[Iterable[int]] = None) -> None:
+    """Rewrite the members of ``app_ids`` (every app if None) from the apps table"""
+    table = AppMember.__table__
+    chunks: List[Optional[List[int]]] = [None]
+    if app_ids is not None:
+        ids = sorted(set(app_ids))
+        chunks = [ids[start:start + SYNC_CHUNK] for start in range(0, len(ids), SYNC_CHUNK)]
+    for chunk in chunks:
+        connection.execute(delete(table) if chunk is None else delete(table).where(table.c.app_id.in_(chunk)))
+        # One statement per role: a UNION would lose the enum type of the literal on Postgres
+        for column, role in MEMBER_COLUMNS.items():
+            user_id = getattr(App, column)
+            rows = select(user_id, App.id, literal(role, table.c.role.type)).where(user_id.is_not(None))
+            if chunk is not None:
+                rows = rows.where(App.id.in_(chunk))
+            connection.execute(insert(table).from_select(["user_id", "app_id", "role"], rows))
+
+@event.listens_for(Session, "after_flush")
+def _sync_changed_apps(session: Session, flush_context):
+    app_ids = {obj.id for obj in chain(session.new, session.deleted) if isinstance(obj, App)}
+    app_ids.update(
+        obj.id for obj in session.dirty
+        if isinstance(obj, App) and any(inspect(obj).attrs[column].history.has_changes() for column in MEMBER_COLUMNS)
+    )
+    if app_ids:
+        sync_members(session.connection(), app_ids)
+
+async def resync_members(db: AsyncSession, app_ids: Optional[Iterable[int]] = None) -> None:
+    """Resync after a set-based write to apps; does not commit"""
+    await db.run_sync(lambda session: sync_members(session.connection(), app_ids))
+
+def member_app_ids(user_id: int, roles: Optional[Sequence[MemberRole]] = None):
+    """Select of the ids of the apps ``user_id`` is a member of, in one of ``roles`` if given"""
+    query = select(AppMember.app_id).where(AppMember.user_id == user_id)
+    if roles is not None:
+        query = query.where(AppMember.role.in_(roles))
+    return query
+
+def app_scope(current_user: CurrentUser, roles: Optional[Sequence[MemberRole]] = None,
+              managers: Sequence[UserRole] = APP_MANAGER_ROLES):
+    """Where-clause limiting apps to the user's (in ``roles``), or None when their role sees every app"""
+    if current_user.role in managers:
+        return None
+    return App.id.in_(member_app_ids(current_user.id, roles))
+
+async def can_access(db: AsyncSession, app_id: int, current_user: CurrentUser,
+                     roles: Optional[Sequence[MemberRole]] = None,
+                     managers: Sequence[UserRole] = APP_MANAGER_ROLES) -> bool:
+    """Whether the user's role sees every app or they are a member of this one (in ``roles``)"""
+    if current_user.role in managers:
+        return True
+    query = member_app_ids(current_user.id, roles).where(AppMember.app_id == app_id).limit(1)
+    return await db.scalar(query) is not None
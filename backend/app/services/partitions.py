@@ -0,0 +1,135 @@
+"""
+Monthly range partitions of ``app_analytics`` (Postgres only).
+
+Migration 0002 partitions the table on ``date``, one partition per calendar
+month in UTC, named ``app_analytics_pYYYY_MM``. There is deliberately no
+default partition: it would be scanned on every attach and it rules out
+``DETACH PARTITION ... CONCURRENTLY``. Partitions therefore have to exist
+before rows arrive; ingest creates the ones it needs and
+``python -m app.cli.partitions`` keeps a few months ahead and detaches old
+ones. On other databases the table is not partitioned and everything here is
+a no-op.
+"""
+import re
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..core.database import async_engine
+
+PARENT = "app_analytics"
+PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})_(\d{{2}})$")
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def months_between(start: date, end: date) -> List[date]:
+    """First days of every month from the one containing ``start`` to the one containing ``end``"""
+    months = []
+    month = month_start(start)
+    while month <= end:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month.year:04d}_{month.month:02d}"
+
+async def _autocommit() -> AsyncConnection:
+    # ATTACH and DETACH CONCURRENTLY must not share a transaction with other work
+    connection = await async_engine.connect()
+    return await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+async def is_partitioned(connection: AsyncConnection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(await connection.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent))"
+    ), {"parent": PARENT}))
+
+async def list_partitions(connection: AsyncConnection) -> Dict[date, str]:
+    """Attached partitions by month; a partition left half-detached is included"""
+    rows = await connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT})
+    partitions = {}
+    for (name,) in rows:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+async def _attach(connection: AsyncConnection, month: date) -> None:
+    # CREATE TABLE ... PARTITION OF would hold an ACCESS EXCLUSIVE lock on the
+    # parent; creating the table first and attaching it only needs SHARE UPDATE
+    # EXCLUSIVE, so reads and writes of other months carry on.
+    name = partition_name(month)
+    lower = f"{month.isoformat()} 00:00:00+00"
+    upper = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+    await connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    await connection.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+
+async def ensure_partitions(start: date, end: date) -> List[str]:
+    """Create missing monthly partitions covering ``start``..``end``; returns the names created"""
+    created: List[str] = []
+    connection = await _autocommit()
+    try:
+        if not await is_partitioned(connection):
+            return created
+        existing = await list_partitions(connection)
+        for month in months_between(start, end):
+            if month in existing:
+                continue
+            try:
+                await _attach(connection, month)
+            except DBAPIError:
+                # Another process attached it first
+                if month not in await list_partitions(connection):
+                    raise
+                continue
+            created.append(partition_name(month))
+    finally:
+        await connection.close()
+    return created
+
+async def detach_partitions(before: date, drop: bool = False) -> List[str]:
+    """
+    Detach partitions of months that end on or before ``before``. DETACH
+    CONCURRENTLY (Postgres 14+) waits out running queries instead of blocking
+    them. Detached tables are kept for archiving unless ``drop`` is set.
+    Returns the names detached.
+    """
+    detached: List[str] = []
+    connection = await _autocommit()
+    try:
+        if not await is_partitioned(connection):
+            return detached
+        pending = set(await connection.scalars(text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = to_regclass(:parent) AND inhdetachpending"
+        ), {"parent": PARENT}))
+        for month, name in sorted((await list_partitions(connection)).items()):
+            if add_months(month, 1) > before:
+                continue
+            if name in pending:
+                # An earlier concurrent detach was interrupted
+                await connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} FINALIZE"))
+            else:
+                await connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY"))
+            if drop:
+                await connection.execute(text(f"DROP TABLE {name}"))
+            detached.append(name)
+    finally:
+        await connection.close()
+    return detached
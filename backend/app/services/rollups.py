@@ -0,0 +1,289 @@
+"""
+Incremental day/week/month rollups for AppAnalytics.
+
+Every flush that inserts, updates or deletes AppAnalytics rows folds the
+change into the matching day, week and month buckets of
+app_analytics_rollups with a single upsert. Range queries then combine the
+coarsest buckets that fit the requested dates, so their cost grows with the
+number of buckets instead of the number of daily rows.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, and_, cast, event, func, inspect, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.analytics import AppAnalytics, AppAnalyticsRollup, RollupPeriod
+
+# Rollup column -> AppAnalytics column, summed into every bucket
+SUM_FIELDS = {
+    "daily_active_users": "daily_active_users",
+    "new_users": "new_users",
+    "returning_users": "returning_users",
+    "revenue": "revenue",
+    "in_app_purchases": "in_app_purchases",
+    "ad_revenue": "ad_revenue",
+    "retention_day_1_sum": "retention_day_1",
+    "retention_day_7_sum": "retention_day_7",
+    "retention_day_30_sum": "retention_day_30",
+    "crash_rate_sum": "crash_rate",
+    "app_store_rating_sum": "app_store_rating",
+}
+
+# Rollup column -> AppAnalytics column, kept as a running maximum
+PEAK_FIELDS = {
+    "monthly_active_users_peak": "monthly_active_users",
+}
+
+TRACKED_FIELDS = {"app_id", "date", *SUM_FIELDS.values(), *PEAK_FIELDS.values()}
+
+def to_day(value: Any) -> date:
+    """Normalize a DateTime/Date column value to a calendar day"""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def bucket_start(day: date, period: RollupPeriod) -> date:
+    """First day of the bucket that contains ``day``"""
+    if period == RollupPeriod.WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == RollupPeriod.MONTH:
+        return day.replace(day=1)
+    return day
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def next_bucket_start(day: date, period: RollupPeriod) -> date:
+    """First day of the bucket following the one that contains ``day``"""
+    start = bucket_start(day, period)
+    if period == RollupPeriod.WEEK:
+        return start + timedelta(days=7)
+    if period == RollupPeriod.MONTH:
+        return _next_month(start)
+    return start + timedelta(days=1)
+
+def bucket_expression(column, period: RollupPeriod, dialect: str):
+    """SQL expression for the bucket start of a DateTime column (UTC days)"""
+    if dialect == "postgresql":
+        # Inline literals so GROUP BY matches the select list on the server
+        unit = literal_column(f"'{period.value}'")
+        return cast(func.date_trunc(unit, func.timezone(literal_column("'UTC'"), column)), Date)
+    if period == RollupPeriod.WEEK:
+        return func.date(column, "weekday 0", "-6 days")
+    if period == RollupPeriod.MONTH:
+        return func.date(column, "start of month")
+    return func.date(column)
+
+def _cover_with_weeks_and_days(start: date, end: date, plan: Dict[RollupPeriod, List[date]]):
+    day = start
+    while day <= end:
+        if day.weekday() == 0 and day + timedelta(days=6) <= end:
+            plan[RollupPeriod.WEEK].append(day)
+            day += timedelta(days=7)
+        else:
+            plan[RollupPeriod.DAY].append(day)
+            day += timedelta(days=1)
+
+def plan_buckets(start: date, end: date) -> Dict[RollupPeriod, List[date]]:
+    """
+    Cover the inclusive range [start, end] with the fewest rollup buckets:
+    whole calendar months first, then whole weeks, then single days.
+    """
+    plan: Dict[RollupPeriod, List[date]] = {period: [] for period in RollupPeriod}
+    if start > end:
+        return plan
+
+    first_month = start if start.day == 1 else _next_month(start)
+    month = first_month
+    while _next_month(month) - timedelta(days=1) <= end:
+        plan[RollupPeriod.MONTH].append(month)
+        month = _next_month(month)
+
+    if plan[RollupPeriod.MONTH]:
+        _cover_with_weeks_and_days(start, first_month - timedelta(days=1), plan)
+        _cover_with_weeks_and_days(month, end, plan)
+    else:
+        _cover_with_weeks_and_days(start, end, plan)
+    return plan
+
+def _values(source: Any) -> Dict[str, Any]:
+    """Tracked values from an AppAnalytics instance or row mapping"""
+    getter = source.get if isinstance(source, dict) else lambda name: getattr(source, name)
+    return {name: getter(name) for name in TRACKED_FIELDS}
+
+def _deltas(values: Dict[str, Any], sign: int) -> Dict[str, Any]:
+    deltas = {"row_count": sign}
+    for column, field in SUM_FIELDS.items():
+        deltas[column] = sign * (values[field] or 0)
+    for column, field in PEAK_FIELDS.items():
+        deltas[column] = (values[field] or 0) if sign > 0 else 0
+    return deltas
+
+def apply_deltas(connection, app_id: int, day: date, deltas: Dict[str, Any]) -> None:
+    """Upsert one daily change into the day, week and month buckets"""
+    table = AppAnalyticsRollup.__table__
+    dialect = connection.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    greatest = func.greatest if dialect == "postgresql" else func.max
+
+    rows = [
+        {"app_id": app_id, "period": period, "bucket_start": bucket_start(day, period), **deltas}
+        for period in RollupPeriod
+    ]
+    stmt = insert(table).values(rows)
+    updates = {column: table.c[column] + stmt.excluded[column] for column in ["row_count", *SUM_FIELDS]}
+    for column in PEAK_FIELDS:
+        updates[column] = greatest(table.c[column], stmt.excluded[column])
+    updates["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["app_id", "period", "bucket_start"],
+        set_=updates
+    )
+    connection.execute(stmt)
+
+def _is_tracked_change(obj: AppAnalytics) -> bool:
+    state = inspect(obj)
+    return obj.id is not None and any(state.attrs[name].history.has_changes() for name in TRACKED_FIELDS)
+
+@event.listens_for(Session, "before_flush")
+def _capture_previous_values(session: Session, flush_context, instances):
+    """Read the stored values of changed/deleted rows so they can be backed out"""
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, AppAnalytics) and _is_tracked_change(obj)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, AppAnalytics)]
+    ids = [obj.id for obj in changed + deleted if obj.id is not None]
+    session.info["rollup_changed"] = changed
+    if not ids:
+        session.info["rollup_previous"] = []
+        return
+
+    table = AppAnalytics.__table__
+    result = session.connection().execute(
+        select(*[table.c[name] for name in TRACKED_FIELDS]).where(table.c.id.in_(ids))
+    )
+    session.info["rollup_previous"] = [dict(row._mapping) for row in result]
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups(session: Session, flush_context):
+    """Fold inserted, updated and deleted AppAnalytics rows into the rollups"""
+    previous = session.info.pop("rollup_previous", [])
+    changed = session.info.pop("rollup_changed", [])
+    new = [obj for obj in session.new if isinstance(obj, AppAnalytics)]
+    if not (previous or changed or new):
+        return
+
+    connection = session.connection()
+    for values in previous:
+        apply_deltas(connection, values["app_id"], to_day(values["date"]), _deltas(values, -1))
+    for obj in new + changed:
+        values = _values(obj)
+        apply_deltas(connection, values["app_id"], to_day(values["date"]), _deltas(values, 1))
+
+async def rebuild_rollups(db: AsyncSession, touched, start: date, end: date) -> None:
+    """
+    Recompute, from raw rows, every bucket touched by a set-based load.
+
+    ``touched`` is a selectable with ``app_id`` and ``date`` columns (e.g. a
+    staging table) covering days between ``start`` and ``end``. Bulk loads
+    bypass the flush listener above, so they call this once per load instead.
+    """
+    dialect = db.bind.dialect.name
+    raw = AppAnalytics.__table__
+    rollup = AppAnalyticsRollup.__table__
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    columns = ["row_count", *SUM_FIELDS, *PEAK_FIELDS]
+
+    for period in RollupPeriod:
+        bucket = bucket_expression(raw.c.date, period, dialect)
+        touched_buckets = select(
+            touched.c.app_id, bucket_expression(touched.c.date, period, dialect)
+        ).distinct()
+        lower = datetime.combine(bucket_start(start, period), datetime.min.time(), timezone.utc)
+        upper = datetime.combine(next_bucket_start(end, period), datetime.min.time(), timezone.utc)
+
+        aggregate = select(
+            raw.c.app_id,
+            literal(period, type_=rollup.c.period.type),
+            bucket,
+            func.count(),
+            *[func.coalesce(func.sum(raw.c[field]), 0) for field in SUM_FIELDS.values()],
+            *[func.coalesce(func.max(raw.c[field]), 0) for field in PEAK_FIELDS.values()],
+        ).where(
+            raw.c.date >= lower,
+            raw.c.date < upper,
+            tuple_(raw.c.app_id, bucket).in_(touched_buckets)
+        ).group_by(raw.c.app_id, bucket)
+
+        stmt = insert(rollup).from_select(["app_id", "period", "bucket_start", *columns], aggregate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["app_id", "period", "bucket_start"],
+            set_={**{column: stmt.excluded[column] for column in columns}, "updated_at": func.now()}
+        )
+        await db.execute(stmt)
+
+async def rebuild_range(db: AsyncSession, start: date, end: date, app_ids: Optional[List[int]] = None) -> None:
+    """
+    Rebuild every bucket overlapping ``start``..``end`` from raw rows,
+    dropping buckets whose raw rows no longer exist. Does not commit.
+    """
+    rollup = AppAnalyticsRollup.__table__
+    for period in RollupPeriod:
+        stale = rollup.delete().where(
+            rollup.c.period == period,
+            rollup.c.bucket_start >= bucket_start(start, period),
+            rollup.c.bucket_start < next_bucket_start(end, period)
+        )
+        if app_ids:
+            stale = stale.where(rollup.c.app_id.in_(app_ids))
+        await db.execute(stale)
+
+    raw = AppAnalytics.__table__
+    touched = select(raw.c.app_id, raw.c.date).where(
+        raw.c.date >= datetime.combine(start, datetime.min.time(), timezone.utc),
+        raw.c.date < datetime.combine(end + timedelta(days=1), datetime.min.time(), timezone.utc)
+    )
+    if app_ids:
+        touched = touched.where(raw.c.app_id.in_(app_ids))
+    await rebuild_rollups(db, touched.subquery(), start, end)
+
+def _bucket_filter(plan: Dict[RollupPeriod, List[date]]):
+    return or_(*[
+        and_(AppAnalyticsRollup.period == period, AppAnalyticsRollup.bucket_start.in_(starts))
+        for period, starts in plan.items() if starts
+    ])
+
+async def query_rollups(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    app_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Aggregate rollups per app over the inclusive range [start, end]"""
+    plan = plan_buckets(start, end)
+    if not any(plan.values()):
+        return {}
+
+    rollup = AppAnalyticsRollup
+    query = select(
+        rollup.app_id,
+        func.sum(rollup.row_count).label("row_count"),
+        *[func.sum(getattr(rollup, column)).label(column) for column in SUM_FIELDS],
+        *[func.max(getattr(rollup, column)).label(column) for column in PEAK_FIELDS],
+    ).where(_bucket_filter(plan)).group_by(rollup.app_id)
+
+    if app_ids is not None:
+        query = query.where(rollup.app_id.in_(list(app_ids)))
+
+    result = await db.execute(query)
+    return {row.app_id: dict(row._mapping) for row in result}
+
+def average(totals: Dict[str, Any], column: str) -> float:
+    """Per-day average of a summed rollup column"""
+    if not totals.get("row_count"):
+        return 0.0
+    return (totals[column] or 0) / totals["row_count"]
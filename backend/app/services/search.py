@@ -0,0 +1,342 @@
+"""
+Ranked search over apps and users: prefix, fuzzy (trigram) and full-text.
+
+On Postgres, migration 0005 gives ``apps`` and ``users`` a weighted
+``search_document`` tsvector (a generated column, not mapped on the models)
+with a GIN index, and pg_trgm GIN indexes on the short identifying columns.
+One query collects candidates through those indexes and ranks them.
+
+Elsewhere (SQLite in development and tests) every process keeps an inverted
+index in memory: word -> documents with the weight of the field it appears
+in, and trigram -> words for fuzzy matching. It is built on first use and,
+when the dataset's version changes, refreshed from the rows created or
+updated since.
+"""
+import asyncio
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy import case, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.app import App
+from ..models.user import User
+from ..schemas.search import SearchMode
+from .versions import APPS, USERS, get_versions
+
+WORD = re.compile(r"[^\W_]+")
+
+# Score of a word matched by prefix, relative to the whole word
+PREFIX_STRENGTH = 0.8
+# Least trigram similarity of a fuzzy match (pg_trgm's default threshold)
+FUZZY_THRESHOLD = 0.3
+# Most vocabulary words one query word expands to by prefix or similarity
+MAX_EXPANSIONS = 64
+
+@dataclass(frozen=True)
+class SearchSpec:
+    model: Any
+    dataset: str
+    fields: Dict[str, float]  # column -> weight of the words found in it
+    title: str  # column whose prefix matches rank first
+    fuzzy: Tuple[str, ...]  # columns with trigram indexes
+
+APP_SEARCH = SearchSpec(
+    App, APPS,
+    {"name": 1.0, "package_name": 1.0, "category": 0.4, "tags": 0.4, "description": 0.2},
+    "name", ("name", "package_name")
+)
+USER_SEARCH = SearchSpec(User, USERS, {"full_name": 1.0, "email": 1.0}, "full_name", ("full_name", "email"))
+
+def words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrams of a word, padded the way pg_trgm does"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(map(str, value))
+    return str(value)
+
+class InvertedIndex:
+    """In-memory word and trigram index of one model's searchable columns"""
+
+    def __init__(self, spec: SearchSpec):
+        self.spec = spec
+        self.version: Optional[str] = None
+        self.watermark: Optional[datetime] = None  # newest created_at/updated_at indexed
+        self.documents: Dict[int, Dict[str, float]] = {}  # id -> word weights
+        self.titles: Dict[int, str] = {}
+        self.size = 0  # above every id indexed so far
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.grams: Dict[str, Set[str]] = {}  # trigram -> words
+        self.gram_counts: Dict[str, int] = {}  # word -> number of distinct trigrams
+        # Sorted on first use, then kept sorted
+        self._vocabulary: Optional[List[str]] = None
+        self._title_order: Optional[List[Tuple[str, int]]] = None
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # word -> (ids, weights), built on use
+        self._lock = asyncio.Lock()
+
+    def add(self, doc_id: int, values: Mapping[str, Any]) -> None:
+        self.remove(doc_id)
+        weights: Dict[str, float] = {}
+        for field, weight in self.spec.fields.items():
+            for word in words(_text(values.get(field))):
+                if weight > weights.get(word, 0.0):
+                    weights[word] = weight
+        self.documents[doc_id] = weights
+        self.size = max(self.size, doc_id + 1)
+        self.titles[doc_id] = title = _text(values.get(self.spec.title)).lower()
+        if self._title_order is not None:
+            insort(self._title_order, (title, doc_id))
+        for word, weight in weights.items():
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = {}
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, word)
+                grams = trigrams(word)
+                self.gram_counts[word] = len(grams)
+                for gram in grams:
+                    self.grams.setdefault(gram, set()).add(word)
+            postings[doc_id] = weight
+            self._arrays.pop(word, None)
+
+    def remove(self, doc_id: int) -> None:
+        title = self.titles.pop(doc_id, None)
+        if title is not None and self._title_order is not None:
+            del self._title_order[bisect_left(self._title_order, (title, doc_id))]
+        for word in self.documents.pop(doc_id, ()):
+            postings = self.postings[word]
+            del postings[doc_id]
+            self._arrays.pop(word, None)
+            if postings:
+                continue
+            del self.postings[word]
+            del self.gram_counts[word]
+            if self._vocabulary is not None:
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+            for gram in trigrams(word):
+                self.grams[gram].discard(word)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Bring the index up to date with the dataset's current version"""
+        version, _ = await get_versions(db, self.spec.dataset)
+        if version == self.version:
+            return
+        async with self._lock:
+            if version == self.version:
+                return
+            model = self.spec.model
+            connection = await db.connection()
+            query = select(model.id, model.created_at, model.updated_at,
+                           *(getattr(model, field) for field in self.spec.fields))
+            if self.watermark is not None:
+                # Rows written since a second before the newest indexed change are
+                # re-read (timestamps may be stored to the second); deletions show
+                # up as ids that are gone
+                since = self.watermark - timedelta(seconds=1)
+                query = query.where(or_(model.created_at >= since, model.updated_at >= since))
+                live = set((await connection.execute(select(model.id))).scalars())
+                for doc_id in self.documents.keys() - live:
+                    self.remove(doc_id)
+            for row in (await connection.execute(query)).all():
+                self.add(row.id, row._mapping)
+                for changed in (row.created_at, row.updated_at):
+                    if changed is not None and (self.watermark is None or changed > self.watermark):
+                        self.watermark = changed
+            self.version = version
+
+    def _postings_array(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(word)
+        if arrays is None:
+            postings = self.postings[word]
+            arrays = self._arrays[word] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=float, count=len(postings)),
+            )
+        return arrays
+
+    def _prefixed(self, prefix: str, values: List[Any]) -> slice:
+        """The slice of sorted ``values`` (strings, or tuples led by one) starting with ``prefix``"""
+        start = bisect_left(values, (prefix,) if values and isinstance(values[0], tuple) else prefix)
+        end = prefix + "\U0010ffff"
+        return slice(start, bisect_left(values, (end,) if values and isinstance(values[0], tuple) else end, start))
+
+    def _similar(self, word: str) -> List[Tuple[str, float]]:
+        """Vocabulary words at least FUZZY_THRESHOLD similar to ``word``, most similar first"""
+        grams = trigrams(word)
+        shared = Counter(match for gram in grams for match in self.grams.get(gram, ()))
+        similar = []
+        for match, count in shared.items():
+            similarity = count / (len(grams) + self.gram_counts[match] - count)
+            if similarity >= FUZZY_THRESHOLD:
+                similar.append((match, similarity))
+        return heapq.nlargest(MAX_EXPANSIONS, similar, key=lambda pair: pair[1])
+
+    def _expansions(self, word: str, prefix: bool, fuzzy: bool) -> Dict[str, float]:
+        """Vocabulary words a query word matches, with the strength of the match"""
+        matches: Dict[str, float] = {}
+        if fuzzy and len(word) >= 3:
+            matches.update(self._similar(word))
+        if prefix:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            prefixed = self._prefixed(word, self._vocabulary)
+            for candidate in self._vocabulary[prefixed][:MAX_EXPANSIONS]:
+                matches[candidate] = max(matches.get(candidate, 0.0), PREFIX_STRENGTH)
+        if word in self.postings:
+            matches[word] = 1.0
+        return matches
+
+    def score(self, query: str, mode: SearchMode) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids of the documents matching every query word, best first (highest id
+        on ties), and their scores: the mean over query words of the best
+        match's strength times its field weight, plus 1 when the title starts
+        with the query
+        """
+        terms = list(dict.fromkeys(words(query)))
+        size = self.size
+        total = np.zeros(size)
+        matched = np.ones(size, dtype=bool)
+        for position, term in enumerate(terms):
+            prefix = mode == SearchMode.PREFIX or (mode == SearchMode.AUTO and position == len(terms) - 1)
+            fuzzy = mode in (SearchMode.FUZZY, SearchMode.AUTO)
+            best = np.zeros(size)
+            for word, strength in self._expansions(term, prefix, fuzzy).items():
+                ids, weights = self._postings_array(word)
+                best[ids] = np.maximum(best[ids], strength * weights)
+            total += best
+            matched &= best > 0
+        ids = np.flatnonzero(matched) if terms else np.zeros(0, dtype=np.int64)
+        scores = total[ids] / max(len(terms), 1)
+
+        if mode != SearchMode.FULLTEXT and len(ids):
+            if self._title_order is None:
+                self._title_order = sorted((title, doc_id) for doc_id, title in self.titles.items())
+            prefixed = self._title_order[self._prefixed(query.strip().lower(), self._title_order)]
+            boosted = np.zeros(size, dtype=bool)
+            boosted[[doc_id for _, doc_id in prefixed]] = True
+            scores += boosted[ids]
+
+        order = np.lexsort((ids, scores))[::-1]
+        return ids[order], scores[order]
+
+_indexes: Dict[str, InvertedIndex] = {}
+
+def get_index(spec: SearchSpec) -> InvertedIndex:
+    if spec.dataset not in _indexes:
+        _indexes[spec.dataset] = InvertedIndex(spec)
+    return _indexes[spec.dataset]
+
+def _like_prefix(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def _tsquery(terms: List[str], prefix_last: bool, prefix_all: bool) -> Optional[str]:
+    if not terms:
+        return None
+    return " & ".join(
+        f"{term}:*" if prefix_all or (prefix_last and position == len(terms) - 1) else term
+        for position, term in enumerate(terms)
+    )
+
+async def _search_postgres(db: AsyncSession, spec: SearchSpec, query: str, mode: SearchMode,
+                           limit: int, where: Any) -> List[Tuple[Any, float]]:
+    model = spec.model
+    document = literal_column(f"{model.__tablename__}.search_document", TSVECTOR)
+    fuzzy_columns = [getattr(model, column) for column in spec.fuzzy]
+    title = getattr(model, spec.title)
+    terms = list(dict.fromkeys(words(query)))
+    matches, scores = [], []
+    # Cheap relevance deciding which matches get scored when there are more
+    # than SEARCH_MAX_CANDIDATES: exact title, title prefix, text rank, and
+    # for fuzzy search the title's similarity alone
+    proxies = [case((func.lower(title) == query.strip().lower(), 1), else_=0)]
+    rank = None
+
+    if mode != SearchMode.FUZZY:
+        tsquery = _tsquery(terms, prefix_last=mode == SearchMode.AUTO, prefix_all=mode == SearchMode.PREFIX)
+        if tsquery is not None:
+            parsed = func.to_tsquery("simple", tsquery)
+            matches.append(document.bool_op("@@")(parsed))
+            # Normalized to rank / (rank + 1)
+            rank = func.ts_rank_cd(document, parsed, 32)
+            scores.append(rank)
+    if mode in (SearchMode.PREFIX, SearchMode.AUTO):
+        pattern = _like_prefix(query.strip())
+        matches.extend(column.ilike(pattern, escape="\\") for column in fuzzy_columns)
+        scores.append(case((title.ilike(pattern, escape="\\"), 1.0), else_=0.0))
+        proxies.append(scores[-1])
+    if rank is not None:
+        proxies.append(rank)
+    if mode in (SearchMode.FUZZY, SearchMode.AUTO):
+        matches.extend(literal(query).bool_op("<%")(column) for column in fuzzy_columns)
+        scores.append(func.greatest(*(func.word_similarity(query, column) for column in fuzzy_columns)))
+        if mode == SearchMode.FUZZY:
+            proxies.append(func.word_similarity(query, title))
+    if not matches:
+        return []
+
+    candidates = (
+        select(model.id).where(or_(*matches))
+        .order_by(*(proxy.desc() for proxy in proxies), model.id)
+        .limit(settings.SEARCH_MAX_CANDIDATES)
+    )
+    if where is not None:
+        candidates = candidates.where(where)
+    score = sum(scores[1:], scores[0]).label("score")
+    rows = (await db.execute(
+        select(model, score).where(model.id.in_(candidates.scalar_subquery()))
+        .order_by(score.desc(), model.id).limit(limit)
+    )).all()
+    return [(item, float(value)) for item, value in rows]
+
+async def _search_memory(db: AsyncSession, spec: SearchSpec, query: str, mode: SearchMode,
+                         limit: int, where: Any) -> List[Tuple[Any, float]]:
+    index = get_index(spec)
+    await index.refresh(db)
+    ids, scores = index.score(query, mode)
+    model = spec.model
+
+    # The database applies ``where``, so read further down the ranking until
+    # enough of it is left
+    hits: List[Tuple[Any, float]] = []
+    taken = 0
+    batch = max(limit * 2, 50)
+    while len(hits) < limit and taken < len(ids):
+        ranked = list(zip(ids[taken:taken + batch].tolist(), scores[taken:taken + batch].tolist()))
+        taken += batch
+        batch *= 4
+        rows = select(model).where(model.id.in_([doc_id for doc_id, _ in ranked]))
+        if where is not None:
+            rows = rows.where(where)
+        found = {item.id: item for item in await db.scalars(rows)}
+        hits.extend((found[doc_id], score) for doc_id, score in ranked if doc_id in found)
+    return hits[:limit]
+
+async def search(db: AsyncSession, spec: SearchSpec, query: str, mode: SearchMode = SearchMode.AUTO,
+                 limit: int = 20, where: Any = None) -> List[Tuple[Any, float]]:
+    """Up to ``limit`` (row, score) pairs matching ``query`` and ``where``, best first"""
+    if not words(query):
+        return []
+    if db.bind.dialect.name == "postgresql":
+        return await _search_postgres(db, spec, query, mode, limit, where)
+    return await _search_memory(db, spec, query, mode, limit, where)
+
+def search_hits(results: Iterable[Tuple[Any, float]]) -> List[Dict[str, Any]]:
+    return [{"item": item, "score": round(score, 4)} for item, score in results]
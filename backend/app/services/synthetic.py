@@ -0,0 +1,495 @@
+"""
+Synthetic data for load testing and hardware sizing.
+
+Rows are generated column-wise with NumPy, a block of apps at a time, so the
+cost per row is a handful of vectorized array operations. Each block draws
+from its own random stream derived from (seed, block index), so the output is
+identical whatever the number of processes or writers.
+
+On Postgres, the numeric tables (app_analytics, business_metrics) are encoded
+straight into COPY BINARY buffers by viewing the columns as one big-endian
+structured array; no Python object is created per row. Several writer
+connections COPY blocks concurrently while worker processes generate the next
+ones. Other databases get batched INSERTs from one writer.
+"""
+import asyncio
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from ..core.database import AsyncSessionLocal, async_engine
+from ..models.analytics import AppAnalytics, BusinessMetrics, MarketingCampaign
+from ..models.app import App, AppStatus, AppType, Platform
+from ..models.user import User, UserRole
+from .membership import resync_members
+from .partitions import ensure_partitions
+from .rollups import rebuild_range
+from .versions import ANALYTICS, APPS, bump
+
+# Target rows per generated block; blocks are the unit of parallelism
+BLOCK_ROWS = 250_000
+
+PG_EPOCH = date(2000, 1, 1)
+MICROS_PER_DAY = 86_400_000_000
+
+ROLE_WEIGHTS = {
+    UserRole.ADMIN: 0.01,
+    UserRole.EXECUTIVE: 0.03,
+    UserRole.BUSINESS_MANAGER: 0.06,
+    UserRole.MARKETING_MANAGER: 0.15,
+    UserRole.PRODUCT_MANAGER: 0.2,
+    UserRole.DEVELOPER: 0.4,
+    UserRole.ANALYST: 0.15,
+}
+CATEGORIES = ("games", "productivity", "education", "health", "finance", "social", "utilities", "entertainment")
+TAGS = (
+    "free", "premium", "subscription", "ads", "offline", "multiplayer", "kids", "casual",
+    "ai", "widgets", "dark-mode", "cloud-sync", "accessibility", "beta",
+)
+# (type, CPM in dollars, click-through rate, install conversion rate)
+CAMPAIGN_TYPES = (
+    ("social_media", 6.0, 0.012, 0.08),
+    ("google_ads", 9.0, 0.02, 0.05),
+    ("apple_search_ads", 25.0, 0.06, 0.4),
+    ("tiktok_ads", 4.0, 0.009, 0.06),
+    ("influencer", 15.0, 0.015, 0.1),
+)
+
+# Column order of the generated tables; all fixed width, (name, dtype)
+ANALYTICS_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("app_id", ">i4"),
+    ("date", ">i8"),
+    ("daily_active_users", ">i4"),
+    ("monthly_active_users", ">i4"),
+    ("new_users", ">i4"),
+    ("returning_users", ">i4"),
+    ("session_duration_avg", ">f8"),
+    ("sessions_per_user", ">f8"),
+    ("retention_day_1", ">f8"),
+    ("retention_day_7", ">f8"),
+    ("retention_day_30", ">f8"),
+    ("revenue", ">f8"),
+    ("in_app_purchases", ">f8"),
+    ("ad_revenue", ">f8"),
+    ("arpu", ">f8"),
+    ("crash_rate", ">f8"),
+    ("app_store_rating", ">f8"),
+    ("app_store_reviews_count", ">i4"),
+)
+BUSINESS_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("app_id", ">i4"),
+    ("month", ">i8"),
+    ("revenue_total", ">f8"),
+    ("revenue_subscriptions", ">f8"),
+    ("revenue_one_time", ">f8"),
+    ("revenue_ads", ">f8"),
+    ("development_cost", ">f8"),
+    ("marketing_cost", ">f8"),
+    ("operational_cost", ">f8"),
+    ("customer_acquisition_cost", ">f8"),
+    ("lifetime_value", ">f8"),
+    ("churn_rate", ">f8"),
+)
+CAMPAIGN_COLUMNS = (
+    "app_id", "name", "description", "campaign_type", "budget", "spent", "is_active",
+    "start_date", "end_date", "impressions", "clicks", "installs", "cost_per_install", "created_by",
+)
+
+@dataclass
+class SyntheticConfig:
+    users: int = 200
+    apps: int = 1000
+    days: int = 365
+    end: date = field(default_factory=lambda: date.today() - timedelta(days=1))
+    campaigns_per_app: int = 4
+    seed: int = 0
+    writers: int = 4
+    processes: int = 4
+    rollups: bool = True
+
+    @property
+    def start(self) -> date:
+        return self.end - timedelta(days=self.days - 1)
+
+@dataclass
+class Block:
+    """One block of generated rows, COPY-ready on Postgres and column lists otherwise"""
+    analytics: Any
+    analytics_rows: int
+    business: Any
+    business_rows: int
+    campaigns: List[tuple]
+
+@dataclass
+class GenerateReport:
+    rows: Dict[str, int]
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return sum(self.rows.values()) / self.seconds if self.seconds else 0.0
+
+def pg_micros(days: np.ndarray) -> np.ndarray:
+    """Day ordinals as Postgres timestamptz values (microseconds since 2000-01-01 UTC)"""
+    return (days - PG_EPOCH.toordinal()).astype(np.int64) * MICROS_PER_DAY
+
+def encode_copy_binary(columns: Sequence[Tuple[str, str]], values: Dict[str, np.ndarray]) -> bytes:
+    """
+    COPY BINARY payload for fixed-width, non-null columns: every tuple is the
+    field count followed by (length, value) pairs, which is exactly one record
+    of a packed big-endian structured array.
+    """
+    count = len(values[columns[0][0]])
+    fields = [("fields", ">i2")]
+    for name, dtype in columns:
+        fields += [(f"{name}_len", ">i4"), (name, dtype)]
+    records = np.empty(count, dtype=fields)
+    records["fields"] = len(columns)
+    for name, dtype in columns:
+        records[f"{name}_len"] = np.dtype(dtype).itemsize
+        records[name] = values[name]
+    header = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+    return header + records.tobytes() + b"\xff\xff"
+
+def _as_rows(columns: Sequence[Tuple[str, str]], values: Dict[str, np.ndarray], time_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """Plain row dicts for databases without COPY"""
+    lists = []
+    for name, _ in columns:
+        if name in time_columns:
+            lists.append([
+                datetime.combine(date.fromordinal(ordinal), datetime.min.time(), timezone.utc)
+                for ordinal in values[name].tolist()
+            ])
+        else:
+            lists.append(values[name].tolist())
+    names = [name for name, _ in columns]
+    return [dict(zip(names, row)) for row in zip(*lists)]
+
+def _ordinals(days64: np.ndarray) -> np.ndarray:
+    """Proleptic Gregorian ordinals (date.toordinal) of datetime64 values"""
+    return days64.astype("datetime64[D]").astype(np.int64) + date(1970, 1, 1).toordinal()
+
+def generate_block(seed: int, index: int, app_ids: Sequence[int], games: Sequence[bool],
+                   creators: Sequence[int], start: date, days: int, campaigns_per_app: int,
+                   binary: bool) -> Block:
+    """
+    Daily analytics, monthly business metrics and campaigns for a block of
+    apps. Runs in worker processes, so it only takes and returns plain data.
+    """
+    rng = np.random.default_rng([seed, index])
+    apps = np.asarray(app_ids, dtype=np.int64)
+    is_game = np.asarray(games, dtype=bool)
+    n_apps = len(apps)
+    first = start.toordinal()
+    t = np.arange(days)
+
+    # Per-app parameters, shape (apps, 1) to broadcast over days
+    launch = rng.integers(-days, days // 2, n_apps)[:, None]  # some apps launch inside the range
+    base = rng.lognormal(7.5, 1.4, n_apps)[:, None]
+    growth = rng.normal(0.0008, 0.0012, n_apps)[:, None]
+    weekend_lift = np.where(is_game, rng.uniform(0.1, 0.3, n_apps), rng.uniform(-0.25, 0.0, n_apps))[:, None]
+    d1 = rng.beta(4, 6, n_apps)[:, None] * 100
+    decay = rng.uniform(0.35, 0.65, n_apps)[:, None]  # retention(n) = d1 * n ** -decay
+    arpdau = rng.lognormal(np.log(0.05), 0.7, n_apps)[:, None]
+    iap_share = np.where(is_game, rng.beta(5, 3, n_apps), rng.beta(2, 4, n_apps))[:, None]
+    rating_base = rng.uniform(3.2, 4.8, n_apps)[:, None]
+    crash_base = rng.gamma(2.0, 0.3, n_apps)[:, None]
+
+    ordinals = first + t
+    days64 = np.datetime64(start, "D") + t
+    weekday = (ordinals - 1) % 7  # Monday = 0, as date.weekday()
+    day_of_year = (days64 - days64.astype("datetime64[Y]")).astype(np.int64) + 1
+    weekly = 1 + weekend_lift * (weekday >= 5)
+    yearly = 1 + 0.12 * np.cos(2 * np.pi * (day_of_year - 355) / 365.25)  # holiday peak
+
+    age = t - launch  # days since launch
+    live = age >= 0
+    ramp = 1 - np.exp(-np.maximum(age, 0) / 14)
+    noise = rng.lognormal(0, 0.08, (n_apps, days))
+    dau = np.maximum(base * ramp * np.exp(growth * t) * weekly * yearly * noise, 1).astype(np.int64)
+    new_share = np.clip(0.04 + 0.5 * np.exp(-np.maximum(age, 0) / 30) + rng.normal(0, 0.01, (n_apps, days)), 0.01, 0.95)
+    new_users = (dau * new_share).astype(np.int64)
+    mau = (dau * rng.uniform(2.5, 4.5, n_apps)[:, None]).astype(np.int64)
+
+    retention_noise = rng.normal(1, 0.03, (n_apps, days))
+    r1 = np.clip(d1 * retention_noise, 1, 95)
+    r7 = r1 * 7.0 ** -decay
+    r30 = r1 * 30.0 ** -decay
+
+    revenue = dau * arpdau * rng.lognormal(0, 0.15, (n_apps, days))
+    iap = revenue * iap_share
+    ads = revenue - iap
+    rating = np.clip(rating_base + np.cumsum(rng.normal(0, 0.01, (n_apps, days)), axis=1), 1, 5)
+    reviews = np.cumsum(rng.poisson(np.maximum(dau * 0.0004, 0.01)), axis=1)
+
+    analytics = {
+        "app_id": np.broadcast_to(apps[:, None], (n_apps, days))[live],
+        "date": np.broadcast_to(ordinals, (n_apps, days))[live],
+        "daily_active_users": dau[live],
+        "monthly_active_users": mau[live],
+        "new_users": new_users[live],
+        "returning_users": (dau - new_users)[live],
+        "session_duration_avg": np.round(rng.gamma(4, 2, (n_apps, days))[live], 2),
+        "sessions_per_user": np.round(rng.gamma(3, 0.7, (n_apps, days))[live] + 1, 2),
+        "retention_day_1": np.round(r1[live], 2),
+        "retention_day_7": np.round(r7[live], 2),
+        "retention_day_30": np.round(r30[live], 2),
+        "revenue": np.round(revenue[live], 2),
+        "in_app_purchases": np.round(iap[live], 2),
+        "ad_revenue": np.round(ads[live], 2),
+        "arpu": np.round((revenue / dau)[live], 4),
+        "crash_rate": np.round((crash_base * rng.lognormal(0, 0.3, (n_apps, days)))[live], 3),
+        "app_store_rating": np.round(rating[live], 2),
+        "app_store_reviews_count": reviews[live],
+    }
+    analytics_rows = len(analytics["app_id"])
+
+    # Business metrics: the same revenue, summed per app and month
+    month_of_day = days64.astype("datetime64[M]")
+    months = np.unique(month_of_day)
+    cells = n_apps * len(months)
+    cell = (np.arange(n_apps)[:, None] * len(months) + np.searchsorted(months, month_of_day))[live]
+    monthly_iap = np.bincount(cell, weights=iap[live], minlength=cells)
+    monthly_ads = np.bincount(cell, weights=ads[live], minlength=cells)
+    monthly_revenue = monthly_iap + monthly_ads
+    monthly_new = np.bincount(cell, weights=new_users[live], minlength=cells)
+    live_days = np.bincount(cell, minlength=cells)
+    has_data = live_days > 0
+    average_mau = np.bincount(cell, weights=mau[live], minlength=cells) / np.maximum(live_days, 1)
+    subscription_share = rng.beta(2, 2, n_apps).repeat(len(months))
+    # Paid installs at a per-app CPI; the rest are organic
+    paid_share = rng.uniform(0.2, 0.6, n_apps).repeat(len(months))
+    cpi = rng.lognormal(np.log(1.5), 0.5, n_apps).repeat(len(months))
+    marketing = monthly_new * paid_share * cpi
+    cac = marketing / np.maximum(monthly_new, 1)
+    churn = rng.beta(2, 20, cells)  # monthly
+    arpu_month = monthly_revenue / np.maximum(average_mau, 1)
+    business = {
+        "app_id": apps.repeat(len(months))[has_data],
+        "month": np.tile(_ordinals(months), n_apps)[has_data],
+        "revenue_total": np.round(monthly_revenue, 2)[has_data],
+        "revenue_subscriptions": np.round(monthly_iap * subscription_share, 2)[has_data],
+        "revenue_one_time": np.round(monthly_iap * (1 - subscription_share), 2)[has_data],
+        "revenue_ads": np.round(monthly_ads, 2)[has_data],
+        "development_cost": np.round(rng.lognormal(9, 0.6, cells), 2)[has_data],
+        "marketing_cost": np.round(marketing, 2)[has_data],
+        "operational_cost": np.round(monthly_revenue * rng.uniform(0.05, 0.2, cells), 2)[has_data],
+        "customer_acquisition_cost": np.round(cac, 2)[has_data],
+        "lifetime_value": np.round(arpu_month / churn, 2)[has_data],
+        "churn_rate": np.round(churn * 100, 2)[has_data],
+    }
+    business_rows = len(business["app_id"])
+
+    # Campaigns: a few per app, spend paced over their flight
+    campaigns: List[tuple] = []
+    n_campaigns = n_apps * campaigns_per_app
+    if n_campaigns:
+        kinds = rng.integers(len(CAMPAIGN_TYPES), size=n_campaigns)
+        cpm = np.array([kind[1] for kind in CAMPAIGN_TYPES])[kinds] * rng.lognormal(0, 0.2, n_campaigns)
+        ctr = np.array([kind[2] for kind in CAMPAIGN_TYPES])[kinds] * rng.lognormal(0, 0.25, n_campaigns)
+        cvr = np.array([kind[3] for kind in CAMPAIGN_TYPES])[kinds] * rng.lognormal(0, 0.25, n_campaigns)
+        flight_start = first + rng.integers(0, days, n_campaigns)
+        duration = rng.integers(14, 91, n_campaigns)
+        elapsed = np.clip((first + days - flight_start) / duration, 0, 1)
+        budget = np.round(rng.lognormal(8.5, 0.8, n_campaigns), 2)
+        spent = np.round(np.minimum(budget * elapsed * rng.uniform(0.85, 1.05, n_campaigns), budget), 2)
+        impressions = (spent / cpm * 1000).astype(np.int64)
+        clicks = rng.binomial(impressions, np.clip(ctr, 0, 1))
+        installs = rng.binomial(clicks, np.clip(cvr, 0, 1))
+        cpi = np.round(np.where(installs > 0, spent / np.maximum(installs, 1), 0), 2)
+        owners = np.asarray(creators)[rng.integers(len(creators), size=n_campaigns)]
+        end_day = flight_start + duration
+        today = date.today().toordinal()
+        for k, values in enumerate(zip(
+            apps.repeat(campaigns_per_app).tolist(), kinds.tolist(), budget.tolist(), spent.tolist(),
+            flight_start.tolist(), end_day.tolist(), impressions.tolist(), clicks.tolist(),
+            installs.tolist(), cpi.tolist(), owners.tolist()
+        )):
+            app_id, kind, budget_k, spent_k, begin, finish, shown, clicked, installed, cpi_k, owner = values
+            name = CAMPAIGN_TYPES[kind][0]
+            campaigns.append((
+                app_id, f"{name} #{k % campaigns_per_app + 1}", None, name, budget_k, spent_k, finish >= today,
+                datetime.combine(date.fromordinal(begin), datetime.min.time(), timezone.utc),
+                datetime.combine(date.fromordinal(finish), datetime.min.time(), timezone.utc),
+                shown, clicked, installed, cpi_k, owner,
+            ))
+
+    if binary:
+        analytics["date"] = pg_micros(analytics["date"])
+        business["month"] = pg_micros(business["month"])
+        return Block(
+            encode_copy_binary(ANALYTICS_COLUMNS, analytics), analytics_rows,
+            encode_copy_binary(BUSINESS_COLUMNS, business), business_rows, campaigns
+        )
+    return Block(
+        _as_rows(ANALYTICS_COLUMNS, analytics, ("date",)), analytics_rows,
+        _as_rows(BUSINESS_COLUMNS, business, ("month",)), business_rows, campaigns
+    )
+
+def _users(config: SyntheticConfig, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    roles = list(ROLE_WEIGHTS)
+    drawn = rng.choice(len(roles), size=config.users, p=list(ROLE_WEIGHTS.values()))
+    # Every role at least once, so apps always have owners and assignees
+    drawn[:len(roles)] = np.arange(len(roles))[:config.users]
+    return [
+        {
+            "email": f"synthetic-{config.seed}-{i}@example.com",
+            "full_name": f"Synthetic User {i}",
+            "role": roles[role],
+            "is_active": True,
+            "is_verified": True,
+        }
+        for i, role in enumerate(drawn.tolist())
+    ]
+
+def _apps(config: SyntheticConfig, rng: np.random.Generator, users: Dict[UserRole, List[int]]) -> List[Dict[str, Any]]:
+    creators = np.array(users[UserRole.DEVELOPER] + users[UserRole.PRODUCT_MANAGER])
+    pms = np.array(users[UserRole.PRODUCT_MANAGER])
+    marketers = np.array(users[UserRole.MARKETING_MANAGER])
+    n = config.apps
+    app_types = [AppType.GAME, AppType.MOBILE_APP, AppType.WEB_APP]
+    types = [app_types[k] for k in rng.choice(3, size=n, p=[0.45, 0.45, 0.1]).tolist()]
+    platforms = [list(Platform)[k] for k in rng.choice(len(Platform), size=n, p=[0.45, 0.35, 0.05, 0.15]).tolist()]
+    statuses = [list(AppStatus)[k] for k in rng.choice(len(AppStatus), size=n, p=[0.1, 0.05, 0.05, 0.7, 0.03, 0.07]).tolist()]
+    categories = rng.integers(len(CATEGORIES), size=n)
+    owner = creators[rng.integers(len(creators), size=n)]
+    pm = np.where(rng.random(n) < 0.8, pms[rng.integers(len(pms), size=n)], 0)
+    marketing = np.where(rng.random(n) < 0.6, marketers[rng.integers(len(marketers), size=n)], 0)
+    # Zero to four distinct tags per app, the first few tags the most common
+    tag_counts = rng.integers(0, 5, size=n)
+    tag_order = np.argsort(rng.random((n, len(TAGS))) * np.arange(1, len(TAGS) + 1), axis=1)
+    return [
+        {
+            "name": f"Synthetic App {i}",
+            "package_name": f"com.synthetic.s{config.seed}.app{i}",
+            "description": f"Generated app {i}",
+            "app_type": types[i],
+            "platform": platforms[i],
+            "version": f"{1 + i % 4}.{i % 10}.0",
+            "build_number": 1 + i % 200,
+            "status": statuses[i],
+            "is_published": statuses[i] == AppStatus.PUBLISHED,
+            "category": CATEGORIES[categories[i]] if types[i] != AppType.GAME else "games",
+            "tags": [TAGS[k] for k in tag_order[i, :tag_counts[i]].tolist()],
+            "created_by": int(owner[i]),
+            "assigned_pm": int(pm[i]) or None,
+            "assigned_marketing": int(marketing[i]) or None,
+        }
+        for i in range(n)
+    ]
+
+async def _insert_entities(config: SyntheticConfig) -> Tuple[Dict[UserRole, List[int]], List[Tuple[int, bool]]]:
+    """Users and apps (small tables), returning ids by role and (app id, is game)"""
+    rng = np.random.default_rng([config.seed, 2 ** 31])
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(User.__table__), _users(config, rng))
+        rows = (await db.execute(
+            select(User.id, User.role).where(User.email.like(f"synthetic-{config.seed}-%")).order_by(User.id)
+        )).all()
+        users: Dict[UserRole, List[int]] = {role: [] for role in UserRole}
+        for row in rows:
+            users[row.role].append(row.id)
+
+        await db.execute(insert(App.__table__), _apps(config, rng, users))
+        apps = (await db.execute(
+            select(App.id, App.app_type).where(App.package_name.like(f"com.synthetic.s{config.seed}.%")).order_by(App.id)
+        )).all()
+        await resync_members(db, [row.id for row in apps])
+        await bump(db, APPS)
+        await db.commit()
+    return users, [(row.id, row.app_type == AppType.GAME) for row in apps]
+
+async def _copy_writer(queue: "asyncio.Queue[Optional[Block]]", rows: Dict[str, int]) -> None:
+    async with async_engine.connect() as connection:
+        raw = (await connection.get_raw_connection()).driver_connection
+        while (block := await queue.get()) is not None:
+            async with raw.transaction():
+                if block.analytics_rows:
+                    await raw.copy_to_table(
+                        AppAnalytics.__tablename__, source=io.BytesIO(block.analytics),
+                        columns=[name for name, _ in ANALYTICS_COLUMNS], format="binary"
+                    )
+                if block.business_rows:
+                    await raw.copy_to_table(
+                        BusinessMetrics.__tablename__, source=io.BytesIO(block.business),
+                        columns=[name for name, _ in BUSINESS_COLUMNS], format="binary"
+                    )
+                if block.campaigns:
+                    await raw.copy_records_to_table(
+                        MarketingCampaign.__tablename__, records=block.campaigns, columns=list(CAMPAIGN_COLUMNS)
+                    )
+            rows["app_analytics"] += block.analytics_rows
+            rows["business_metrics"] += block.business_rows
+            rows["marketing_campaigns"] += len(block.campaigns)
+
+async def _insert_writer(queue: "asyncio.Queue[Optional[Block]]", rows: Dict[str, int]) -> None:
+    async with AsyncSessionLocal() as db:
+        while (block := await queue.get()) is not None:
+            if block.analytics_rows:
+                await db.execute(insert(AppAnalytics.__table__), block.analytics)
+            if block.business_rows:
+                await db.execute(insert(BusinessMetrics.__table__), block.business)
+            if block.campaigns:
+                await db.execute(insert(MarketingCampaign.__table__), [
+                    dict(zip(CAMPAIGN_COLUMNS, campaign)) for campaign in block.campaigns
+                ])
+            await db.commit()
+            rows["app_analytics"] += block.analytics_rows
+            rows["business_metrics"] += block.business_rows
+            rows["marketing_campaigns"] += len(block.campaigns)
+
+async def generate(config: SyntheticConfig, pool: ProcessPoolExecutor) -> GenerateReport:
+    """Generate and load a full synthetic dataset; commits as it goes"""
+    started = time.perf_counter()
+    postgres = async_engine.dialect.name == "postgresql"
+    users, apps = await _insert_entities(config)
+    creators = users[UserRole.MARKETING_MANAGER] or users[UserRole.ADMIN]
+    rows = {"users": sum(len(ids) for ids in users.values()), "apps": len(apps),
+            "app_analytics": 0, "business_metrics": 0, "marketing_campaigns": 0}
+
+    if postgres:
+        await ensure_partitions(config.start, config.end)
+
+    apps_per_block = max(1, BLOCK_ROWS // config.days)
+    blocks = [apps[i:i + apps_per_block] for i in range(0, len(apps), apps_per_block)]
+    writers = config.writers if postgres else 1
+    # Bounded, so generation stays at most a couple of blocks ahead of the writers
+    queue: "asyncio.Queue[Optional[Block]]" = asyncio.Queue(maxsize=writers * 2)
+    writer_tasks = [
+        asyncio.create_task((_copy_writer if postgres else _insert_writer)(queue, rows))
+        for _ in range(writers)
+    ]
+
+    loop = asyncio.get_running_loop()
+    in_flight: List[asyncio.Future] = []
+    try:
+        for index, block in enumerate(blocks):
+            in_flight.append(loop.run_in_executor(
+                pool, generate_block, config.seed, index, [app_id for app_id, _ in block],
+                [game for _, game in block], creators, config.start, config.days,
+                config.campaigns_per_app, postgres
+            ))
+            if len(in_flight) >= config.processes:
+                await queue.put(await in_flight.pop(0))
+        for future in in_flight:
+            await queue.put(await future)
+        for _ in writer_tasks:
+            await queue.put(None)
+        await asyncio.gather(*writer_tasks)
+    except BaseException:
+        for task in writer_tasks:
+            task.cancel()
+        raise
+
+    async with AsyncSessionLocal() as db:
+        if config.rollups:
+            await rebuild_range(db, config.start, config.end)
+        await bump(db, ANALYTICS)
+        await db.commit()
+    return GenerateReport(rows=rows, seconds=time.perf_counter() - started)
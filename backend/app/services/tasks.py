@@ -0,0 +1,63 @@
+"""
+Background tasks. Importing this module registers them with the job runner;
+both the API process and ``python -m app.cli.worker`` import it.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from ..core.database import AsyncSessionLocal
+from ..core.jobs import task
+from ..models.app import ArtifactUpload
+from .extraction import extract_artifact
+from .partitions import add_months, ensure_partitions
+from .rollups import rebuild_range
+from .uploads import abort_upload
+from .versions import ANALYTICS, bump
+
+EXTRACT_ARTIFACT = "apps.extract_artifact"
+PURGE_STALE_UPLOADS = "apps.purge_stale_uploads"
+REBUILD_ROLLUPS = "analytics.rebuild_rollups"
+ENSURE_PARTITIONS = "analytics.ensure_partitions"
+
+@task(EXTRACT_ARTIFACT, max_retries=2, priority=5, timeout=300)
+async def extract_artifact_task(artifact_id: int) -> None:
+    await extract_artifact(artifact_id)
+
+@task(PURGE_STALE_UPLOADS, max_retries=1, priority=-5, every=3600)
+async def purge_stale_uploads(max_age_hours: int = 24) -> Dict[str, Any]:
+    """Abort resumable uploads that have not progressed for ``max_age_hours``"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+    stale = (ArtifactUpload.updated_at < cutoff) | (
+        ArtifactUpload.updated_at.is_(None) & (ArtifactUpload.created_at < cutoff)
+    )
+    purged = 0
+    async with AsyncSessionLocal() as db:
+        upload_ids = (await db.scalars(select(ArtifactUpload.id).where(stale))).all()
+        for upload_id in upload_ids:
+            # Each runner enqueues this task: skip uploads another purge (or a
+            # request appending to it) holds, and ones that went in the meantime
+            upload = await db.scalar(
+                select(ArtifactUpload).where(ArtifactUpload.id == upload_id, stale)
+                .with_for_update(skip_locked=True)
+            )
+            if upload is not None:
+                await abort_upload(db, upload)
+                purged += 1
+    return {"purged": purged}
+
+@task(REBUILD_ROLLUPS, priority=-1, timeout=3600)
+async def rebuild_rollups_task(start: str, end: str, app_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Recompute analytics rollups for a date range from raw rows"""
+    async with AsyncSessionLocal() as db:
+        await rebuild_range(db, date.fromisoformat(start), date.fromisoformat(end), app_ids)
+        await bump(db, ANALYTICS)
+        await db.commit()
+    return {"start": start, "end": end, "app_ids": app_ids}
+
+@task(ENSURE_PARTITIONS, max_retries=3, priority=-1)
+async def ensure_partitions_task(months_ahead: int = 3) -> Dict[str, Any]:
+    """Create app_analytics partitions through ``months_ahead`` months from now"""
+    today = date.today()
+    return {"created": await ensure_partitions(today, add_months(today, months_ahead))}
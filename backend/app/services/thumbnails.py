@@ -0,0 +1,141 @@
+"""
+Derived images: fixed-size WebP thumbnails of icons and screenshots.
+
+Sources are content-addressed files under UPLOAD_DIR, so a thumbnail URL
+(preset + source digest) never changes meaning and can be cached forever by
+clients. Rendering happens in the shared process pool; results live in a
+size-bounded directory with least-recently-used eviction.
+"""
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.workers import get_process_pool
+from .imaging import PRESETS, render_thumbnail
+from .uploads import upload_root
+
+THUMBNAIL_URL_PREFIX = "/api/v1/media/thumbs"
+
+# Local media URLs that can be thumbnailed: /media/<kind>/<aa>/<sha256>[.ext]
+MEDIA_URL = re.compile(r"^/media/\w+/[0-9a-f]{2}/([0-9a-f]{64})(?:\.\w+)?$")
+
+# Content-addressed directories searched for a source digest
+SOURCE_LOCATIONS = ("icons/{prefix}/{sha256}.png", "artifacts/{prefix}/{sha256}")
+
+class ThumbnailCache:
+    """
+    Directory of derived files bounded by total size. Recency is kept in
+    memory and mirrored to file mtimes, so the order survives restarts.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: Optional["OrderedDict[str, int]"] = None  # key -> size, oldest first
+        self._total = 0
+        self._lock = asyncio.Lock()
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        files = []
+        for path in self.root.rglob("*.webp"):
+            stat = path.stat()
+            files.append((stat.st_mtime, str(path.relative_to(self.root)), stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(files))
+
+    async def _index(self) -> "OrderedDict[str, int]":
+        if self._entries is None:
+            entries = await asyncio.to_thread(self._scan)
+            if self._entries is None:
+                self._entries = entries
+                self._total = sum(entries.values())
+        return self._entries
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    async def get(self, key: str) -> Optional[Path]:
+        """Return the cached file and mark it recently used"""
+        entries = await self._index()
+        path = self.path(key)
+        if key not in entries:
+            # Another worker process may have rendered it
+            if not await asyncio.to_thread(path.exists):
+                return None
+            await self.add(key, (await asyncio.to_thread(path.stat)).st_size)
+            return path
+        entries.move_to_end(key)
+        try:
+            await asyncio.to_thread(os.utime, path)
+        except FileNotFoundError:
+            # Evicted by another worker process
+            self._total -= entries.pop(key)
+            return None
+        return path
+
+    async def add(self, key: str, size: int) -> None:
+        """Record a newly written file and evict until under the size bound"""
+        entries = await self._index()
+        async with self._lock:
+            self._total += size - entries.pop(key, 0)
+            entries[key] = size
+            evicted: List[Path] = []
+            while self._total > self.max_bytes and len(entries) > 1:
+                old_key, old_size = entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(self.path(old_key))
+        for path in evicted:
+            try:
+                await asyncio.to_thread(path.unlink)
+            except FileNotFoundError:
+                pass
+
+thumbnail_cache = ThumbnailCache(upload_root() / "thumbs", settings.THUMBNAIL_CACHE_MAX_BYTES)
+
+# Renders in progress, so concurrent requests for one thumbnail share the work
+_rendering: Dict[str, "asyncio.Future[Path]"] = {}
+
+def thumbnail_url(source_url: Optional[str], preset: str) -> Optional[str]:
+    """Thumbnail URL for a local media URL, or None for external images"""
+    match = MEDIA_URL.match(source_url or "")
+    if not match:
+        return None
+    return f"{THUMBNAIL_URL_PREFIX}/{preset}/{match.group(1)}.webp"
+
+def _find_source(sha256: str) -> Optional[Path]:
+    for location in SOURCE_LOCATIONS:
+        path = upload_root() / location.format(prefix=sha256[:2], sha256=sha256)
+        if path.exists():
+            return path
+    return None
+
+async def _render(key: str, sha256: str, preset: str) -> Path:
+    source = await asyncio.to_thread(_find_source, sha256)
+    if source is None:
+        raise FileNotFoundError(sha256)
+    destination = thumbnail_cache.path(key)
+    loop = asyncio.get_running_loop()
+    size = await loop.run_in_executor(get_process_pool(), render_thumbnail, str(source), str(destination), preset)
+    await thumbnail_cache.add(key, size)
+    return destination
+
+async def get_thumbnail(preset: str, sha256: str) -> Path:
+    """
+    Path of the thumbnail for a source digest, rendering it on a miss.
+    Raises FileNotFoundError for an unknown source and ValueError when the
+    source is not an image.
+    """
+    if preset not in PRESETS:
+        raise FileNotFoundError(preset)
+    key = os.path.join(preset, sha256[:2], f"{sha256}.webp")
+    cached = await thumbnail_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if key not in _rendering:
+        _rendering[key] = asyncio.ensure_future(_render(key, sha256, preset))
+        _rendering[key].add_done_callback(lambda _: _rendering.pop(key, None))
+    return await asyncio.shield(_rendering[key])
@@ -0,0 +1,230 @@
+"""
+Resumable, chunked artifact uploads.
+
+An upload is opened with its filename and total size, appended to by any
+number of requests that each state the offset they start at, then completed.
+Chunks stream straight to a part file under UPLOAD_DIR with async file I/O
+while a SHA-256 is updated incrementally, so a dropped connection only loses
+the bytes in flight: the client reads the current offset and carries on from
+there. Completed files are stored under their digest, so identical builds
+share one file on disk.
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.app import AppArtifact, ArtifactUpload
+from ..schemas.artifact import UploadInit
+
+# Chunk size suggested to clients; any size works
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Read size when a digest has to be rebuilt from the part file
+REHASH_BLOCK_SIZE = 1024 * 1024
+
+# upload id -> (offset covered, running digest); rebuilt from disk on a miss
+_digests: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+# Orders requests within this process; across workers the upload row is
+# locked (SELECT ... FOR UPDATE) until the request commits
+_locks: Dict[str, asyncio.Lock] = {}
+
+def upload_root() -> Path:
+    return Path(settings.UPLOAD_DIR)
+
+def part_path(upload_id: str) -> Path:
+    return upload_root() / "partial" / f"{upload_id}.part"
+
+def artifact_path(sha256: str) -> str:
+    """Storage path of a digest, relative to UPLOAD_DIR"""
+    return os.path.join("artifacts", sha256[:2], sha256)
+
+def check_extension(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+        )
+    return extension
+
+def check_size(size: int) -> None:
+    if size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte limit"
+        )
+
+async def _digest_for(upload: ArtifactUpload) -> "hashlib._Hash":
+    cached = _digests.get(upload.id)
+    if cached and cached[0] == upload.offset:
+        return cached[1]
+
+    # Another worker (or a restart) appended last: rehash what is on disk
+    digest = hashlib.sha256()
+    remaining = upload.offset
+    async with aiofiles.open(part_path(upload.id), "rb") as f:
+        while remaining:
+            block = await f.read(min(REHASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    _digests[upload.id] = (upload.offset, digest)
+    return digest
+
+def _forget(upload_id: str) -> None:
+    _digests.pop(upload_id, None)
+    _locks.pop(upload_id, None)
+
+async def open_upload(db: AsyncSession, app_id: int, data: UploadInit, user_id: int) -> ArtifactUpload:
+    """Validate the declared file and create an empty part file for it"""
+    check_extension(data.filename)
+    check_size(data.size)
+
+    upload = ArtifactUpload(
+        id=uuid.uuid4().hex,
+        app_id=app_id,
+        filename=os.path.basename(data.filename),
+        size=data.size,
+        offset=0,
+        expected_sha256=data.sha256.lower() if data.sha256 else None,
+        uploaded_by=user_id
+    )
+    await aiofiles.os.makedirs(part_path(upload.id).parent, exist_ok=True)
+    async with aiofiles.open(part_path(upload.id), "wb"):
+        pass
+    _digests[upload.id] = (0, hashlib.sha256())
+
+    db.add(upload)
+    await db.commit()
+    return upload
+
+async def append_chunk(db: AsyncSession, upload: ArtifactUpload, offset: int, chunks: AsyncIterator[bytes]) -> ArtifactUpload:
+    """
+    Append a request body at ``offset``. Whatever arrived before an error or a
+    disconnect is kept and recorded, so the next request resumes after it.
+    """
+    lock = _locks.setdefault(upload.id, asyncio.Lock())
+    async with lock:
+        await db.refresh(upload, with_for_update=True)
+        if offset != upload.offset:
+            detail = f"Upload offset is {upload.offset}"
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=detail
+            )
+
+        digest = await _digest_for(upload)
+        received = upload.offset
+        try:
+            async with aiofiles.open(part_path(upload.id), "r+b") as f:
+                # Drop bytes written past the recorded offset by an interrupted request
+                await f.truncate(received)
+                await f.seek(received)
+                async for chunk in chunks:
+                    if received + len(chunk) > upload.size:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Upload exceeds its declared size of {upload.size} bytes"
+                        )
+                    await f.write(chunk)
+                    digest.update(chunk)
+                    received += len(chunk)
+        finally:
+            _digests[upload.id] = (received, digest)
+            upload.offset = received
+            await db.commit()
+    return upload
+
+async def complete_upload(db: AsyncSession, upload: ArtifactUpload) -> Tuple[AppArtifact, bool]:
+    """
+    Move a fully received upload into content-addressed storage. Returns the
+    artifact and whether its content was already stored.
+    """
+    lock = _locks.setdefault(upload.id, asyncio.Lock())
+    async with lock:
+        await db.refresh(upload, with_for_update=True)
+        if upload.offset != upload.size:
+            detail = f"Upload incomplete: {upload.offset} of {upload.size} bytes received"
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=detail
+            )
+
+        sha256 = (await _digest_for(upload)).hexdigest()
+        if upload.expected_sha256 and sha256 != upload.expected_sha256:
+            await abort_upload(db, upload)
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Checksum mismatch"
+            )
+
+        storage_path = artifact_path(sha256)
+        destination = upload_root() / storage_path
+        deduplicated = await aiofiles.os.path.exists(destination)
+        if deduplicated:
+            await aiofiles.os.remove(part_path(upload.id))
+        else:
+            await aiofiles.os.makedirs(destination.parent, exist_ok=True)
+            await aiofiles.os.replace(part_path(upload.id), destination)
+
+        # The same build uploaded again for the same app reuses its row
+        artifact: Optional[AppArtifact] = await db.scalar(
+            select(AppArtifact).where(AppArtifact.app_id == upload.app_id, AppArtifact.sha256 == sha256)
+        )
+        if artifact is None:
+            artifact = AppArtifact(
+                app_id=upload.app_id,
+                filename=upload.filename,
+                extension=check_extension(upload.filename),
+                size=upload.size,
+                sha256=sha256,
+                storage_path=storage_path,
+                uploaded_by=upload.uploaded_by
+            )
+            db.add(artifact)
+
+        await db.delete(upload)
+        await db.commit()
+        await db.refresh(artifact)
+    _forget(upload.id)
+    return artifact, deduplicated
+
+async def abort_upload(db: AsyncSession, upload: ArtifactUpload) -> None:
+    """Discard an upload and its part file"""
+    try:
+        await aiofiles.os.remove(part_path(upload.id))
+    except FileNotFoundError:
+        pass
+    upload_id = upload.id
+    await db.delete(upload)
+    await db.commit()
+    _forget(upload_id)
+
+async def store_stream(db: AsyncSession, app_id: int, filename: str, size: int,
+                       chunks: AsyncIterator[bytes], user_id: int) -> Tuple[AppArtifact, bool]:
+    """Single-request upload: open, append everything and complete"""
+    if not size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is empty"
+        )
+    upload = await open_upload(db, app_id, UploadInit(filename=filename, size=size), user_id)
+    try:
+        await append_chunk(db, upload, 0, chunks)
+    except Exception:
+        await abort_upload(db, upload)
+        raise
+    return await complete_upload(db, upload)
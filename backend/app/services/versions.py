@@ -0,0 +1,86 @@
+"""
+Dataset change counters (``data_versions``).
+
+Every flush that touches a tracked model marks its dataset as changed, and
+bulk paths that bypass the ORM (ingest, rollup rebuilds) call ``bump``
+themselves. The counters are bumped once the transaction commits, in a short
+transaction of their own: bumping inside the writer's transaction would hold
+the counter row locked until it commits, queueing every concurrent writer of
+the dataset behind it. Read endpoints build their ETags from these counters,
+so answering a conditional GET costs one primary key lookup.
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.analytics import AppAnalytics, AppAnalyticsRollup, BusinessMetrics, MarketingCampaign, RetentionCohort
+from ..models.app import App
+from ..models.user import User
+from ..models.version import DataVersion
+
+APPS = "apps"
+ANALYTICS = "analytics"
+COHORTS = "cohorts"
+USERS = "users"
+
+# Mapped class -> dataset whose counter its changes bump
+TRACKED = {
+    App: APPS,
+    AppAnalytics: ANALYTICS,
+    AppAnalyticsRollup: ANALYTICS,
+    BusinessMetrics: ANALYTICS,
+    MarketingCampaign: ANALYTICS,
+    RetentionCohort: COHORTS,
+    User: USERS,
+}
+
+def bump_versions(connection, names: Iterable[str]) -> None:
+    table = DataVersion.__table__
+    # Fixed order, so concurrent transactions lock the rows the same way
+    for name in sorted(set(names)):
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1, updated_at=func.now())
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1))
+
+# Session.info key of the datasets the open transaction has changed
+CHANGED_KEY = "changed_datasets"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_datasets(session: Session, flush_context):
+    session.info.setdefault(CHANGED_KEY, set()).update(
+        TRACKED[type(obj)]
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if type(obj) in TRACKED and (obj not in session.dirty or session.is_modified(obj))
+    )
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_datasets(session: Session):
+    names = session.info.pop(CHANGED_KEY, None)
+    if names:
+        # The session's own transaction is over; bump on a fresh connection
+        with session.get_bind().begin() as connection:
+            bump_versions(connection, names)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_datasets(session: Session):
+    session.info.pop(CHANGED_KEY, None)
+
+async def bump(db: AsyncSession, *names: str) -> None:
+    """Mark datasets changed by a set-based write; their counters are bumped when ``db`` commits"""
+    db.info.setdefault(CHANGED_KEY, set()).update(names)
+
+async def get_versions(db: AsyncSession, *names: str) -> Tuple[str, Optional[datetime]]:
+    """A token that changes whenever any of the datasets does, and when they last changed"""
+    rows = (await db.execute(
+        select(DataVersion.name, DataVersion.version, DataVersion.updated_at).where(DataVersion.name.in_(names))
+    )).all()
+    versions = {row.name: row.version for row in rows}
+    token = ",".join(f"{name}:{versions.get(name, 0)}" for name in names)
+    modified = [row.updated_at for row in rows if row.updated_at is not None]
+    return token, max(modified) if modified else None
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from .environment import configure, describe, migrate
+
+def run(args: argparse.Namespace) -> None:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench-"))
+    url = configure(workdir, args.database_url, args.server)
+    migrate(url, args.reset)
+
+    # App modules read settings on import, so only now
+    from .runner import HEADER, RunConfig, run as run_benchmark
+    from .seed import SeedConfig
+
+    seed_config = SeedConfig(users=args.users, apps=args.apps, analytics_days=args.analytics_days, seed=args.seed)
+    config = RunConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        only=args.only or [],
+        server=args.server
+    )
+    print(HEADER)
+    report = asyncio.run(run_benchmark(seed_config, config))
+    report["environment"] = describe(url)
+    if not args.no_micro:
+        from . import micro
+
+        report["micro"] = {
+            "serialization": micro.serialization(),
+            "ingest": micro.ingest(),
+            "metrics": micro.metrics_overhead(),
+        }
+        print(json.dumps(report["micro"], indent=2))
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"results written to {args.output}")
+
+def compare(args: argparse.Namespace) -> None:
+    from .runner import compare as compare_reports
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    regressions = compare_reports(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m bench", description="API benchmark harness")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed a scratch database and benchmark every router")
+    run_parser.add_argument("--database-url", help="Scratch database (default: SQLite in the work directory)")
+    run_parser.add_argument("--reset", action="store_true", help="Drop all tables first (non-SQLite databases)")
+    run_parser.add_argument("--workdir", help="Directory for the SQLite file and uploads (default: a temp dir)")
+    run_parser.add_argument("--users", type=int, default=50)
+    run_parser.add_argument("--apps", type=int, default=500)
+    run_parser.add_argument("--analytics-days", type=int, default=90)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--only", nargs="*", help="Scenario name prefixes, e.g. apps. auth.google")
+    run_parser.add_argument("--server", action="store_true",
+                            help="Run the app under uvicorn in a child process and send requests over a socket")
+    run_parser.add_argument("--no-micro", action="store_true", help="Skip the serialization/ingest/exporter microbenchmarks")
+    run_parser.add_argument("--output", default="bench-results.json")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
@@ -0,0 +1,71 @@
+"""
+Process setup for a benchmark run. Settings are read when app modules are
+first imported, so ``configure`` must run before anything from ``app`` (or
+``main``) is imported.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+def configure(workdir: Path, database_url: Optional[str], server: bool = False) -> str:
+    """
+    Point the app at the scratch database and directories; returns the
+    database URL. With ``server`` the job queue is a file, shared with the
+    app's own process.
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    url = database_url or f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["DATABASE_URL"] = url
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+    # No SQL echo, and no Redis needed unless asked for explicitly
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+    os.environ.setdefault("TOKEN_REVOCATION_BACKEND", "memory")
+    os.environ.setdefault("JOB_BACKEND", "sqlite")
+    os.environ.setdefault("JOB_SQLITE_PATH", str(workdir / "jobs.sqlite3") if server else ":memory:")
+    os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client")
+    # Written by the runner with the public half of a local signing key
+    os.environ["GOOGLE_JWKS_URL"] = f"file://{workdir / 'jwks.json'}"
+    (workdir / "uploads").mkdir(exist_ok=True)
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    return url
+
+def _alembic(*args: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args],
+        cwd=BACKEND_DIR, env=os.environ.copy(), check=True, capture_output=True
+    )
+
+def migrate(url: str, reset: bool) -> None:
+    """Bring the scratch database to the current schema, emptying it first on ``reset``"""
+    if url.startswith("sqlite:///"):
+        Path(url[len("sqlite:///"):]).unlink(missing_ok=True)
+    elif reset:
+        _alembic("downgrade", "base")
+    _alembic("upgrade", "head")
+
+def describe(url: str) -> Dict[str, Any]:
+    """Where and on what the results were measured"""
+    import platform
+
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": url.split("://", 1)[0],
+    }
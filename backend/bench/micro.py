@@ -0,0 +1,146 @@
+"""
+Microbenchmarks for code on every request path, without the HTTP stack:
+
+- response serialization: ``core.serialization`` and orjson against the
+  validate / jsonable_encoder / json.dumps path FastAPI takes otherwise
+- ingest parsing: CSV and NDJSON bodies through ``iter_batches`` and row
+  validation, the part of an ingest that does not depend on the database
+- the Prometheus exporter: MetricsMiddleware around a trivial ASGI app and
+  the statement hooks on an in-memory SQLite engine
+"""
+import asyncio
+import json
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.serialization import dump_json
+from app.models.app import App, AppStatus, AppType, Platform
+from app.schemas.app import AppListResponse
+from app.schemas.ingest import AppAnalyticsIngestRow, DataFormat
+from app.services.ingest import iter_batches
+
+def _best(func: Callable[[], Any], number: int = 1, repeat: int = 5) -> float:
+    """Best time of ``repeat`` runs of ``number`` calls, in seconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def _rows_per_second(rows: int, seconds: float) -> float:
+    return round(rows / seconds, 1)
+
+def _legacy_json(adapter: TypeAdapter, value: Any) -> bytes:
+    # What FastAPI does for a response_model: validate, dump, jsonable_encoder, json.dumps
+    validated = adapter.validate_python(value, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def serialization(rows: int = 10_000) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    apps = [
+        App(
+            id=i, name=f"App {i}", package_name=f"com.bench.micro{i}", app_type=AppType.GAME,
+            platform=Platform.ANDROID, status=AppStatus.PUBLISHED, version="1.0.0",
+            icon_url=f"/media/icons/ab/{i:064x}.png", created_at=now
+        )
+        for i in range(rows)
+    ]
+    analytics = [
+        {
+            "app_id": i % 100, "date": now - timedelta(days=i // 100), "daily_active_users": 1000 + i,
+            "new_users": 100 + i % 50, "revenue": 123.45 + i, "retention_day_1": 38.2, "crash_rate": 0.42,
+        }
+        for i in range(rows)
+    ]
+    schema = List[AppListResponse]
+    adapter = TypeAdapter(schema)
+    seconds = {
+        "apps_respond": _best(lambda: dump_json(schema, apps)),
+        "apps_fastapi_default": _best(lambda: _legacy_json(adapter, apps)),
+        "analytics_orjson": _best(lambda: orjson.dumps(analytics)),
+        "analytics_jsonable_encoder": _best(lambda: json.dumps(jsonable_encoder(analytics)).encode()),
+    }
+    result: Dict[str, Any] = {"rows": rows}
+    result.update({f"{name}_rows_per_sec": _rows_per_second(rows, value) for name, value in seconds.items()})
+    result["apps_speedup"] = round(seconds["apps_fastapi_default"] / seconds["apps_respond"], 2)
+    result["analytics_speedup"] = round(seconds["analytics_jsonable_encoder"] / seconds["analytics_orjson"], 2)
+    return result
+
+def ingest(rows: int = 20_000) -> Dict[str, Any]:
+    start = datetime(2024, 1, 1)
+    records = [
+        {
+            "app_id": 1 + i % 100, "date": (start + timedelta(days=i // 100)).date().isoformat(),
+            "daily_active_users": 1000 + i, "new_users": 100 + i % 50, "revenue": round(123.45 + i, 2),
+            "retention_day_1": 38.2, "crash_rate": 0.42,
+        }
+        for i in range(rows)
+    ]
+    columns = list(records[0])
+    bodies = {
+        DataFormat.NDJSON: "".join(json.dumps(record) + "\n" for record in records).encode(),
+        DataFormat.CSV: (
+            ",".join(columns) + "\n"
+            + "".join(",".join(str(record[column]) for column in columns) + "\n" for record in records)
+        ).encode(),
+    }
+
+    async def chunks(body: bytes):
+        for offset in range(0, len(body), 64 * 1024):
+            yield body[offset:offset + 64 * 1024]
+
+    async def load(fmt: DataFormat, validate: bool) -> None:
+        async for batch in iter_batches(chunks(bodies[fmt]), fmt):
+            if validate:
+                for _, record in batch:
+                    AppAnalyticsIngestRow.model_validate(record).model_dump()
+
+    result: Dict[str, Any] = {"rows": rows}
+    for fmt in DataFormat:
+        result[f"{fmt.value}_parse_rows_per_sec"] = _rows_per_second(
+            rows, _best(lambda: asyncio.run(load(fmt, False)), repeat=3)
+        )
+        result[f"{fmt.value}_parse_validate_rows_per_sec"] = _rows_per_second(
+            rows, _best(lambda: asyncio.run(load(fmt, True)), repeat=3)
+        )
+    return result
+
+async def _noop_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def _noop_send(message) -> None:
+    pass
+
+def _asgi_seconds(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    async def loop() -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app(scope, None, _noop_send)
+        return (time.perf_counter() - started) / iterations
+
+    return min(asyncio.run(loop()) for _ in range(3))
+
+def _statement_seconds(engine, iterations: int) -> float:
+    with engine.connect() as connection:
+        return _best(lambda: connection.exec_driver_sql("SELECT 1").scalar(), number=iterations, repeat=3)
+
+def metrics_overhead(iterations: int = 50_000) -> Dict[str, Any]:
+    plain, instrumented = create_engine("sqlite://"), create_engine("sqlite://")
+    instrument_engine(instrumented, "bench")
+    bare = _asgi_seconds(_noop_app, iterations)
+    wrapped = _asgi_seconds(MetricsMiddleware(_noop_app), iterations)
+    statement = _statement_seconds(plain, iterations // 10)
+    hooked = _statement_seconds(instrumented, iterations // 10)
+    return {
+        "middleware_us_per_request": round((wrapped - bare) * 1e6, 2),
+        "statement_hooks_us_per_statement": round((hooked - statement) * 1e6, 2),
+        "bare_statement_us": round(statement * 1e6, 2),
+    }
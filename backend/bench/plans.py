@@ -0,0 +1,68 @@
+"""
+Query plans of the role-scoped app lookups, for the user who is a member of
+the most apps in the dataset (run with ``--apps 70000`` or more for a member
+of 10k+ apps).
+
+Checks that a user's apps are read from the ``app_members`` primary key alone
+(an Index Only Scan on Postgres, a covering index search on SQLite), and
+times that lookup and the first page of the user's app listing.
+"""
+import statistics
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import Select, select, text
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.app import App
+from app.services.membership import member_app_ids
+
+from .seed import Dataset
+
+REPEAT = 20
+
+def _literal_sql(query: Select) -> str:
+    return str(query.compile(dialect=async_engine.dialect, compile_kwargs={"literal_binds": True}))
+
+async def _plan(query: Select, postgres: bool) -> List[str]:
+    explain = "EXPLAIN (ANALYZE, BUFFERS)" if postgres else "EXPLAIN QUERY PLAN"
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(text(f"{explain} {_literal_sql(query)}"))).all()
+    # SQLite rows are (id, parent, notused, detail)
+    return [row[0] if postgres else row[-1] for row in rows]
+
+async def _median_ms(query: Select) -> float:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            (await db.execute(query)).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+async def membership_plans(dataset: Dataset) -> Dict[str, Any]:
+    user_id, app_ids = max(dataset.apps_by_member.items(), key=lambda item: len(item[1]))
+    postgres = async_engine.dialect.name == "postgresql"
+    if postgres:
+        # Index-only scans need the visibility map of freshly loaded rows
+        async with async_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.execute(text("VACUUM ANALYZE app_members"))
+
+    lookup = member_app_ids(user_id)
+    listing = (
+        select(App.id, App.name).where(App.id.in_(member_app_ids(user_id)))
+        .order_by(App.created_at.desc(), App.id.desc()).limit(50)
+    )
+    lookup_plan = await _plan(lookup, postgres)
+    return {
+        "user_id": user_id,
+        "member_apps": len(app_ids),
+        "index_only": any(
+            "Index Only Scan" in line if postgres else "COVERING INDEX" in line for line in lookup_plan
+        ),
+        "lookup_ms": await _median_ms(lookup),
+        "listing_page_ms": await _median_ms(listing),
+        "lookup_plan": lookup_plan,
+        "listing_plan": await _plan(listing, postgres),
+    }
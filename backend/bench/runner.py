@@ -0,0 +1,274 @@
+"""
+Load generation against the app in process (ASGI, no sockets) by default, so
+results measure the application and database rather than the network stack.
+
+With ``server`` the app runs under uvicorn in a child process and is driven
+over a local socket instead. That is the setup for the ``*.under_load``
+scenarios: in process, the client shares the event loop (and the GIL) with
+the server, so slow background requests slow the client down too and the
+latencies say little about the server.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+import numpy as np
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core.config import settings
+from app.core.google_jwks import LocalJWKS
+from app.core.jobs import enqueue
+from app.services import tasks
+
+from .environment import BACKEND_DIR
+from .plans import membership_plans
+from .scenarios import BenchRequest, Scenario, build_scenarios
+from .seed import SeedConfig, seed
+
+@dataclass
+class RunConfig:
+    requests: int = 200  # measured requests per scenario
+    concurrency: int = 8
+    warmup: int = 20
+    only: List[str] = field(default_factory=list)  # scenario name prefixes; empty runs all
+    server: bool = False  # uvicorn in a child process instead of ASGI in process
+
+SERVER_START_SECONDS = 30
+
+async def _statements(client: httpx.AsyncClient, server: bool) -> float:
+    """SQL statements the app has run so far, from its /metrics when it runs in another process"""
+    if not server:
+        return sum(
+            REGISTRY.get_sample_value("db_statements_total", {"engine": engine}) or 0.0
+            for engine in ("sync", "async")
+        )
+    response = await client.get("/metrics")
+    return sum(
+        sample.value
+        for family in text_string_to_metric_families(response.text) if family.name == "db_statements"
+        for sample in family.samples if sample.name == "db_statements_total"
+    )
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+@asynccontextmanager
+async def _serve() -> AsyncIterator[str]:
+    """The app under uvicorn in a child process, with this process's environment; yields its URL"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=os.environ.copy()
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            deadline = time.monotonic() + SERVER_START_SECONDS
+            while True:
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {process.returncode}")
+                try:
+                    if (await probe.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"uvicorn did not answer on {base_url} within {SERVER_START_SECONDS}s")
+                await asyncio.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=SERVER_START_SECONDS)
+
+@asynccontextmanager
+async def _client(config: RunConfig) -> AsyncIterator[httpx.AsyncClient]:
+    """A client of the running app: in process (with its lifespan) or under uvicorn"""
+    # Exports stream for longer than httpx's default timeouts allow between chunks under load
+    timeout = httpx.Timeout(60.0)
+    if config.server:
+        async with _serve() as base_url:
+            async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+                yield client
+        return
+
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            yield client
+
+async def _drive(client: httpx.AsyncClient, requests: Iterator[BenchRequest], concurrency: int,
+                 latencies: List[float], statuses: Counter) -> None:
+    async def worker() -> None:
+        # One shared iterator; workers take the next request as they free up
+        for request in requests:
+            started = time.perf_counter()
+            response = await client.request(
+                request.method, request.url, headers=request.headers, json=request.json, content=request.content
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+async def _load(client: httpx.AsyncClient, build: Callable[[int], BenchRequest], stop: asyncio.Event,
+                statuses: Counter) -> None:
+    """Send requests back to back until ``stop`` is set"""
+    i = 0
+    while not stop.is_set():
+        request = build(i)
+        async with client.stream(
+            request.method, request.url, headers=request.headers, json=request.json, content=request.content
+        ) as response:
+            # Undecoded: decompressing in the client would compete with the server for the loop
+            async for _ in response.aiter_raw():
+                pass
+        statuses[response.status_code] += 1
+        i += 1
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, config: RunConfig) -> Dict[str, Any]:
+    requests = [scenario.build(i) for i in range(config.warmup + config.requests)]
+    # Started before the warmup, so slow requests are already in flight when measuring starts
+    stop = asyncio.Event()
+    background: Counter = Counter()
+    loaders = [
+        asyncio.create_task(_load(client, scenario.background, stop, background))
+        for _ in range(scenario.background_concurrency if scenario.background else 0)
+    ]
+    if scenario.conditional:
+        first = requests[0]
+        response = await client.request(first.method, first.url, headers=first.headers)
+        etag = response.headers.get("etag")
+        for request in requests:
+            request.headers = {**request.headers, "If-None-Match": etag or '"missing"'}
+
+    await _drive(client, iter(requests[:config.warmup]), config.concurrency, [], Counter())
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    statements_before = await _statements(client, config.server)
+    started = time.perf_counter()
+    await _drive(client, iter(requests[config.warmup:]), config.concurrency, latencies, statuses)
+    elapsed = time.perf_counter() - started
+    statements = await _statements(client, config.server) - statements_before
+    stop.set()
+    await asyncio.gather(*loaders)
+
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    unexpected = sum(count for code, count in statuses.items() if code not in scenario.expect)
+    result = {
+        "name": scenario.name,
+        "router": scenario.router,
+        "requests": len(latencies),
+        "concurrency": config.concurrency,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(float(ms.mean()), 3),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(ms.max()), 3),
+        },
+        "db_statements_per_request": round(statements / len(latencies), 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "errors": unexpected,
+    }
+    if loaders:
+        # Statements of the background requests are included in db_statements_per_request
+        result["background"] = {
+            "concurrency": len(loaders),
+            "requests": sum(background.values()),
+            "statuses": {str(code): count for code, count in sorted(background.items())},
+        }
+    return result
+
+async def run(seed_config: SeedConfig, config: RunConfig) -> Dict[str, Any]:
+    dataset = await seed(seed_config)
+    membership = await membership_plans(dataset)
+    print(
+        f"membership: user {membership['user_id']} on {membership['member_apps']} apps, "
+        f"index-only lookup: {membership['index_only']}, lookup {membership['lookup_ms']} ms, "
+        f"first page {membership['listing_page_ms']} ms",
+        flush=True
+    )
+
+    # Google's keys are replaced by a local key pair (GOOGLE_JWKS_URL is a file:// URL)
+    jwks = LocalJWKS()
+    Path(settings.GOOGLE_JWKS_URL[len("file://"):]).write_text(json.dumps(jwks.jwks()))
+
+    results: List[Dict[str, Any]] = []
+    async with _client(config) as client:
+        job = await enqueue(tasks.PURGE_STALE_UPLOADS, {})
+        scenarios = [
+            scenario for scenario in build_scenarios(dataset, jwks, job.id)
+            if not config.only or scenario.name.startswith(tuple(config.only))
+        ]
+        for scenario in scenarios:
+            result = await run_scenario(client, scenario, config)
+            results.append(result)
+            print(_format_row(result), flush=True)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "seed": asdict(seed_config),
+        "run": asdict(config),
+        "dataset": {
+            "users": sum(len(ids) for ids in dataset.users.values()),
+            "apps": len(dataset.app_ids),
+            "analytics_rows": dataset.analytics_rows,
+            "campaigns": dataset.campaigns,
+            "business_rows": dataset.business_rows,
+            "cohort_rows": dataset.cohort_rows,
+            "seed_timings_seconds": {name: round(value, 3) for name, value in dataset.timings.items()},
+        },
+        "membership": membership,
+        "scenarios": results,
+    }
+
+HEADER = f"{'scenario':<30} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'stmts':>6} {'errors':>6}"
+
+def _format_row(result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{result['name']:<30} {result['throughput_rps']:>9.1f} {latency['p50']:>9.2f} "
+        f"{latency['p95']:>9.2f} {latency['p99']:>9.2f} {result['db_statements_per_request']:>6.1f} "
+        f"{result['errors']:>6}"
+    )
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print per-scenario changes; returns the scenarios that regressed beyond ``threshold``"""
+    before = {result["name"]: result for result in baseline["scenarios"]}
+    regressions = []
+    print(f"{'scenario':<30} {'rps':>18} {'p95 ms':>20}")
+    for result in current["scenarios"]:
+        old: Optional[Dict[str, Any]] = before.get(result["name"])
+        if old is None:
+            print(f"{result['name']:<30} {'(new)':>18}")
+            continue
+        rps_change = result["throughput_rps"] / old["throughput_rps"] - 1
+        p95_change = result["latency_ms"]["p95"] / max(old["latency_ms"]["p95"], 1e-9) - 1
+        regressed = rps_change < -threshold or p95_change > threshold or result["errors"] > old["errors"]
+        if regressed:
+            regressions.append(result["name"])
+        print(
+            f"{result['name']:<30} {result['throughput_rps']:>9.1f} ({rps_change:+6.1%}) "
+            f"{result['latency_ms']['p95']:>9.2f} ({p95_change:+6.1%}){'  REGRESSED' if regressed else ''}"
+        )
+    return regressions
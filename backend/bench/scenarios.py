@@ -0,0 +1,223 @@
+"""
+Request mixes per router. Each scenario builds its i-th request up front, so
+token minting and body encoding stay out of the measured time; scenarios
+that consume something (refresh tokens, logouts, package names) build a
+fresh one per request.
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.auth import create_access_token, create_refresh_token
+from app.core.google_jwks import LocalJWKS
+from app.models.user import UserRole
+from app.services.imaging import PRESETS
+
+from .seed import NAME_WORDS, TAGS, Dataset
+
+API = "/api/v1"
+
+@dataclass
+class BenchRequest:
+    method: str
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    json: Any = None
+    content: Optional[bytes] = None
+
+@dataclass
+class Scenario:
+    name: str
+    router: str  # prefix the router is mounted at in api.py
+    build: Callable[[int], BenchRequest]
+    expect: Tuple[int, ...] = (200,)
+    conditional: bool = False  # revalidate with the ETag of a priming request, expecting 304
+    # Slow requests kept in flight (by this many clients) while the scenario is measured
+    background: Optional[Callable[[int], BenchRequest]] = None
+    background_concurrency: int = 2
+
+def bearer(dataset: Dataset, user_id: int, role: UserRole) -> Dict[str, str]:
+    """Access token with the claims create_token_pair puts in one"""
+    token = create_access_token({
+        "sub": str(user_id),
+        "email": dataset.emails[user_id],
+        "role": role.value,
+        "is_active": True,
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+def build_scenarios(dataset: Dataset, jwks: LocalJWKS, job_id: str) -> List[Scenario]:
+    admin_id = dataset.first(UserRole.ADMIN)
+    developer_id = dataset.first(UserRole.DEVELOPER)
+    admin = bearer(dataset, admin_id, UserRole.ADMIN)
+    developer = bearer(dataset, developer_id, UserRole.DEVELOPER)
+    app_ids = dataset.app_ids
+    own_apps = dataset.apps_by_member.get(developer_id) or app_ids[:1]
+    # The member of the most apps, as themselves
+    portfolio_id, portfolio_apps = max(dataset.apps_by_member.items(), key=lambda item: len(item[1]))
+    portfolio_role = next(role for role, ids in dataset.users.items() if portfolio_id in ids)
+    portfolio = bearer(dataset, portfolio_id, portfolio_role)
+    user_ids = sorted(dataset.emails)
+    id_tokens = [jwks.mint_id_token(dataset.emails[user_id]) for user_id in user_ids[:20]]
+    analytics_range = f"start_date={dataset.analytics_start.isoformat()}&end_date={dataset.analytics_end.isoformat()}"
+    preset = next(iter(PRESETS))
+
+    def app_id(i: int) -> int:
+        return app_ids[i * 7919 % len(app_ids)]  # stride through the catalog
+
+    def batch_ids(i: int, size: int = 50) -> List[int]:
+        return [app_id(i * size + k) for k in range(size)]
+
+    def search_words(i: int) -> str:
+        # One whole word and the start of another, as typed into a search box
+        first, second = NAME_WORDS[i % len(NAME_WORDS)], NAME_WORDS[i * 7 % len(NAME_WORDS)]
+        return f"{first}+{second[:3]}"
+
+    def misspelled(i: int) -> str:
+        word = NAME_WORDS[i % len(NAME_WORDS)]
+        return word[:2] + word[3:]
+
+    def ingest_body(i: int) -> bytes:
+        # Re-load one week of an app, so every request is an upsert of existing rows
+        day = dataset.analytics_start + timedelta(days=i % 7 * 7)
+        rows = [
+            {"app_id": app_id(i), "date": (day + timedelta(days=k)).isoformat(), "daily_active_users": 1000 + i}
+            for k in range(7)
+        ]
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    def full_export(i: int) -> BenchRequest:
+        # Every analytics row of the seeded range: the slowest read in the API
+        return BenchRequest("GET", f"{API}/analytics/export/app_analytics?{analytics_range}", admin)
+
+    def logout(i: int) -> BenchRequest:
+        # Logout revokes the access token, so each request needs its own
+        return BenchRequest("POST", f"{API}/auth/logout", bearer(dataset, admin_id, UserRole.ADMIN), json={
+            "refresh_token": create_refresh_token(admin_id)
+        })
+
+    return [
+        # auth
+        Scenario("auth.google", "/auth", lambda i: BenchRequest(
+            "POST", f"{API}/auth/google", json={"id_token": id_tokens[i % len(id_tokens)]}
+        )),
+        Scenario("auth.refresh", "/auth", lambda i: BenchRequest(
+            "POST", f"{API}/auth/refresh", json={"refresh_token": create_refresh_token(user_ids[i % len(user_ids)])}
+        )),
+        Scenario("auth.logout", "/auth", logout),
+        Scenario("auth.me", "/auth", lambda i: BenchRequest("GET", f"{API}/auth/me", admin)),
+        Scenario("auth.me.under_load", "/auth", lambda i: BenchRequest(
+            "GET", f"{API}/auth/me", admin
+        ), background=full_export),
+        # users
+        Scenario("users.list", "/users", lambda i: BenchRequest("GET", f"{API}/users/?page=1&per_page=50", admin)),
+        Scenario("users.search", "/users", lambda i: BenchRequest(
+            "GET", f"{API}/users/search?q={dataset.emails[user_ids[i % len(user_ids)]].split('@')[0]}", admin
+        )),
+        Scenario("users.get", "/users", lambda i: BenchRequest(
+            "GET", f"{API}/users/{user_ids[i % len(user_ids)]}", admin
+        )),
+        # apps
+        Scenario("apps.list.admin", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/?page={1 + i % 5}&per_page=50", admin
+        )),
+        Scenario("apps.list.member", "/apps", lambda i: BenchRequest("GET", f"{API}/apps/?per_page=50", developer)),
+        Scenario("apps.list.portfolio", "/apps", lambda i: BenchRequest("GET", f"{API}/apps/?per_page=50", portfolio)),
+        Scenario("apps.list.revalidate", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/?per_page=50", admin
+        ), expect=(304,), conditional=True),
+        Scenario("apps.list.tags_any", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/?per_page=50&tags_any={TAGS[1 + i % 9]},{TAGS[1 + (i + 4) % 9]}", admin
+        )),
+        Scenario("apps.list.tags_all", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/?per_page=50&tags_all=free&tags_all={TAGS[1 + i % 9]}", admin
+        )),
+        Scenario("apps.get", "/apps", lambda i: BenchRequest("GET", f"{API}/apps/{app_id(i)}", admin)),
+        Scenario("apps.get.under_load", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/{app_id(i)}", admin
+        ), background=full_export),
+        Scenario("apps.get.member", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/{own_apps[i % len(own_apps)]}", developer
+        )),
+        Scenario("apps.get.portfolio", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/{portfolio_apps[i * 7919 % len(portfolio_apps)]}", portfolio
+        )),
+        Scenario("apps.batch", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/batch?ids={','.join(map(str, batch_ids(i)))}", admin
+        )),
+        Scenario("apps.search", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/search?q={search_words(i)}", admin
+        )),
+        Scenario("apps.search.fuzzy", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/search?mode=fuzzy&q={misspelled(i)}", admin
+        )),
+        Scenario("apps.search.member", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/search?q={search_words(i)}", developer
+        )),
+        Scenario("apps.create", "/apps", lambda i: BenchRequest("POST", f"{API}/apps/", developer, json={
+            "name": f"Bench Created {i}",
+            "package_name": f"com.bench.created{i}",
+            "app_type": "mobile_app",
+            "platform": "android",
+        })),
+        Scenario("apps.update", "/apps", lambda i: BenchRequest(
+            "PUT", f"{API}/apps/{app_id(i)}", admin, json={"description": f"Updated {i}"}
+        )),
+        Scenario("apps.bulk_update", "/apps", lambda i: BenchRequest("PATCH", f"{API}/apps/batch", admin, json={
+            "ids": batch_ids(i, 20), "changes": {"target_audience": f"segment {i % 10}"}
+        })),
+        Scenario("apps.artifacts", "/apps", lambda i: BenchRequest(
+            "GET", f"{API}/apps/{app_id(i)}/artifacts", admin
+        )),
+        # analytics
+        Scenario("analytics.overview", "/analytics", lambda i: BenchRequest(
+            "GET", f"{API}/analytics/overview?{analytics_range}", admin
+        )),
+        Scenario("analytics.app", "/analytics", lambda i: BenchRequest(
+            "GET", f"{API}/analytics/apps/{app_id(i)}?{analytics_range}", admin
+        )),
+        Scenario("analytics.export", "/analytics", lambda i: BenchRequest(
+            "GET", f"{API}/analytics/export/app_analytics?app_id={app_id(i)}&{analytics_range}", admin
+        )),
+        Scenario("analytics.cohorts", "/analytics", lambda i: BenchRequest(
+            "GET", f"{API}/analytics/cohorts?max_day=30", admin
+        )),
+        Scenario("analytics.cohorts.app", "/analytics", lambda i: BenchRequest(
+            "GET", f"{API}/analytics/cohorts?max_day=30&app_id={app_id(i)}", admin
+        )),
+        Scenario("analytics.ingest", "/analytics", lambda i: BenchRequest(
+            "POST", f"{API}/analytics/ingest/app_analytics?format=ndjson", admin, content=ingest_body(i)
+        )),
+        # marketing
+        Scenario("marketing.campaigns", "/marketing", lambda i: BenchRequest(
+            "GET", f"{API}/marketing/campaigns?page={1 + i % 5}&per_page=50", admin
+        )),
+        Scenario("marketing.report.app", "/marketing", lambda i: BenchRequest(
+            "GET", f"{API}/marketing/campaigns/report?app_id={app_id(i)}", admin
+        )),
+        Scenario("marketing.report.portfolio", "/marketing", lambda i: BenchRequest(
+            "GET", f"{API}/marketing/campaigns/report", admin
+        )),
+        # business
+        Scenario("business.summary", "/business", lambda i: BenchRequest("GET", f"{API}/business/summary", admin)),
+        Scenario("business.revenue", "/business", lambda i: BenchRequest("GET", f"{API}/business/revenue", admin)),
+        Scenario("business.forecast", "/business", lambda i: BenchRequest(
+            "GET", f"{API}/business/forecast?horizon={3 + i % 10}", admin
+        )),
+        # dashboard
+        Scenario("dashboard.stats", "/dashboard", lambda i: BenchRequest("GET", f"{API}/dashboard/stats", admin)),
+        Scenario("dashboard.chart.revenue", "/dashboard", lambda i: BenchRequest(
+            "GET", f"{API}/dashboard/charts/revenue?period=90d", admin
+        )),
+        Scenario("dashboard.chart.users.year", "/dashboard", lambda i: BenchRequest(
+            "GET", f"{API}/dashboard/charts/users?period=1y", admin
+        )),
+        # jobs
+        Scenario("jobs.stats", "/jobs", lambda i: BenchRequest("GET", f"{API}/jobs/stats", admin)),
+        Scenario("jobs.get", "/jobs", lambda i: BenchRequest("GET", f"{API}/jobs/{job_id}", admin)),
+        # media
+        Scenario("media.thumbnail", "/media", lambda i: BenchRequest(
+            "GET", f"{API}/media/thumbs/{preset}/{dataset.icon_sha256}.webp"
+        )),
+    ]
@@ -0,0 +1,323 @@
+"""
+Deterministic benchmark dataset: users across every role, apps owned and
+assigned among them, daily analytics, marketing campaigns, monthly business
+metrics and retention cohorts per app. The same seed and volumes
+always produce the same rows.
+
+Users, apps, campaigns, business metrics and cohorts go in with set-based
+inserts; analytics go through the ingest
+pipeline, which also builds the rollups and bumps the data versions.
+"""
+import hashlib
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List
+
+import numpy as np
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.analytics import BusinessMetrics, MarketingCampaign, RetentionCohort
+from app.models.app import App, AppStatus, AppType, Platform
+from app.models.user import User, UserRole
+from app.schemas.ingest import DataFormat, IngestDataset
+from app.services.extraction import ICON_URL_PREFIX
+from app.services.ingest import ingest
+from app.services.membership import resync_members
+from app.services.uploads import upload_root
+from app.services.versions import ANALYTICS, APPS, COHORTS, bump
+
+CATEGORIES = ("games", "productivity", "education", "health", "finance", "social", "utilities")
+# App names are two of these words and a number, for the search scenarios
+NAME_WORDS = (
+    "photo", "fitness", "budget", "puzzle", "racing", "music", "chess", "weather", "notes", "travel",
+    "recipe", "sleep", "language", "wallet", "garden", "camera", "podcast", "soccer", "calendar", "yoga",
+)
+TAGS = ("free", "premium", "subscription", "ads", "offline", "multiplayer", "kids", "casual", "ai", "widgets")
+CHANNELS = ("google_ads", "apple_search_ads", "social_media", "influencer")
+
+def app_tags(i: int) -> List[str]:
+    """Zero to three tags; "free" on every other app, the rest rarer"""
+    tags = ["free"] if i % 2 == 0 else []
+    tags += [TAGS[k] for k in dict.fromkeys((1 + i % 9, 1 + i // 9 % 9))][:i % 3]
+    return tags
+
+def app_name(i: int) -> str:
+    first = NAME_WORDS[i % len(NAME_WORDS)]
+    second = NAME_WORDS[i // len(NAME_WORDS) % len(NAME_WORDS)]
+    return f"{first.title()} {second.title()} {i}"
+
+@dataclass
+class SeedConfig:
+    users: int = 50
+    apps: int = 500
+    analytics_days: int = 90
+    campaigns_per_app: int = 2
+    cohort_days: int = 60  # install days with cohorts, ending yesterday
+    cohort_max_day: int = 30
+    seed: int = 42
+
+@dataclass
+class Dataset:
+    users: Dict[UserRole, List[int]]  # role -> user ids
+    emails: Dict[int, str]
+    app_ids: List[int]
+    apps_by_member: Dict[int, List[int]]  # user id -> apps they created or are assigned to
+    icon_sha256: str
+    analytics_start: date
+    analytics_end: date
+    analytics_rows: int = 0
+    campaigns: int = 0
+    business_rows: int = 0
+    cohort_rows: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def first(self, role: UserRole) -> int:
+        return self.users[role][0]
+
+def _role_plan(count: int) -> List[UserRole]:
+    # Always one admin; the rest cycle through the other roles
+    others = [role for role in UserRole if role != UserRole.ADMIN]
+    return [UserRole.ADMIN] + [others[i % len(others)] for i in range(max(count, len(UserRole)) - 1)]
+
+def _write_icon(rng: np.random.Generator) -> str:
+    """A local PNG icon, stored the way extracted icons are, for the thumbnail routes"""
+    from PIL import Image
+
+    pixels = rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format="PNG")
+    data = buffer.getvalue()
+    sha256 = hashlib.sha256(data).hexdigest()
+    path = upload_root() / "icons" / sha256[:2] / f"{sha256}.png"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return sha256
+
+async def _analytics_ndjson(app_ids: List[int], start: date, days: int,
+                            rng: np.random.Generator) -> AsyncIterator[bytes]:
+    """Daily rows per app with weekly seasonality and noise, one app per chunk"""
+    day_index = np.arange(days)
+    weekly = 1.0 + 0.15 * np.sin(2 * np.pi * (day_index + start.weekday()) / 7)
+    dates = [(start + timedelta(days=int(i))).isoformat() for i in day_index]
+    for app_id in app_ids:
+        base = rng.lognormal(mean=7.5, sigma=1.2)
+        trend = 1.0 + rng.normal(0.002, 0.002) * day_index
+        dau = np.maximum(base * weekly * trend * rng.normal(1.0, 0.05, days), 1).astype(int)
+        new = (dau * rng.uniform(0.05, 0.2, days)).astype(int)
+        iap = dau * rng.uniform(0.01, 0.08) * rng.normal(1.0, 0.1, days).clip(0)
+        ads = dau * rng.uniform(0.005, 0.03) * rng.normal(1.0, 0.1, days).clip(0)
+        d1 = rng.uniform(25, 45)
+        rating = rng.uniform(3.0, 4.9)
+        lines = [
+            json.dumps({
+                "app_id": app_id,
+                "date": dates[i],
+                "daily_active_users": int(dau[i]),
+                "monthly_active_users": int(dau[i] * 4.2),
+                "new_users": int(new[i]),
+                "returning_users": int(dau[i] - new[i]),
+                "session_duration_avg": round(float(rng.uniform(3, 15)), 2),
+                "sessions_per_user": round(float(rng.uniform(1, 4)), 2),
+                "retention_day_1": round(d1, 2),
+                "retention_day_7": round(d1 * 0.45, 2),
+                "retention_day_30": round(d1 * 0.2, 2),
+                "revenue": round(float(iap[i] + ads[i]), 2),
+                "in_app_purchases": round(float(iap[i]), 2),
+                "ad_revenue": round(float(ads[i]), 2),
+                "arpu": round(float((iap[i] + ads[i]) / dau[i]), 4),
+                "crash_rate": round(float(rng.uniform(0.1, 2.0)), 3),
+                "app_store_rating": round(rating, 2),
+                "app_store_reviews_count": int(i * 3),
+            })
+            for i in range(days)
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+async def _seed_cohorts(db: AsyncSession, app_ids: List[int], end: date, config: SeedConfig, rng: np.random.Generator) -> int:
+    """Power-law retention curves per app, as a triangle ending at ``end``"""
+    if not app_ids or config.cohort_days <= 0:
+        return 0
+    apps, cohorts, days = len(app_ids), config.cohort_days, config.cohort_max_day + 1
+    installs = rng.integers(50, 5000, (apps, cohorts))
+    day_one = rng.uniform(0.2, 0.5, apps)[:, None, None]
+    decay = rng.uniform(0.3, 0.7, apps)[:, None, None]
+    day_n = np.arange(days)
+    curve = np.where(day_n == 0, 1.0, day_one * np.maximum(day_n, 1) ** -decay)
+    users = np.rint(installs[:, :, None] * curve).astype(np.int64)
+
+    # Cohort k installed on end - (cohorts - 1 - k) has reached days 0..(cohorts - 1 - k)
+    age = (cohorts - 1 - np.arange(cohorts))[:, None]
+    reached = np.broadcast_to(day_n[None, :] <= age, users.shape)
+    app_index, cohort_index, day_index = np.nonzero(reached)
+    first = end - timedelta(days=cohorts - 1)
+    install_dates = [first + timedelta(days=k) for k in range(cohorts)]
+    rows = [
+        {"app_id": app_ids[a], "install_date": install_dates[c], "day_n": n, "users": u}
+        for a, c, n, u in zip(app_index.tolist(), cohort_index.tolist(), day_index.tolist(),
+                              users[app_index, cohort_index, day_index].tolist())
+    ]
+    await db.execute(insert(RetentionCohort.__table__), rows)
+    await bump(db, COHORTS)
+    await db.commit()
+    return len(rows)
+
+async def seed(config: SeedConfig) -> Dataset:
+    rng = np.random.default_rng(config.seed)
+    timings: Dict[str, float] = {}
+
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(select(func.count()).select_from(User)):
+            raise SystemExit("The benchmark database is not empty; pass --reset to clear it")
+
+        started = time.perf_counter()
+        roles = _role_plan(config.users)
+        await db.execute(insert(User.__table__), [
+            {
+                "email": f"bench{i}@example.com",
+                "full_name": f"Bench User {i}",
+                "role": role,
+                "is_active": True,
+                "is_verified": True,
+            }
+            for i, role in enumerate(roles)
+        ])
+        user_rows = (await db.execute(select(User.id, User.email, User.role).order_by(User.id))).all()
+        users: Dict[UserRole, List[int]] = {role: [] for role in UserRole}
+        for row in user_rows:
+            users[row.role].append(row.id)
+        emails = {row.id: row.email for row in user_rows}
+
+        icon_sha256 = _write_icon(rng)
+        icon_url = f"{ICON_URL_PREFIX}/icons/{icon_sha256[:2]}/{icon_sha256}.png"
+        creators = users[UserRole.DEVELOPER] + users[UserRole.PRODUCT_MANAGER]
+        pms = users[UserRole.PRODUCT_MANAGER]
+        marketers = users[UserRole.MARKETING_MANAGER]
+        statuses = list(AppStatus)
+        await db.execute(insert(App.__table__), [
+            {
+                "name": app_name(i),
+                "package_name": f"com.bench.app{i}",
+                "description": f"{app_name(i)} is a benchmark app for {CATEGORIES[i % len(CATEGORIES)]}",
+                "app_type": AppType.GAME if i % 3 == 0 else AppType.MOBILE_APP,
+                "platform": list(Platform)[i % len(Platform)],
+                "version": f"1.{i % 10}.0",
+                "build_number": 1 + i % 50,
+                "status": statuses[int(rng.integers(len(statuses)))],
+                "is_published": bool(i % 2),
+                "icon_url": icon_url if i % 4 else None,
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "tags": app_tags(i),
+                "created_by": creators[int(rng.integers(len(creators)))],
+                "assigned_pm": pms[int(rng.integers(len(pms)))] if i % 3 else None,
+                "assigned_marketing": marketers[int(rng.integers(len(marketers)))] if i % 2 else None,
+            }
+            for i in range(config.apps)
+        ])
+        await resync_members(db)
+        await bump(db, APPS)
+        await db.commit()
+
+        app_rows = (await db.execute(
+            select(App.id, App.created_by, App.assigned_pm, App.assigned_marketing).order_by(App.id)
+        )).all()
+        apps_by_member: Dict[int, List[int]] = {}
+        for row in app_rows:
+            for member in {row.created_by, row.assigned_pm, row.assigned_marketing} - {None}:
+                apps_by_member.setdefault(member, []).append(row.id)
+        app_ids = [row.id for row in app_rows]
+        timings["users_and_apps_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        end = date.today() - timedelta(days=1)
+        start = end - timedelta(days=config.analytics_days - 1)
+        report = await ingest(
+            db,
+            IngestDataset.APP_ANALYTICS,
+            _analytics_ndjson(app_ids, start, config.analytics_days, rng),
+            fmt=DataFormat.NDJSON
+        )
+        timings["analytics_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        campaigns = []
+        for i, app_id in enumerate(app_ids):
+            for k in range(config.campaigns_per_app):
+                budget = float(rng.integers(1_000, 50_000))
+                spent = round(budget * float(rng.uniform(0.1, 0.9)), 2)
+                impressions = int(rng.integers(10_000, 1_000_000))
+                clicks = int(impressions * rng.uniform(0.005, 0.05))
+                installs = int(clicks * rng.uniform(0.05, 0.4))
+                campaigns.append({
+                    "name": f"Bench Campaign {k}",
+                    "app_id": app_id,
+                    "campaign_type": CHANNELS[(i + k) % len(CHANNELS)],
+                    "budget": budget,
+                    "spent": spent,
+                    "is_active": bool((i + k) % 3),
+                    "start_date": start + timedelta(days=int(rng.integers(config.analytics_days // 2 + 1))),
+                    "end_date": end + timedelta(days=int(rng.integers(1, 60))) if k % 2 == 0 else None,
+                    "impressions": impressions,
+                    "clicks": clicks,
+                    "installs": installs,
+                    "cost_per_install": round(spent / installs, 4) if installs else 0.0,
+                    "created_by": marketers[(i + k) % len(marketers)],
+                })
+        if campaigns:
+            await db.execute(insert(MarketingCampaign.__table__), campaigns)
+            await bump(db, ANALYTICS)
+            await db.commit()
+        timings["campaigns_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        months = sorted({datetime(day.year, day.month, 1, tzinfo=timezone.utc)
+                         for day in (start + timedelta(days=k) for k in range(config.analytics_days))})
+        business = []
+        for app_id in app_ids:
+            base = float(rng.lognormal(9, 1))
+            for month in months:
+                revenue = base * float(rng.uniform(0.8, 1.3))
+                subscriptions, one_time = revenue * 0.5, revenue * 0.2
+                churn = float(rng.uniform(2, 15))
+                business.append({
+                    "app_id": app_id,
+                    "month": month,
+                    "revenue_total": round(revenue, 2),
+                    "revenue_subscriptions": round(subscriptions, 2),
+                    "revenue_one_time": round(one_time, 2),
+                    "revenue_ads": round(revenue - subscriptions - one_time, 2),
+                    "development_cost": round(float(rng.lognormal(8, 0.5)), 2),
+                    "marketing_cost": round(revenue * float(rng.uniform(0.1, 0.4)), 2),
+                    "operational_cost": round(revenue * float(rng.uniform(0.05, 0.2)), 2),
+                    "customer_acquisition_cost": round(float(rng.lognormal(0.5, 0.5)), 2),
+                    "lifetime_value": round(float(rng.lognormal(3, 0.6)), 2),
+                    "churn_rate": round(churn, 2),
+                })
+        if business:
+            await db.execute(insert(BusinessMetrics.__table__), business)
+            await bump(db, ANALYTICS)
+            await db.commit()
+        timings["business_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cohort_rows = await _seed_cohorts(db, app_ids, end, config, rng)
+        timings["cohorts_seconds"] = time.perf_counter() - started
+
+    return Dataset(
+        users=users,
+        emails=emails,
+        app_ids=app_ids,
+        apps_by_member=apps_by_member,
+        icon_sha256=icon_sha256,
+        analytics_start=start,
+        analytics_end=end,
+        analytics_rows=report.rows_loaded,
+        campaigns=len(campaigns),
+        business_rows=len(business),
+        cohort_rows=cohort_rows,
+        timings=timings,
+    )
@@ -1,28 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from datetime import date
+import logging
+import os
 import uvicorn
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine
 from app.api.v1.api import api_router
 from app.core.auth import verify_token
+from app.core.compression import CompressionMiddleware
+from app.core.jobs import JobRunner, job_stats
+from app.core.metrics import MetricsMiddleware, observe_job_stats
+from app.core.workers import shutdown_process_pool, start_process_pool
+from app.services import tasks  # noqa: F401  (register background tasks)
+from app.services.partitions import add_months, ensure_partitions
+from app.services.extraction import ICON_URL_PREFIX
 
-# Create database tables
+# Schema is managed by Alembic: run `alembic upgrade head` before starting
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    await ensure_partitions(today, add_months(today, settings.ANALYTICS_PARTITION_MONTHS_AHEAD))
+    await start_process_pool()
+    runner = None
+    if settings.JOB_WORKER_IN_PROCESS:
+        runner = JobRunner(concurrency=settings.JOB_CONCURRENCY)
+        await runner.start()
     yield
     # Shutdown
-    pass
+    if runner:
+        await runner.stop()
+    shutdown_process_pool()
+    await async_engine.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Mobile Publishing Platform API",
     description="API for mobile app/games publishing platform",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -35,14 +58,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger text responses; routes opt into ETags via core.conditional
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Outermost, so latency includes compression and CORS
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Extracted app icons are public; uploaded builds are not served
+icons_dir = os.path.join(settings.UPLOAD_DIR, "icons")
+os.makedirs(icons_dir, exist_ok=True)
+app.mount(f"{ICON_URL_PREFIX}/icons", StaticFiles(directory=icons_dir), name="icons")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "Mobile Publishing Platform API is running"}
 
+# Prometheus scrape endpoint; expose only inside the deployment network
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    try:
+        observe_job_stats(await job_stats())
+    except Exception:
+        # Keep serving request and pool metrics when the job backend is down
+        logging.getLogger(__name__).exception("Could not read job stats")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -96,6 +96,7 @@ interface MockApp {
   status: AppStatus;
   version: string;
   icon_url: string;
+  icon_thumbnail_url?: string;
   downloads: number;
   rating: number;
   revenue: number;
@@ -126,6 +127,8 @@ const AppCard: React.FC<AppCardProps> = ({ app, onMenuClick }) => {
           <Stack direction="row" alignItems="flex-start" justifyContent="space-between">
             <Stack direction="row" spacing={2} alignItems="center">
               <Avatar
+                src={app.icon_thumbnail_url || app.icon_url || undefined}
+                alt={app.name}
                 sx={{
                   width: 56,
                   height: 56,
@@ -1,4 +1,5 @@
-import React from 'react';
+import React, { useMemo } from 'react';
+import { useQuery } from '@tanstack/react-query';
 import {
   Box,
   Grid,
@@ -21,6 +22,8 @@ import {
   GetApp as ExportIcon,
 } from '@mui/icons-material';
 import PageHeader from '../components/Layout/PageHeader';
+import { dashboardApi } from '../services/api';
+import { ChartPoint } from '../types';
 import {
   AreaChart,
   Area,
@@ -44,7 +47,9 @@ const statsData = {
   avgRating: 4.3,
 };
 
-const revenueData = [
+const CHART_PERIOD = '1y';
+
+const fallbackRevenueData = [
   { month: 'Jan', revenue: 45000, users: 12000 },
   { month: 'Feb', revenue: 52000, users: 15000 },
   { month: 'Mar', revenue: 48000, users: 14000 },
@@ -143,7 +148,25 @@ const StatsCard: React.FC<StatsCardProps> = ({ title, value, icon, trend, color
   );
 };
 
+// Merge two series on their bucket date for a single AreaChart
+const mergeSeries = (revenue: ChartPoint[], users: ChartPoint[]) => {
+  const byDate = new Map<string, { date: string; revenue?: number; users?: number }>();
+  revenue.forEach((point) => byDate.set(point.date, { date: point.date, revenue: point.value }));
+  users.forEach((point) => byDate.set(point.date, { ...byDate.get(point.date), date: point.date, users: point.value }));
+  return Array.from(byDate.values()).sort((a, b) => a.date.localeCompare(b.date));
+};
+
 const DashboardPage: React.FC = () => {
+  const { data: revenueChart } = useQuery(['dashboard-chart', 'revenue', CHART_PERIOD], () =>
+    dashboardApi.getChartData('revenue', CHART_PERIOD).then((response) => response.data)
+  );
+  const { data: usersChart } = useQuery(['dashboard-chart', 'users', CHART_PERIOD], () =>
+    dashboardApi.getChartData('users', CHART_PERIOD).then((response) => response.data)
+  );
+  const revenueData = useMemo(
+    () => (revenueChart && usersChart ? mergeSeries(revenueChart.points, usersChart.points) : fallbackRevenueData),
+    [revenueChart, usersChart]
+  );
 
   return (
     <Box sx={{ p: 4, bgcolor: 'background.default', minHeight: '100vh' }}>
@@ -258,7 +281,7 @@ const DashboardPage: React.FC = () => {
               <ResponsiveContainer width="100%" height={320}>
                 <AreaChart data={revenueData}>
                   <CartesianGrid strokeDasharray="3 3" stroke="#e0e0e0" />
-                  <XAxis dataKey="month" stroke="#666666" />
+                  <XAxis dataKey={revenueChart && usersChart ? 'date' : 'month'} stroke="#666666" />
                   <YAxis stroke="#666666" />
                   <Tooltip
                     contentStyle={{
@@ -1,5 +1,5 @@
 import axios, { AxiosResponse } from 'axios';
-import { AuthResponse, User, App, AppAnalytics, MarketingCampaign, BusinessMetrics, PaginatedResponse } from '../types';
+import { AuthResponse, TokenResponse, User, App, AppBatchResponse, AppBulkUpdate, AppBulkUpdateResponse, AppArtifact, UploadStatus, AppAnalytics, CohortMatrix, MarketingCampaign, CampaignReport, BusinessMetrics, BusinessSummary, RevenueReport, RevenueForecast, PaginatedResponse, SearchMode, SearchResults, ChartResponse } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -42,8 +42,11 @@ export const authApi = {
   googleLogin: (idToken: string): Promise<AxiosResponse<AuthResponse>> =>
     api.post('/auth/google', { id_token: idToken }),
   
-  logout: (): Promise<AxiosResponse<{ message: string }>> =>
-    api.post('/auth/logout'),
+  refresh: (refreshToken: string): Promise<AxiosResponse<TokenResponse>> =>
+    api.post('/auth/refresh', { refresh_token: refreshToken }),
+  
+  logout: (refreshToken?: string): Promise<AxiosResponse<{ message: string }>> =>
+    api.post('/auth/logout', { refresh_token: refreshToken }),
   
   getCurrentUser: (): Promise<AxiosResponse<User>> =>
     api.get('/auth/me'),
@@ -52,7 +55,10 @@ export const authApi = {
 // Users API
 export const usersApi = {
   getUsers: (page = 1, perPage = 20): Promise<AxiosResponse<PaginatedResponse<User>>> =>
-    api.get(`/users?page=${page}&per_page=${perPage}`),
+    api.get(`/users?page=${page}&per_page=${perPage}&include_total=true`),
+  
+  searchUsers: (q: string, mode: SearchMode = 'auto', limit = 20): Promise<AxiosResponse<SearchResults<User>>> =>
+    api.get('/users/search', { params: { q, mode, limit } }),
   
   getUser: (id: number): Promise<AxiosResponse<User>> =>
     api.get(`/users/${id}`),
@@ -70,32 +76,66 @@ export const appsApi = {
     const params = new URLSearchParams({
       page: page.toString(),
       per_page: perPage.toString(),
+      include_total: 'true',
       ...filters,
     });
     return api.get(`/apps?${params}`);
   },
   
+  // Ranked by name/package prefix, typo-tolerant similarity and full-text match
+  searchApps: (q: string, mode: SearchMode = 'auto', limit = 20): Promise<AxiosResponse<SearchResults<App>>> =>
+    api.get('/apps/search', { params: { q, mode, limit } }),
+  
   getApp: (id: number): Promise<AxiosResponse<App>> =>
     api.get(`/apps/${id}`),
   
+  // Several apps in one request; ids the user cannot see come back in `missing`
+  getAppsBatch: (ids: number[]): Promise<AxiosResponse<AppBatchResponse>> =>
+    api.get(`/apps/batch?ids=${ids.join(',')}`),
+  
   createApp: (data: Partial<App>): Promise<AxiosResponse<App>> =>
     api.post('/apps', data),
   
   updateApp: (id: number, data: Partial<App>): Promise<AxiosResponse<App>> =>
     api.put(`/apps/${id}`, data),
   
+  // One transaction for many apps: per-app changes, or the same changes for every id
+  bulkUpdateApps: (update: AppBulkUpdate): Promise<AxiosResponse<AppBulkUpdateResponse>> =>
+    api.patch('/apps/batch', update),
+  
   deleteApp: (id: number): Promise<AxiosResponse<{ message: string }>> =>
     api.delete(`/apps/${id}`),
   
-  uploadAppFile: (id: number, file: File): Promise<AxiosResponse<{ url: string }>> => {
-    const formData = new FormData();
-    formData.append('file', file);
-    return api.post(`/apps/${id}/upload`, formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-      },
+  // Resumable chunked upload: a failed chunk resumes from the server's offset
+  uploadAppFile: async (id: number, file: File, maxRetries = 5): Promise<AxiosResponse<AppArtifact>> => {
+    const { data: upload } = await api.post<UploadStatus>(`/apps/${id}/uploads`, {
+      filename: file.name,
+      size: file.size,
     });
+    let offset = upload.offset;
+    let retries = 0;
+    while (offset < file.size) {
+      try {
+        const chunk = file.slice(offset, offset + upload.chunk_size);
+        const { data } = await api.patch<UploadStatus>(`/apps/${id}/uploads/${upload.upload_id}`, chunk, {
+          headers: {
+            'Content-Type': 'application/offset+octet-stream',
+            'Upload-Offset': String(offset),
+          },
+        });
+        offset = data.offset;
+        retries = 0;
+      } catch (error) {
+        if (++retries > maxRetries) throw error;
+        const { data } = await api.get<UploadStatus>(`/apps/${id}/uploads/${upload.upload_id}`);
+        offset = data.offset;
+      }
+    }
+    return api.post(`/apps/${id}/uploads/${upload.upload_id}/complete`);
   },
+
+  getAppArtifacts: (id: number): Promise<AxiosResponse<AppArtifact[]>> =>
+    api.get(`/apps/${id}/artifacts`),
 };
 
 // Analytics API
@@ -120,6 +160,19 @@ export const analyticsApi = {
     if (endDate) params.append('end_date', endDate);
     return api.get(`/analytics/overview?${params}`);
   },
+
+  getCohorts: (
+    appIds?: number[],
+    startDate?: string,
+    endDate?: string,
+    maxDay = 90
+  ): Promise<AxiosResponse<CohortMatrix>> => {
+    const params = new URLSearchParams({ max_day: maxDay.toString() });
+    appIds?.forEach((id) => params.append('app_id', id.toString()));
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return api.get(`/analytics/cohorts?${params}`);
+  },
 };
 
 // Marketing API
@@ -138,6 +191,14 @@ export const marketingApi = {
   
   deleteCampaign: (id: number): Promise<AxiosResponse<{ message: string }>> =>
     api.delete(`/marketing/campaigns/${id}`),
+
+  getCampaignReport: (appIds?: number[], activeOnly = false, asOf?: string): Promise<AxiosResponse<CampaignReport>> => {
+    const params = new URLSearchParams();
+    appIds?.forEach((id) => params.append('app_id', id.toString()));
+    if (activeOnly) params.append('active_only', 'true');
+    if (asOf) params.append('as_of', asOf);
+    return api.get(`/marketing/campaigns/report?${params}`);
+  },
 };
 
 // Business API
@@ -157,12 +218,26 @@ export const businessApi = {
   getRevenueReport: (
     startDate?: string,
     endDate?: string
-  ): Promise<AxiosResponse<any>> => {
+  ): Promise<AxiosResponse<RevenueReport>> => {
     const params = new URLSearchParams();
     if (startDate) params.append('start_date', startDate);
     if (endDate) params.append('end_date', endDate);
     return api.get(`/business/revenue?${params}`);
   },
+
+  getSummary: (
+    startDate?: string,
+    endDate?: string,
+    limit = 100
+  ): Promise<AxiosResponse<BusinessSummary>> => {
+    const params = new URLSearchParams({ limit: limit.toString() });
+    if (startDate) params.append('start_date', startDate);
+    if (endDate) params.append('end_date', endDate);
+    return api.get(`/business/summary?${params}`);
+  },
+
+  getForecast: (horizon = 6, history = 24, limit = 20): Promise<AxiosResponse<RevenueForecast>> =>
+    api.get(`/business/forecast?horizon=${horizon}&history=${history}&limit=${limit}`),
 };
 
 // Dashboard API
@@ -170,6 +245,6 @@ export const dashboardApi = {
   getStats: (): Promise<AxiosResponse<any>> =>
     api.get('/dashboard/stats'),
   
-  getChartData: (type: string, period = '30d'): Promise<AxiosResponse<any>> =>
-    api.get(`/dashboard/charts/${type}?period=${period}`),
+  getChartData: (type: string, period = '30d', maxPoints?: number): Promise<AxiosResponse<ChartResponse>> =>
+    api.get(`/dashboard/charts/${type}`, { params: { period, max_points: maxPoints } }),
 };
@@ -22,9 +22,14 @@ export interface User {
   last_login?: string;
 }
 
-export interface AuthResponse {
+export interface TokenResponse {
   access_token: string;
+  refresh_token: string;
   token_type: string;
+  expires_in: number;
+}
+
+export interface AuthResponse extends TokenResponse {
   user: User;
 }
 
@@ -63,7 +68,9 @@ export interface App {
   status: AppStatus;
   is_published: boolean;
   icon_url?: string;
+  icon_thumbnail_url?: string;
   screenshots?: string[];
+  screenshot_thumbnail_urls?: (string | null)[];
   category?: string;
   tags?: string[];
   target_audience?: string;
@@ -75,6 +82,56 @@ export interface App {
   published_at?: string;
 }
 
+export interface AppArtifact {
+  id: number;
+  app_id: number;
+  filename: string;
+  extension: string;
+  size: number;
+  sha256: string;
+  uploaded_by: number;
+  created_at: string;
+  metadata_status: 'pending' | 'extracting' | 'applying' | 'done' | 'failed' | 'skipped';
+  metadata_error?: string;
+  deduplicated: boolean;
+}
+
+export interface UploadStatus {
+  upload_id: string;
+  filename: string;
+  size: number;
+  offset: number;
+  chunk_size: number;
+}
+
+export interface AppBatchResponse {
+  items: App[];
+  missing: number[];
+}
+
+export type AppChanges = Partial<Pick<App,
+  'name' | 'description' | 'version' | 'build_number' | 'status' | 'category' |
+  'target_audience' | 'tags' | 'assigned_pm' | 'assigned_marketing'>>;
+
+export interface AppBulkUpdate {
+  items?: (AppChanges & { id: number })[];
+  ids?: number[];
+  changes?: AppChanges;
+  atomic?: boolean;
+}
+
+export interface AppBulkItemResult {
+  id: number;
+  status_code: number;
+  detail?: string;
+  app?: App;
+}
+
+export interface AppBulkUpdateResponse {
+  results: AppBulkItemResult[];
+  updated: number;
+}
+
 // Analytics types
 export interface AppAnalytics {
   id: number;
@@ -99,6 +156,19 @@ export interface AppAnalytics {
   created_at: string;
 }
 
+export interface CohortMatrix {
+  start: string;
+  end: string;
+  max_day: number;
+  cohorts: {
+    install_date: string;
+    size: number;
+    retention: (number | null)[];
+  }[];
+  curve: (number | null)[];
+  curve_cohorts: number[];
+}
+
 export interface MarketingCampaign {
   id: number;
   name: string;
@@ -119,6 +189,61 @@ export interface MarketingCampaign {
   updated_at?: string;
 }
 
+export interface CampaignPerformance {
+  id: number;
+  name: string;
+  app_id: number;
+  campaign_type: string;
+  is_active: boolean;
+  start_date: string;
+  end_date?: string | null;
+  budget: number;
+  spent: number;
+  impressions: number;
+  clicks: number;
+  installs: number;
+  revenue: number;
+  ctr: number;
+  conversion_rate: number;
+  cpi: number;
+  roas: number;
+  daily_burn: number;
+  budget_remaining: number;
+  pacing?: number | null;
+  projected_exhaustion?: string | null;
+}
+
+export interface ChannelPerformance {
+  campaign_type: string;
+  campaigns: number;
+  spent: number;
+  installs: number;
+  revenue: number;
+  ctr: number;
+  cpi: number;
+  roas: number;
+}
+
+export interface CampaignReport {
+  as_of: string;
+  totals: {
+    campaigns: number;
+    active_campaigns: number;
+    budget: number;
+    spent: number;
+    impressions: number;
+    clicks: number;
+    installs: number;
+    revenue: number;
+    ctr: number;
+    cpi: number;
+    roas: number;
+    daily_burn: number;
+  };
+  channels: ChannelPerformance[];
+  campaigns: CampaignPerformance[];
+}
+
 export interface BusinessMetrics {
   id: number;
   app_id: number;
@@ -136,15 +261,90 @@ export interface BusinessMetrics {
   created_at: string;
 }
 
+export interface UnitEconomics {
+  revenue: number;
+  cost: number;
+  profit: number;
+  margin: number;
+  cac: number;
+  ltv: number;
+  ltv_cac?: number | null;
+  payback_months?: number | null;
+  churn_rate: number;
+}
+
+export interface AppEconomics extends UnitEconomics {
+  app_id: number;
+  name: string;
+  months: number;
+  margin_trend?: number | null;
+  churn_trend?: number | null;
+}
+
+export interface BusinessSummary {
+  start: string;
+  end: string;
+  apps_reporting: number;
+  totals: UnitEconomics;
+  apps: AppEconomics[];
+}
+
+export interface MonthlyBusiness extends UnitEconomics {
+  month: string;
+  revenue_subscriptions: number;
+  revenue_one_time: number;
+  revenue_ads: number;
+  development_cost: number;
+  marketing_cost: number;
+  operational_cost: number;
+}
+
+export interface RevenueReport {
+  start: string;
+  end: string;
+  months: MonthlyBusiness[];
+}
+
+export interface ForecastPoint {
+  month: string;
+  revenue: number;
+  lower: number;
+  upper: number;
+}
+
+export interface RevenueForecast {
+  horizon: number;
+  history: { month: string; revenue: number }[];
+  forecast: ForecastPoint[];
+  apps_fitted: number;
+  apps: {
+    app_id: number;
+    name: string;
+    alpha: number;
+    beta: number;
+    rmse: number;
+    forecast: ForecastPoint[];
+  }[];
+}
+
 // API Response types
 export interface PaginatedResponse<T> {
   items: T[];
+  next_cursor?: string | null;
   total: number;
   page: number;
   per_page: number;
   pages: number;
 }
 
+export type SearchMode = 'auto' | 'prefix' | 'fuzzy' | 'fulltext';
+
+export interface SearchResults<T> {
+  query: string;
+  mode: SearchMode;
+  items: { item: T; score: number }[];  // best match first
+}
+
 export interface ApiError {
   detail: string;
   status_code: number;
@@ -165,4 +365,19 @@ export interface ChartData {
   date?: string;
 }
 
+export interface ChartPoint {
+  date: string;
+  value: number;
+}
+
+export interface ChartResponse {
+  metric: string;
+  granularity: 'day' | 'week' | 'month';
+  start: string;
+  end: string;
+  points: ChartPoint[];
+  source_points: number;
+  downsampled: boolean;
+}
+
 